@@ -4,9 +4,25 @@
 
 __version__ = '1.6.7'
 
-from .basic    import Point, Ball, Polygon
-from .entities import Line, SimpleRectangle, Rectangle, Plane, SimpleCube, Cube, ConvexHull2D as ConvexHull
-from .entities import Basin, Basin3D, ComposedBasin
-from .         import generic, climate, hydrolakes, worldseas, worldcountries, adriatic, baltic, mediterranean
+from .basic     import Point, Ball, Polygon, set_num_threads, get_num_threads
+from .entities  import Line, SimpleRectangle, Rectangle, Plane, SimpleCube, Cube, ConvexHull2D as ConvexHull
+from .entities  import Basin, Basin3D, ComposedBasin, membership_bits
+from .cache     import enable_cache, disable_cache, get_cache
+from .transform import Affine, SphereRotation, RotatedPole, PolygonView
 
-del basic, entities
\ No newline at end of file
+# Catalog modules, only imported when accessed (e.g., Basins.worldseas)
+CATALOG_MODULES = ['generic', 'climate', 'hydrolakes', 'worldseas', 'worldcountries', 'adriatic', 'baltic', 'mediterranean', 'ionian']
+
+# Labeling engine over the catalog modules
+from .catalog   import Catalog
+
+def __getattr__(name):
+	if name in CATALOG_MODULES:
+		import importlib
+		return importlib.import_module('.'+name,__name__)
+	raise AttributeError("module '%s' has no attribute '%s'" % (__name__,name))
+
+def __dir__():
+	return sorted(list(globals().keys()) + CATALOG_MODULES)
+
+del basic, entities
@@ -4,18 +4,19 @@
 
 from __future__ import print_function, division
 
-import os, numpy as np
+from .manifest import Manifest
 
-from .entities import Basin, ComposedBasin
+# Basins are built on first access
+manifest = Manifest(__name__)
 
-# Path to the shapes directory
-SHAPESPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),'shapes')
-
-north = Basin.from_npy('nadr', 'North Adriatic', os.path.join(SHAPESPATH,'North_Adriatic.npy'),downsample=4)
-mid   = Basin.from_npy('madr', 'Mid Adriatic',   os.path.join(SHAPESPATH,'Mid_Adriatic.npy'),  downsample=4)
-south = Basin.from_npy('sadr', 'South Adriatic', os.path.join(SHAPESPATH,'South_Adriatic.npy'),downsample=4)
+manifest.shape('north', 'nadr', 'North Adriatic', 'North_Adriatic',downsample=4)
+manifest.shape('mid'  , 'madr', 'Mid Adriatic',   'Mid_Adriatic',  downsample=4)
+manifest.shape('south', 'sadr', 'South Adriatic', 'South_Adriatic',downsample=4)
 
 # Composed basins
-all   = ComposedBasin('adr', 'Adriatic', [north,mid,south])
+manifest.composed('all', 'adr', 'Adriatic', ['north','mid','south'])
+
+__getattr__ = manifest.getattr
+__dir__     = manifest.dir
 
-del print_function, division, os, np, Basin, ComposedBasin
\ No newline at end of file
+del print_function, division, Manifest
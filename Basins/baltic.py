@@ -4,15 +4,18 @@
 
 from __future__ import print_function, division
 
-import os, numpy as np
+from .manifest import Manifest
 
-from .entities import Basin, ComposedBasin, SimpleRectangle
+# Basins are built on first access
+manifest = Manifest(__name__)
 
-bornholm = Basin('born', 'Bornholm',       SimpleRectangle(15.0, 17.8, 54.5 ,  55.5).points)
-gdansk   = Basin('gdan', 'Gdansk'  ,       SimpleRectangle(18.1,  20., 53.8 , 55.15).points)
-gotland  = Basin('gotl', 'Gotland' ,       SimpleRectangle(17. ,   22, 55.15,  60.0).points)
-kattegat = Basin('katt', 'Kattegat',       SimpleRectangle(10. , 12.8,   55.,  58.4).points) 
-w_baltic = Basin('wbal', 'Western Baltic', SimpleRectangle(12.8,  15.,  53.7,  56.0).points)
+manifest.rectangle('bornholm', 'born', 'Bornholm',       15.0, 17.8, 54.5 ,  55.5)
+manifest.rectangle('gdansk'  , 'gdan', 'Gdansk'  ,       18.1,  20., 53.8 , 55.15)
+manifest.rectangle('gotland' , 'gotl', 'Gotland' ,       17. ,   22, 55.15,  60.0)
+manifest.rectangle('kattegat', 'katt', 'Kattegat',       10. , 12.8,   55.,  58.4)
+manifest.rectangle('w_baltic', 'wbal', 'Western Baltic', 12.8,  15.,  53.7,  56.0)
 
+__getattr__ = manifest.getattr
+__dir__     = manifest.dir
 
-del print_function, division, os, np, Basin, ComposedBasin, SimpleRectangle
\ No newline at end of file
+del print_function, division, Manifest
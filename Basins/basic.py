@@ -6,6 +6,88 @@ from __future__ import print_function, division
 
 import numpy as np
 
+from .       import stream, cache
+from .stream import STREAM_CHUNK, STREAM_NWORKERS
+
+IDX_EDGES_PER_SLAB = 1       # Average number of edges per slab of the index
+IDX_MAX_SLABS      = 1048576 # Maximum number of slabs of the index
+IDX_MINEDGES       = 64      # Polygons with less edges are not indexed
+IDX_MINPOINTS      = 8       # Minimum number of queries to build the index
+IDX_CHUNK          = 65536   # Number of points queried at once on the index
+GRID_CELLS_PER_EDGE = 4      # Number of cells per edge of the grid
+GRID_MAX_CELLS     = 1048576 # Maximum number of cells of the grid
+GRID_EPS           = 1e-6    # Relative tolerance (wrt the cell size) to find the edges of a cell
+PRE_MINEDGES       = 16      # Polygons with less edges are not prefiltered
+PRE_CELLS          = 4096    # Number of cells used to find the inscribed regions of the prefilter
+PRE_NRECTS         = 4       # Maximum number of inscribed rectangles of the prefilter
+PRE_EPS            = 1e-9    # Relative tolerance of the regions of the prefilter
+EDGE_EPS           = 1e-9    # Relative tolerance (wrt the coordinates) of a point on an edge
+
+# Status of the cells of the grid
+CELL_OUTSIDE, CELL_INSIDE, CELL_BOUNDARY_OUT, CELL_BOUNDARY_IN, CELL_MIXED = 0, 1, 2, 3, 4
+
+POLYGON_KINDS = ('unknown','rectangle','convex','simple','large') # Shapes of the polygons (see Polygon.kind)
+
+
+def set_num_threads(nthreads):
+	'''
+	Set the default number of threads used to classify arrays of
+	points. Only has effect on the compiled version with OpenMP.
+	'''
+	pass
+
+def get_num_threads():
+	'''
+	Returns the default number of threads used to classify arrays
+	of points (1 when not compiled with OpenMP).
+	'''
+	return 1
+
+def as_coordinates(*arrays):
+	'''
+	Returns the arrays of coordinates as float32 arrays if all of them
+	are float32, else as float64 arrays. The arrays are only copied if
+	they need to be converted.
+
+	Float32 coordinates are classified as they are, as they are exactly
+	representable in double precision. However, a float32 coordinate may
+	be up to half an ulp (e.g., ~1e-5 degrees at 180 degrees) away from
+	the value it was rounded from, so points that close to an edge may
+	be classified differently than their float64 originals.
+	'''
+	arrays = [np.asarray(v) for v in arrays]
+	dtype  = np.float32 if all([v.dtype == np.float32 for v in arrays]) else np.double
+	arrays = [np.asarray(v,dtype=dtype) for v in arrays]
+	return arrays[0] if len(arrays) == 1 else arrays
+
+def _kernel(kind, convex, gridded, indexed):
+	'''
+	Kernel of the crossing number for a shape of polygon and the
+	structures that it has built (same order as the dispatch of areinside).
+	'''
+	if kind == 'rectangle': return 'interval'
+	if convex:              return 'convex'
+	if gridded:             return 'grid'
+	return 'index' if indexed else 'edges'
+
+def _points(x, y=None):
+	'''
+	Array of points of shape (npoints,3) from an array x of shape
+	(npoints,2) or (npoints,3) or from two arrays of coordinates
+	x and y (z is set to 0). Float32 coordinates are widened exactly.
+	'''
+	if y is None:
+		xyz = np.asarray(x,dtype=np.double)
+		if not xyz.ndim == 2 or xyz.shape[1] not in (2,3):
+			raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+		if xyz.shape[1] == 3: return xyz
+		x, y = xyz[:,0], xyz[:,1]
+	x, y = np.asarray(x,dtype=np.double), np.asarray(y,dtype=np.double)
+	if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+	out = np.zeros((x.shape[0],3),dtype=np.double)
+	out[:,0], out[:,1] = x, y
+	return out
+
 
 class Point(object):
 	'''
@@ -318,6 +400,7 @@ class Ball(object):
 		return True if not self.isempty() and point.dist(self.center) < self.radius else False
 
 	def areinside(self,xyz):
+		xyz  = _points(xyz)
 		vec  = xyz - np.tile(self.center.xyz,(xyz.shape[0],1))
 		dist = np.sqrt(np.sum(vec*vec,axis=1))
 		return dist < self.radius if not self.isempty() else np.zeros((xyz.shape[0],),dtype=bool)
@@ -376,18 +459,19 @@ class Ball(object):
 
 		# Now check that all points p[i] are in the ball
 		# and if not, expand the ball just enough to include them
-		for p in poly.points:
-			dP    = p - center
-			dist2 = dP.norm2()
+		c = center.xyz.copy()
+		for p in poly.xyz:
+			dP    = p - c
+			dist2 = np.dot(dP,dP)
 			if dist2 <= radius2: continue # The point is inside the ball already
 			# p not in ball, so expand ball to include it
 			dist    = np.sqrt(dist2)
 			radius  = 0.5*(radius + dist)              # enlarge radius just enough
 			radius2 = radius*radius
-			center  = center + ((dist-radius)/dist)*dP # shift center towards p
+			c       = c + ((dist-radius)/dist)*dP      # shift center towards p
 
 		# Return the ball
-		return cls(center,radius)
+		return cls(Point.from_array(c),radius)
 
 	@property
 	def center(self):
@@ -400,30 +484,79 @@ class Ball(object):
 class Polygon(object):
 		'''
 		A polygon set as an array of points. Can be either 2D or 3D.
+		The points can be given as an array of Point or as an array
+		of coordinates of shape (npoints,2) or (npoints,3).
 		'''
 		def __init__(self, points):
-			self._points   = np.hstack((points,points[0]))
+			self._set_points(points)
 			self._bbox     = Ball.fastBall(self) # Create a ball bounding box using fastBall
 			self._centroid = self.compute_centroid()
 
 		def __str__(self):
-			retstr = 'Point %d %s' % (0,self.points[0].__str__())
+			retstr = 'Point %d %s' % (0,self[0].__str__())
 			for ip in range(1,self.npoints):
-				retstr += '\nPoint %d %s' % (ip,self.points[ip].__str__())
+				retstr += '\nPoint %d %s' % (ip,self[ip].__str__())
 			return retstr
 
+		def _set_points(self,points):
+			'''
+			Fill the vertex buffer of shape (npoints+1,3) with a 
+			single copy of the points and close the polygon.
+			'''
+			npoints = len(points)
+			xyz     = np.zeros((npoints+1,3),dtype=np.double)
+			if isinstance(points,np.ndarray) and not points.dtype == object:
+				# Array of coordinates
+				if not points.ndim == 2 or points.shape[1] not in (2,3):
+					raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+				xyz[:npoints,:points.shape[1]] = points
+			else:
+				# Array of Point
+				for ip in range(npoints):
+					xyz[ip,:] = points[ip].xyz
+			xyz[npoints,:] = xyz[0,:]
+			self._xyz       = xyz
+			self._hash      = None # Computed on demand (see hash)
+			self._index     = None
+			self._grid      = None
+			self._prefilter = None
+			self._convex    = None
+			self._kind      = None
+			self.classify()
+
+		def _cache_hash(self):
+			'''
+			Content hash to look the masks up, None (not computed)
+			if the cache is disabled.
+			'''
+			return None if cache.get_cache() is None else self.hash
+
+		def _coord(self,idim):
+			'''
+			Read-only view of one coordinate of the vertex buffer.
+			'''
+			out = self._xyz[:,idim]
+			out.flags.writeable = False
+			return out
+
 		# Operators
 		def __getitem__(self,i):
 			'''
 			Polygon[i]
 			'''
-			return self._points[i]
+			return Point.from_array(self._xyz[i,:].copy())
 
 		def __setitem__(self,i,value):
 			'''
 			Polygon[i] = value
 			'''
-			self._points[i] = value
+			self._xyz[i,:]  = value.xyz
+			self._hash      = None
+			self._index     = None
+			self._grid      = None
+			self._prefilter = None
+			self._convex    = None
+			self._kind      = None
 
 		def __eq__(self,other):
 			'''
@@ -433,10 +566,7 @@ class Polygon(object):
 			if not self.npoints == other.npoints:
 				return False
 			# Check if the points are equal
-			for ip in range(self.npoints):
-				if not self[ip] == other[ip]:
-					return False
-			return True
+			return np.array_equal(self.xyz,other.xyz)
 
 		def __ne__(self,other):
 			'''
@@ -470,26 +600,124 @@ class Polygon(object):
 			'''
 			Returns True if the point is inside the polygon, else False.
 			'''
-			if self.bbox > point: # Point is inside the bounding box
+			xyz = point.xyz.reshape((1,3))
+			f   = self.prefilter(xyz)[0]
+			if f == 0: # Point is inside the bounding box and not classified by the prefilter
+				# Use the rectangle, the convex chains, the cell grid or the slab index if available
+				if self._kind == 'rectangle' and not algorithm == 'wn':
+					return cn_PinPoly_rect(xyz,self)[0] == 1
+				if self.convex and not algorithm == 'wn':
+					return cn_PinPoly_convex(xyz,self)[0] == 1
+				if self.gridded and not algorithm == 'wn':
+					return cn_PinPoly_grid(xyz,self)[0] == 1
+				if self.indexed:
+					return wn_PinPoly_idx(xyz,self)[0] != 0 if algorithm == 'wn' else cn_PinPoly_idx(xyz,self)[0] == 1
 				# Select the algorithm to use
 				if algorithm == 'wn':
-					return True if wn_PinPoly(point,self) > 0  else False
+					return True if wn_PinPoly(point,self) != 0 else False
 				else:
 					return True if cn_PinPoly(point,self) == 1 else False
 			else:
-				return False
+				return f > 0
+
+		def isinside_xy(self,x,y,algorithm='cn'):
+			'''
+			Returns True if the point (x,y) is inside the polygon, else False.
+			'''
+			return self.isinside(Point(x,y,0.),algorithm=algorithm)
 
-		def areinside(self,xyz,algorithm='cn'):
+		def areinside(self,xyz,algorithm='cn',nthreads=0):
 			'''
 			Returns True if the points are inside the polygon, else False.
+			The points are given as an array of shape (npoints,2) or (npoints,3).
+			The number of threads (nthreads) only has effect on the compiled
+			version with OpenMP.
 			'''
-			out = np.zeros((xyz.shape[0],),dtype=bool)
-			idx = self.bbox > xyz   # Point are inside the bounding box
+			xyz = as_coordinates(xyz)
+			key, out = cache.lookup('areinside' if algorithm == 'cn' else 'areinside_'+algorithm,self._cache_hash(),xyz)
+			if out is not None: return out
+			return cache.store(key,self._areinside(_points(xyz),algorithm))
 
-			out[idx] = wn_PinPoly_vec(xyz[idx],self) > 0 if algorithm == 'wn' else cn_PinPoly_vec(xyz[idx],self) == 1
+		def _areinside(self,xyz,algorithm):
+			'''
+			Classify an array of points of shape (npoints,3).
+			'''
+			if self._kind is None:
+				self.classify()
+			if not self.convex and not self.indexed and self.npoints >= IDX_MINEDGES and xyz.shape[0] >= IDX_MINPOINTS:
+				self.build_index()
+			if not self.prefiltered and self.npoints >= PRE_MINEDGES and xyz.shape[0] >= IDX_MINPOINTS:
+				self.build_prefilter()
+			f   = self.prefilter(xyz)
+			out = f > 0   # Points accepted by the prefilter
+			idx = f == 0  # Points inside the bounding box and not classified by the prefilter
+			if self._kind == 'rectangle' and not algorithm == 'wn':
+				out[idx] = cn_PinPoly_rect(xyz[idx],self) == 1
+			elif self.convex and not algorithm == 'wn':
+				out[idx] = cn_PinPoly_convex(xyz[idx],self) == 1
+			elif self.gridded and not algorithm == 'wn':
+				out[idx] = cn_PinPoly_grid(xyz[idx],self) == 1
+			elif self.indexed:
+				out[idx] = wn_PinPoly_idx(xyz[idx],self) != 0 if algorithm == 'wn' else cn_PinPoly_idx(xyz[idx],self) == 1
+			else:
+				out[idx] = wn_PinPoly_vec(xyz[idx],self) != 0 if algorithm == 'wn' else cn_PinPoly_vec(xyz[idx],self) == 1
 
 			return out
 
+		def areinside_xy(self,x,y,algorithm='cn',nthreads=0):
+			'''
+			Returns True if the points are inside the polygon, else False.
+			The points are given as two arrays of coordinates x and y (e.g.,
+			longitude and latitude).
+			'''
+			x, y = as_coordinates(x,y)
+			key, out = cache.lookup('areinside_xy' if algorithm == 'cn' else 'areinside_xy_'+algorithm,self._cache_hash(),x,y)
+			if out is not None: return out
+			return cache.store(key,Polygon._areinside(self,_points(x,y),algorithm))
+
+		def grid_mask(self,x,y,nthreads=0):
+			'''
+			Returns the mask of the polygon on a rectilinear grid given by
+			its axes x and y (e.g., 1D longitude and latitude), of shape
+			(ny,nx) so that mask[j,i] is True if (x[i],y[j]) is inside.
+
+			The polygon is rasterized one row at a time: the crossings of
+			the edges with each row are computed once and the points of
+			the row are counted against them, so no array of points is built.
+			The points follow the same crossing rule and bounding ball test
+			as areinside, without building the meshgrid.
+			'''
+			x, y = as_coordinates(x,y)
+			if not x.ndim == 1 or not y.ndim == 1: raise ValueError('The axes of the grid must be 1D arrays!')
+			key, out = cache.lookup('grid_mask',self._cache_hash(),x,y)
+			if out is not None: return out
+			x, y = np.asarray(x,dtype=np.double), np.asarray(y,dtype=np.double)
+			out  = np.zeros((y.shape[0],x.shape[0]),dtype=bool)
+			if not self.isempty():
+				row = np.zeros((x.shape[0],3),dtype=np.double)
+				row[:,0] = x
+				for j in range(y.shape[0]):
+					xs = _crossings(y[j],self)
+					row[:,1] = y[j]
+					out[j,:] = np.logical_and((xs.shape[0] - np.searchsorted(xs,x,side='right')) % 2 == 1,self.bbox > row)
+			return cache.store(key,out)
+
+		def iter_areinside(self,source,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+			'''
+			Returns a generator of the masks of the chunks of points of a
+			source that does not need to fit in memory, e.g., an np.memmap,
+			a tuple (x,y) of arrays or an iterable of chunks (see
+			Basins.stream.iter_areinside).
+			'''
+			return stream.iter_areinside(self,source,chunk,nworkers)
+
+		def stream_areinside(self,source,out,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+			'''
+			Classify the chunks of points of a source and write the masks
+			into out, e.g., a memmapped array (see iter_areinside).
+			'''
+			return stream.stream_areinside(self,source,out,chunk,nworkers)
+
 		def compute_centroid(self):
 			'''
 			Returns the centroid (Point) of a (2D) polygon.	
@@ -498,16 +726,11 @@ class Polygon(object):
 			https://wwwf.imperial.ac.uk/~rn/centroid.pdf
 			https://en.wikipedia.org/wiki/Centroid
 			'''
-			Cx, Cy, A = 0, 0, 0
-			for ip in range(self.npoints):
-				Cx += (self[ip  ][0] + self[ip+1][0]) * \
-				      (self[ip  ][0] * self[ip+1][1] -
-				       self[ip+1][0] * self[ip  ][1])
-				Cy += (self[ip  ][1] + self[ip+1][1]) * \
-				      (self[ip  ][0] * self[ip+1][1] -
-				       self[ip+1][0] * self[ip  ][1])
-				A +=   self[ip  ][0] * self[ip+1][1] - \
-				       self[ip+1][0] * self[ip  ][1]
+			x, y = self.x, self.y
+			cross = x[:-1]*y[1:] - x[1:]*y[:-1]
+			Cx    = np.sum((x[:-1] + x[1:])*cross)
+			Cy    = np.sum((y[:-1] + y[1:])*cross)
+			A     = np.sum(cross)
 			return Point(Cx/(3*A),Cy/(3*A),0.)
 
 		def rotate(self, theta, o=np.array([])):
@@ -535,29 +758,335 @@ class Polygon(object):
 			               [   0,   0,   1]])
 			# Compute rotation matrix R
 			R = np.matmul(Rx,np.matmul(Ry,Rz))
-			# Project the points
-			for ip in range(self.npoints): # Make sure to ge the last one too
-				self._points[ip].xyz = np.matmul(R,self._points[ip].xyz - o.xyz) + o.xyz
+			# Project the points (including the last one)
+			self._xyz[:,:]  = np.matmul(self._xyz - o.xyz,R.T) + o.xyz
+			self._hash      = None
+			self._index     = None
+			self._grid      = None
+			self._prefilter = None
+			self._convex    = None
+			self._kind      = None
+			# Update the bounding box and the centroid
+			self._bbox      = Ball.fastBall(self)
+			self._centroid  = self.compute_centroid()
+			return self
+
+		def build_index(self,nslabs=0):
+			'''
+			Build the slab index of the polygon, i.e., sort its edges
+			in slabs in y so that each query only visits the edges that
+			overlap its y coordinate. The number of slabs is chosen from
+			the number of edges when nslabs is 0.
+
+			The index is built on the first call to areinside with enough
+			points and it is dropped when the points of the polygon change.
+			'''
+			n, y = self.npoints, self.y
+			if n == 0: return self
+			y0, y1 = np.min(y[:n]), np.max(y[:n])
+			ns     = nslabs if nslabs > 0 else max(1,min(n//IDX_EDGES_PER_SLAB,IDX_MAX_SLABS))
+			idy    = ns/(y1 - y0) if y1 > y0 else 0.
+			# Slabs overlapped by each edge
+			j0  = _slab(np.minimum(y[:-1],y[1:]),y0,idy,ns)
+			j1  = _slab(np.maximum(y[:-1],y[1:]),y0,idy,ns)
+			cnt = j1 - j0 + 1
+			# Store the edges of each slab contiguously (CSR format)
+			edges = np.repeat(np.arange(n),cnt)
+			slabs = _expand(j0,cnt)
+			order = np.argsort(slabs,kind='stable')
+			off   = np.zeros((ns+1,),dtype=int)
+			off[1:] = np.cumsum(np.bincount(slabs,minlength=ns))
+			self._index = (y0,y1,idy,off,edges[order])
+			return self
+
+		def clear_index(self):
+			'''
+			Drop the slab index of the polygon.
+			'''
+			self._index = None
+			return self
+
+		def build_grid(self,nx=0,ny=0):
+			'''
+			Build a uniform grid of nx by ny cells over the bounding box
+			of the polygon, where each cell is classified as inside, outside
+			or boundary. Points on inside or outside cells are answered with
+			a lookup and points on boundary cells only test the edges of their
+			cell. The number of cells is chosen from the number of edges when
+			nx or ny are 0.
+
+			The grid is dropped when the points of the polygon change.
+			'''
+			self._grid = None
+			if self.npoints == 0: return self
+			if not self.indexed and self.npoints >= IDX_MINEDGES: self.build_index()
+			self._grid = self._make_grid(nx,ny)
 			return self
 
+		def _make_grid(self,nx,ny):
+			'''
+			Build the cell grid (see build_grid), returns None for
+			a degenerated polygon.
+			'''
+			n, x, y = self.npoints, self.x, self.y
+			x0, x1, y0, y1 = np.min(x[:n]), np.max(x[:n]), np.min(y[:n]), np.max(y[:n])
+			if not x1 > x0 or not y1 > y0: return None # Degenerated polygon
+			# Number of cells, keeping them as square as possible
+			if nx <= 0 or ny <= 0:
+				ncells = float(min(max(GRID_CELLS_PER_EDGE*n,1),GRID_MAX_CELLS))
+				nx = max(1,int(np.sqrt(ncells*(x1 - x0)/(y1 - y0))))
+				ny = max(1,int(ncells/nx))
+			dx, dy = (x1 - x0)/nx, (y1 - y0)/ny
+			# Rows crossed by each edge, enlarged by a small tolerance
+			ax, ay, bx, by = x[:-1], y[:-1], x[1:], y[1:]
+			xmin, xmax, ymin, ymax = np.minimum(ax,bx), np.maximum(ax,bx), np.minimum(ay,by), np.maximum(ay,by)
+			j0, j1 = _cell(ymin-GRID_EPS*dy,y0,dy,ny), _cell(ymax+GRID_EPS*dy,y0,dy,ny)
+			e  = np.repeat(np.arange(n),j1 - j0 + 1)
+			j  = _expand(j0,j1 - j0 + 1)
+			# Part of the edge within each row and cells crossed
+			ya = np.clip(y0 + j*dy,ymin[e],ymax[e])
+			yb = np.clip(y0 + (j+1)*dy,ymin[e],ymax[e])
+			xa, xb = xmin[e], xmax[e]
+			s  = by[e] != ay[e]
+			es = e[s]
+			xa[s] = np.clip(ax[es] + (ya[s] - ay[es])*(bx[es] - ax[es])/(by[es] - ay[es]),xmin[es],xmax[es])
+			xb[s] = np.clip(ax[es] + (yb[s] - ay[es])*(bx[es] - ax[es])/(by[es] - ay[es]),xmin[es],xmax[es])
+			i0, i1 = _cell(np.minimum(xa,xb)-GRID_EPS*dx,x0,dx,nx), _cell(np.maximum(xa,xb)+GRID_EPS*dx,x0,dx,nx)
+			ecell = _expand(nx*j + i0,i1 - i0 + 1)
+			eedge = np.repeat(e,i1 - i0 + 1)
+			# Store the edges of each cell (CSR format)
+			off = np.zeros((nx*ny+1,),dtype=int)
+			off[1:] = np.cumsum(np.bincount(ecell,minlength=nx*ny))
+			edges = eedge[np.argsort(ecell,kind='stable')]
+			# Classify the cell centers
+			cxyz   = _cell_centers(np.arange(nx*ny),(x0,x1,y0,y1,dx,dy,nx,ny,None,off,edges))
+			inside = _cn_edges(cxyz,self) == 1
+			status = np.where(off[1:] > off[:-1],np.where(inside,CELL_BOUNDARY_IN,CELL_BOUNDARY_OUT),np.where(inside,CELL_INSIDE,CELL_OUTSIDE))
+			# Boundary cells whose center is (almost) on an edge fall
+			# back to the full test, the status of the center is not reliable
+			cxyz = cxyz[ecell]
+			tol  = GRID_EPS*np.maximum(np.abs(bx[eedge]-ax[eedge]),np.abs(by[eedge]-ay[eedge]))*max(dx,dy)
+			left = (bx[eedge] - ax[eedge])*(cxyz[:,1] - ay[eedge]) - (cxyz[:,0] - ax[eedge])*(by[eedge] - ay[eedge])
+			status[ecell[np.abs(left) <= tol]] = CELL_MIXED
+			return (x0,x1,y0,y1,dx,dy,nx,ny,status.astype(np.int8),off,edges)
+
+		def clear_grid(self):
+			'''
+			Drop the cell grid of the polygon.
+			'''
+			self._grid = None
+			return self
+
+		def build_prefilter(self):
+			'''
+			Build the prefilter of the polygon, i.e., the axis aligned box
+			and the minimal enclosing circle, to reject points, and an
+			inscribed circle and rectangles, to accept points, without
+			visiting the edges.
+
+			The prefilter is built on the first call to areinside with enough
+			points and it is dropped when the points of the polygon change.
+			'''
+			self._prefilter = None
+			n, x, y = self.npoints, self.x, self.y
+			if n == 0: return self
+			# Axis aligned box
+			x0, x1, y0, y1 = np.min(x[:n]), np.max(x[:n]), np.min(y[:n]), np.max(y[:n])
+			# Minimal enclosing circle, enlarged by a small tolerance
+			c  = _min_circle(x[:n],y[:n])
+			cr = np.sqrt(c[2]) + PRE_EPS*max(x1 - x0,y1 - y0)
+			self._prefilter = ([x1,x0,y1,y0],[c[0],c[1],cr*cr],[0.,0.,0.],np.zeros((0,4),dtype=np.double))
+			# Inside cells of a coarse grid
+			if not x1 > x0 or not y1 > y0: return self # Degenerated polygon
+			nx   = max(1,int(np.sqrt(PRE_CELLS*(x1 - x0)/(y1 - y0))))
+			ny   = max(1,PRE_CELLS//nx)
+			grid = self._make_grid(nx,ny)
+			if grid is None: return self
+			dx, dy = grid[4], grid[5]
+			inside = (grid[8] == CELL_INSIDE).reshape((ny,nx))
+			# Inscribed rectangles, the largest rectangles of inside cells
+			mask, rects = inside.copy(), []
+			for k in range(PRE_NRECTS):
+				r = _max_rectangle(mask)
+				if r is None: break
+				i0, i1, j0, j1 = r
+				mask[j0:j1+1,i0:i1+1] = False
+				rects.append([x0 + (i1 + 1 - PRE_EPS)*dx,x0 + (i0 + PRE_EPS)*dx,y0 + (j1 + 1 - PRE_EPS)*dy,y0 + (j0 + PRE_EPS)*dy])
+			rects = np.array(rects,dtype=np.double).reshape((-1,4))
+			# Inscribed circle, centered at the inside cell farthest from the other cells
+			dist = _chessboard(inside).ravel()
+			cmax = np.argmax(dist)
+			if dist[cmax] == 0:
+				self._prefilter = (self._prefilter[0],self._prefilter[1],[0.,0.,0.],rects)
+				return self
+			C  = _cell_centers(np.array([cmax]),grid)[0]
+			ax, ay, ex, ey = x[:-1], y[:-1], x[1:] - x[:-1], y[1:] - y[:-1]
+			l2 = ex*ex + ey*ey
+			t  = np.clip(((C[0] - ax)*ex + (C[1] - ay)*ey)/np.where(l2 > 0.,l2,1.),0.,1.)
+			r2 = np.min((ax + t*ex - C[0])**2 + (ay + t*ey - C[1])**2)
+			self._prefilter = (self._prefilter[0],self._prefilter[1],[C[0],C[1],r2*(1. - PRE_EPS)],rects)
+			return self
+
+		def clear_prefilter(self):
+			'''
+			Drop the prefilter of the polygon.
+			'''
+			self._prefilter = None
+			return self
+
+		def build_convex(self):
+			'''
+			Find if the polygon is convex on the xy plane and, if so, sort
+			its upward and downward edges in y, so that each query only needs
+			a binary search on each chain of edges.
+
+			The check is done when the polygon is classified (see kind), i.e.,
+			when it is built, and redone after the points of the polygon change.
+			'''
+			self._convex = _convex_chains(self)
+			return self
+
+		def clear_convex(self):
+			'''
+			Drop the convex chains of the polygon.
+			'''
+			self._convex = None
+			return self
+
+		def classify(self):
+			'''
+			Classify the shape of the polygon (see kind) to choose the
+			kernel of the crossing number (see kernel):
+				- rectangle: axis aligned rectangles, tested by comparing
+				  the intervals of the rectangle (half open as cn_PinPoly).
+				- convex: convex polygons, tested with a binary search on
+				  their chains of edges (see build_convex).
+				- simple: general polygons with few edges, tested with a
+				  plain loop over the edges.
+				- large: general polygons with many edges, tested with the
+				  slab index (or the cell grid when built).
+			The classification is dropped when the points of the polygon
+			change and redone on the next call to areinside.
+			'''
+			self.build_convex()
+			n, x, y    = self.npoints, self.x, self.y
+			self._kind = 'large' if n >= IDX_MINEDGES else 'simple'
+			if not self.convex: return self
+			self._kind = 'convex'
+			# A convex polygon with all its edges aligned with the axes
+			# is its bounding box
+			if np.any(np.logical_and(x[1:] != x[:-1],y[1:] != y[:-1])): return self
+			self._rect = (np.max(x[:n]),np.min(x[:n]),np.max(y[:n]),np.min(y[:n]))
+			self._kind = 'rectangle'
+			return self
+
+		def prefilter(self,xyz):
+			'''
+			Classify the points using only the bounding ball and the
+			prefilter: -1 = outside, 1 = inside and 0 = unknown.
+			The points are given as an array of shape (npoints,2) or
+			(npoints,3), read as in areinside.
+			'''
+			xyz = _points(xyz)
+			out = np.where(self.bbox > xyz,0,-1).astype(np.int8)
+			if self._prefilter is not None:
+				f = _prefilter_test(xyz,self._prefilter)
+				out[f < 0] = -1
+				out[np.logical_and(f > 0,out == 0)] = 1
+			return out
+
 		@classmethod
 		def from_array(cls,xyz):
 			'''
 			Build a polygon from an array of points
 			of shape (npoints,3).
 			'''
-			pointList = [Point.from_array(xyz[ii,:]) for ii in range(xyz.shape[0])] 
-			return cls(pointList)
+			return cls(np.asarray(xyz,dtype=np.double))
 
 		@property
 		def npoints(self):
-			return len(self._points) - 1
+			return self._xyz.shape[0] - 1
 		@property
 		def points(self):
-			return self._points
+			return np.array([self[ip] for ip in range(self.npoints)],dtype=object)
 		@points.setter
 		def points(self,value):
-			self._points = value
+			self._set_points(value)
+		@property
+		def hash(self):
+			'''
+			Content hash of the vertices, used to cache the masks. It is
+			computed on demand and dropped when the vertices change.
+			'''
+			if self._hash is None: self._hash = cache.content_hash(self._xyz)
+			return self._hash
+		@property
+		def indexed(self):
+			return self._index is not None
+		@property
+		def gridded(self):
+			return self._grid is not None
+		@property
+		def prefiltered(self):
+			return self._prefilter is not None
+		@property
+		def convex(self):
+			return self._convex is not None and self._convex is not False
+		@property
+		def kind(self):
+			'''
+			Shape of the polygon: 'rectangle' (axis aligned), 'convex',
+			'simple' (few edges) or 'large' (many edges).
+			'''
+			if self._kind is None: self.classify()
+			return self._kind
+		@property
+		def kernel(self):
+			'''
+			Kernel of the crossing number used by the next query: 'interval',
+			'convex', 'grid', 'index' or 'edges'. Large polygons use the
+			edges until their index is built, i.e., on the first call to
+			areinside with enough points (or with build_index).
+			'''
+			return _kernel(self.kind,self.convex,self.gridded,self.indexed)
+		@property
+		def aabb(self):
+			'''
+			Axis aligned box of the prefilter as [xmax,xmin,ymax,ymin].
+			'''
+			return None if self._prefilter is None else np.array(self._prefilter[0],dtype=np.double)
+		@property
+		def enclosing_circle(self):
+			'''
+			Minimal enclosing circle of the prefilter.
+			'''
+			if self._prefilter is None: return None
+			c = self._prefilter[1]
+			return Ball(Point(c[0],c[1],0.),np.sqrt(c[2]))
+		@property
+		def inscribed_circle(self):
+			'''
+			Inscribed circle of the prefilter (empty if none).
+			'''
+			if self._prefilter is None: return None
+			c = self._prefilter[2]
+			return Ball(Point(c[0],c[1],0.),np.sqrt(c[2]))
+		@property
+		def inscribed_rectangles(self):
+			'''
+			Inscribed rectangles of the prefilter as an array
+			of shape (nrects,4) of [xmax,xmin,ymax,ymin].
+			'''
+			return None if self._prefilter is None else self._prefilter[3].copy()
+		@property
+		def grid_cells(self):
+			'''
+			Status of the cells of the grid as an array of shape (ny,nx),
+			0 = outside, 1 = inside and 2 = boundary.
+			'''
+			if self._grid is None: return None
+			nx, ny, status = self._grid[6], self._grid[7], self._grid[8]
+			return np.minimum(status,2).reshape((ny,nx))
 		@property
 		def bbox(self):
 			return self._bbox
@@ -571,14 +1100,19 @@ class Polygon(object):
 		def centroid(self,value):
 			self._centroid = value
 		@property
+		def xyz(self):
+			out = self._xyz[:self.npoints,:]
+			out.flags.writeable = False
+			return out
+		@property
 		def x(self):
-			return np.array([p.x for p in self._points])
+			return self._coord(0)
 		@property
 		def y(self):
-			return np.array([p.y for p in self._points])
+			return self._coord(1)
 		@property
 		def z(self):
-			return np.array([p.z for p in self._points])
+			return self._coord(2)
 
 
 def cn_PinPoly(point, poly):
@@ -602,15 +1136,16 @@ def cn_PinPoly(point, poly):
 	Users of this code must verify correctness for their application.
 	'''
 	cn = 0 # The crossing number counter
+	x, y = poly.x, poly.y
 	# Loop through all edges of the Polygon
 	for ip in range(poly.npoints): 
 		# an upward crossing or a downward crossing
-		if ( (poly[ip][1] <= point[1]) and (poly[ip+1][1] >  point[1]) ) or \
-		   ( (poly[ip][1] >  point[1]) and (poly[ip+1][1] <= point[1]) ):
+		if ( (y[ip] <= point[1]) and (y[ip+1] >  point[1]) ) or \
+		   ( (y[ip] >  point[1]) and (y[ip+1] <= point[1]) ):
 			# Compute  the actual edge-ray intersect x-coordinate
-			vt = (point[1] - poly[ip][1])/(poly[ip+1][1] - poly[ip][1])
+			vt = (point[1] - y[ip])/(y[ip+1] - y[ip])
 					
-			if point[0] <  poly[ip][0] + vt * (poly[ip+1][0] - poly[ip][0]): # P.x < intersect
+			if point[0] <  x[ip] + vt * (x[ip+1] - x[ip]): # P.x < intersect
 				cn += 1 # A valid crossing of y=P.y right of P.x
 	return not cn%2 == 0 # 0 if even (out), and 1 if  odd (in)
 
@@ -636,15 +1171,16 @@ def cn_PinPoly_vec(xyz, poly):
 	'''
 	npoints = xyz.shape[0]
 	cn = np.zeros((npoints,)) # The crossing number counter
+	x, y = poly.x, poly.y
 	# Loop through all edges of the Polygon
 	for ip in range(poly.npoints): 
 		vt   = np.zeros((npoints,))
 		idx2 = np.zeros((npoints,),dtype=bool)
 		# an upward crossing or a downward crossing
-		ip_poly_tile0  = np.tile(poly[ip][0],(npoints,))
-		ip_poly_tile1  = np.tile(poly[ip][1],(npoints,))
-		ip1_poly_tile0 = np.tile(poly[ip+1][0],(npoints,))
-		ip1_poly_tile1 = np.tile(poly[ip+1][1],(npoints,))
+		ip_poly_tile0  = np.tile(x[ip],(npoints,))
+		ip_poly_tile1  = np.tile(y[ip],(npoints,))
+		ip1_poly_tile0 = np.tile(x[ip+1],(npoints,))
+		ip1_poly_tile1 = np.tile(y[ip+1],(npoints,))
 		
 		idx1 = np.logical_or( np.logical_and(ip_poly_tile1 <= xyz[:,1],ip1_poly_tile1 >  xyz[:,1]),
 			np.logical_and(ip_poly_tile1 >  xyz[:,1],ip1_poly_tile1 <= xyz[:,1]) )
@@ -678,15 +1214,16 @@ def wn_PinPoly(point, poly):
 	Users of this code must verify correctness for their application.
 	'''
 	wn = 0 # The  winding number counter
+	y = poly.y
 
 	# Loop through all the edges of the polygon
 	for ip in range(poly.npoints): 		 				  # edge from V[i] to  V[i+1]
-		if poly[ip][1] <= point[1]: 	 				  # start y <= P.y
-			if poly[ip+1][1] > point[1]: 				  # an upward crossing
+		if y[ip] <= point[1]: 	 				  # start y <= P.y
+			if y[ip+1] > point[1]: 				  # an upward crossing
 				if point.isLeft(poly[ip],poly[ip+1]) > 0: # P left of  edge
 					wn += 1 							  # have  a valid up intersect
 		else:											  # start y > P.y (no test needed)
-			if poly[ip+1][1] <= point[1]: 				  # a downward crossing
+			if y[ip+1] <= point[1]: 				  # a downward crossing
 				if point.isLeft(poly[ip],poly[ip+1]) < 0: # P left of  edge
 					wn -= 1
 	return wn
@@ -712,13 +1249,14 @@ def wn_PinPoly_vec(xyz, poly):
 	'''
 	npoints = xyz.shape[0]
 	wn = np.zeros((npoints,)) # The  winding number counter
+	x, y = poly.x, poly.y
 
 	# Loop through all the edges of the polygon
 	for ip in range(poly.npoints): 		 				  # edge from V[i] to  V[i+1]
-		ip_poly_tile0  = np.tile(poly[ip][0],(npoints,))
-		ip_poly_tile1  = np.tile(poly[ip][1],(npoints,))
-		ip1_poly_tile0 = np.tile(poly[ip+1][0],(npoints,))
-		ip1_poly_tile1 = np.tile(poly[ip+1][1],(npoints,))
+		ip_poly_tile0  = np.tile(x[ip],(npoints,))
+		ip_poly_tile1  = np.tile(y[ip],(npoints,))
+		ip1_poly_tile0 = np.tile(x[ip+1],(npoints,))
+		ip1_poly_tile1 = np.tile(y[ip+1],(npoints,))
 		c1 = np.zeros((npoints,),dtype=bool)
 		c2 = np.zeros((npoints,),dtype=bool)
 		c3 = np.zeros((npoints,),dtype=bool)
@@ -736,4 +1274,482 @@ def wn_PinPoly_vec(xyz, poly):
 		c3[c2]  = Point.areLeft(xyz[c2],poly[ip],poly[ip+1]) < 0  # P left of  edge
 		wn[c3] -= 1
 
-	return wn
\ No newline at end of file
+	return wn
+
+
+def _slab(y, y0, idy, ns):
+	'''
+	Slab of the index that contains each y coordinate.
+	'''
+	return np.clip((np.asarray(y) - y0)*idy,0,ns-1).astype(int)
+
+def _expand(start, cnt):
+	'''
+	Concatenation of the ranges start[i], ..., start[i]+cnt[i]-1.
+	'''
+	return np.repeat(start - np.cumsum(cnt) + cnt,cnt) + np.arange(np.sum(cnt))
+
+def _cell(v, v0, dv, nn):
+	'''
+	Row or column of the grid that contains each coordinate.
+	'''
+	return np.clip((np.asarray(v) - v0)/dv,0,nn-1).astype(int)
+
+def _cell_centers(c, grid):
+	'''
+	Centers of the cells of the grid.
+	'''
+	x0, y0, dx, dy, nx = grid[0], grid[2], grid[4], grid[5], grid[6]
+	out = np.zeros((c.shape[0],3),dtype=np.double)
+	out[:,0] = x0 + (c%nx + 0.5)*dx
+	out[:,1] = y0 + (c//nx + 0.5)*dy
+	return out
+
+def _cn_edges(xyz, poly):
+	'''
+	Crossing number test on the edges of the polygon,
+	using the slab index if available.
+	'''
+	return cn_PinPoly_idx(xyz,poly) if poly.indexed else cn_PinPoly_vec(xyz,poly).astype(int)
+
+def _slab_pairs(xyz, poly):
+	'''
+	Pairs (point, edge) of each point with the edges
+	of its slab on the index of the polygon.
+	'''
+	y0, y1, idy, off, edges = poly._index
+	inr  = np.where(np.logical_and(xyz[:,1] >= y0,xyz[:,1] <= y1))[0]
+	j    = _slab(xyz[inr,1],y0,idy,off.shape[0]-1)
+	cnt  = off[j+1] - off[j]
+	ipts = np.repeat(inr,cnt)
+	iedg = edges[_expand(off[j],cnt)]
+	return ipts, iedg
+
+def _circle2(ax, ay, bx, by):
+	'''
+	Circle with diameter ab as [cx,cy,r2].
+	'''
+	cx, cy = 0.5*(ax + bx), 0.5*(ay + by)
+	return [cx,cy,(ax - cx)**2 + (ay - cy)**2]
+
+def _circle3(ax, ay, bx, by, dx, dy):
+	'''
+	Circle through a, b and d as [cx,cy,r2], or the circle of
+	the farthest pair if they are collinear.
+	'''
+	ux, uy, vx, vy = bx - ax, by - ay, dx - ax, dy - ay
+	det = 2.*(ux*vy - uy*vx)
+	if det == 0.:
+		return max([_circle2(ax,ay,bx,by),_circle2(ax,ay,dx,dy),_circle2(bx,by,dx,dy)],key=lambda c: c[2])
+	u2, v2 = ux*ux + uy*uy, vx*vx + vy*vy
+	cx, cy = (vy*u2 - uy*v2)/det, (ux*v2 - vx*u2)/det
+	return [ax + cx,ay + cy,cx*cx + cy*cy]
+
+def _min_circle(x, y):
+	'''
+	Minimal circle enclosing the points (in 2D) as [cx,cy,r2] using
+	the iterative form of [Welzl, 1991] on the points randomly shuffled.
+	The points outside the circle are searched with numpy.
+	'''
+	order = np.random.RandomState(0).permutation(x.shape[0])
+	x, y  = x[order], y[order]
+	def outside(c, i0, i1):
+		k = np.nonzero((x[i0:i1] - c[0])**2 + (y[i0:i1] - c[1])**2 > c[2]*(1. + 1e-12))[0]
+		return i0 + k[0] if k.shape[0] > 0 else -1
+	c = [x[0],y[0],0.]
+	i = outside(c,1,x.shape[0])
+	while i >= 0:
+		c = [x[i],y[i],0.]
+		j = outside(c,0,i)
+		while j >= 0:
+			c = _circle2(x[i],y[i],x[j],y[j])
+			k = outside(c,0,j)
+			while k >= 0:
+				c = _circle3(x[i],y[i],x[j],y[j],x[k],y[k])
+				k = outside(c,k+1,j)
+			j = outside(c,j+1,i)
+		i = outside(c,i+1,x.shape[0])
+	return c
+
+def _max_rectangle(mask):
+	'''
+	Largest rectangle of True cells of a (ny,nx) mask using the
+	histogram of each row, returns (i0,i1,j0,j1) or None.
+	'''
+	ny, nx = mask.shape
+	h, best, out = np.zeros((nx+1,),dtype=int), 0, None
+	for j in range(ny):
+		h[:nx] = np.where(mask[j,:],h[:nx] + 1,0)
+		st = []
+		for i in range(nx+1):
+			while len(st) > 0 and h[st[-1]] >= h[i]:
+				hh = h[st.pop()]
+				i0 = st[-1] + 1 if len(st) > 0 else 0
+				if hh*(i - i0) > best: best, out = hh*(i - i0), (i0,i-1,j-hh+1,j)
+			st.append(i)
+	return out
+
+def _chessboard(mask):
+	'''
+	Chessboard distance of the True cells of a (ny,nx) mask to
+	the False cells, the cells outside the mask are False.
+	'''
+	dist, cur = mask.astype(int), mask.copy()
+	while np.any(cur):
+		pad = np.pad(cur,1)
+		ny, nx = cur.shape
+		for dj in (0,1,2):
+			for di in (0,1,2):
+				cur = np.logical_and(cur,pad[dj:dj+ny,di:di+nx])
+		dist += cur
+	return dist
+
+def _prefilter_test(xyz, pre):
+	'''
+	Classify the points with the prefilter of a polygon:
+	-1 = outside, 1 = inside and 0 = unknown.
+	'''
+	aabb, circ, icirc, rects = pre
+	x, y = xyz[:,0], xyz[:,1]
+	out  = np.zeros((xyz.shape[0],),dtype=np.int8)
+	# Accept inside the inscribed circle or rectangles
+	acc  = (x - icirc[0])**2 + (y - icirc[1])**2 < icirc[2]
+	for r in rects:
+		acc = np.logical_or(acc,np.logical_and(np.logical_and(x <= r[0],x >= r[1]),np.logical_and(y <= r[2],y >= r[3])))
+	out[acc] = 1
+	# Reject outside the box and the enclosing circle
+	rej  = np.logical_or(np.logical_or(x < aabb[1],x > aabb[0]),np.logical_or(y < aabb[3],y > aabb[2]))
+	rej  = np.logical_or(rej,(x - circ[0])**2 + (y - circ[1])**2 > circ[2])
+	out[rej] = -1
+	return out
+
+def _crossings(y, poly):
+	'''
+	Sorted x coordinates where the edges of the polygon cross the
+	line at y (same crossing rule as cn_PinPoly).
+	'''
+	ax, ay, bx, by = poly.x[:-1], poly.y[:-1], poly.x[1:], poly.y[1:]
+	c = ((ay <= y) & (by > y)) | ((ay > y) & (by <= y))
+	vt = (y - ay[c]) / (by[c] - ay[c])
+	return np.sort(ax[c] + vt * (bx[c] - ax[c]))
+
+def _convex_chains(poly):
+	'''
+	Upward and downward edges of a polygon that is convex on the xy
+	plane, sorted in y, with the lowest y of each edge. False if the
+	polygon is not convex.
+	'''
+	x, y    = poly.x, poly.y
+	dx, dy  = x[1:] - x[:-1], y[1:] - y[:-1]
+	e = np.flatnonzero(np.logical_or(dx != 0.,dy != 0.)) # Edges of non zero length
+	if e.shape[0] < 3: return False
+	# All the turns must have the same sign
+	c = dx[e]*np.roll(dy[e],-1) - dy[e]*np.roll(dx[e],-1)
+	if not np.all(c >= 0.) and not np.all(c <= 0.): return False
+	if np.all(c == 0.): return False # All the edges are aligned
+	# Split in the upward and downward chains (horizontal edges never cross)
+	up = np.flatnonzero(dy > 0.)
+	dn = np.flatnonzero(dy < 0.)
+	up = up[np.argsort(y[up],kind='stable')]
+	dn = dn[np.argsort(y[dn+1],kind='stable')]
+	# The edges of each chain must not overlap in y
+	if np.any(y[up[:-1]+1] > y[up[1:]]) or np.any(y[dn[:-1]] > y[dn[1:]+1]): return False
+	return (up,y[up],dn,y[dn+1])
+
+def cn_PinPoly_rect(xyz, poly):
+	'''
+	CN_PINPOLY
+
+	2D algorithm.
+	Crossing number test for an array of points in an axis aligned
+	rectangle (see Polygon.classify), which is the half open box of
+	the rectangle as in cn_PinPoly.
+
+	Input:   xyz = an array of points,
+	Return:  0 = outside, 1 = inside
+	'''
+	xmax, xmin, ymax, ymin = poly._rect
+	x, y = xyz[:,0], xyz[:,1]
+	return np.logical_and(np.logical_and(x >= xmin,x < xmax),np.logical_and(y >= ymin,y < ymax)).astype(int)
+
+def cn_PinPoly_convex(xyz, poly):
+	'''
+	CN_PINPOLY
+
+	2D algorithm.
+	Crossing number test for an array of points in a convex polygon
+	using its chains of edges (see Polygon.build_convex). Only one
+	edge of each chain can cross y=P.y, which is found by binary
+	search, so the result is the same as cn_PinPoly.
+
+	Input:   xyz = an array of points,
+	Return:  0 = outside, 1 = inside
+	'''
+	npoints = xyz.shape[0]
+	cn = np.zeros((npoints,),dtype=int) # The crossing number counter
+	x, y = poly.x, poly.y
+	px, py = xyz[:,0], xyz[:,1]
+	up, yup, dn, ydn = poly._convex
+	for e, ye in ((up,yup),(dn,ydn)):
+		if e.shape[0] == 0: continue
+		k = np.searchsorted(ye,py,side='right') - 1
+		ipts = np.flatnonzero(k >= 0)
+		iedg = e[k[ipts]]
+		# an upward crossing or a downward crossing
+		c = np.logical_or( np.logical_and(y[iedg] <= py[ipts],y[iedg+1] >  py[ipts]),
+			np.logical_and(y[iedg] >  py[ipts],y[iedg+1] <= py[ipts]) )
+		ipts, iedg = ipts[c], iedg[c]
+		# Compute  the actual edge-ray intersect x-coordinate
+		vt = (py[ipts] - y[iedg])/(y[iedg+1] - y[iedg])
+		c  = px[ipts] < x[iedg] + vt*(x[iedg+1] - x[iedg]) # P.x < intersect
+		cn[ipts[c]] += 1
+	return cn%2 # 0 if even (out), and 1 if  odd (in)
+
+def cn_PinPoly_idx(xyz, poly):
+	'''
+	CN_PINPOLY
+
+	2D algorithm.
+	Crossing number test for an array of points in a polygon
+	using the slab index of the polygon.
+
+	Input:   xyz = an array of points,
+	Return:  0 = outside, 1 = inside
+	'''
+	npoints = xyz.shape[0]
+	cn = np.zeros((npoints,),dtype=int) # The crossing number counter
+	x, y = poly.x, poly.y
+	for i0 in range(0,npoints,IDX_CHUNK):
+		ipts, iedg = _slab_pairs(xyz[i0:i0+IDX_CHUNK],poly)
+		px, py = xyz[i0+ipts,0], xyz[i0+ipts,1]
+		# an upward crossing or a downward crossing
+		c = np.logical_or( np.logical_and(y[iedg] <= py,y[iedg+1] >  py),
+			np.logical_and(y[iedg] >  py,y[iedg+1] <= py) )
+		ipts, iedg, px, py = ipts[c], iedg[c], px[c], py[c]
+		# Compute  the actual edge-ray intersect x-coordinate
+		vt = (py - y[iedg])/(y[iedg+1] - y[iedg])
+		c  = px < x[iedg] + vt*(x[iedg+1] - x[iedg]) # P.x < intersect
+		cn[i0:i0+IDX_CHUNK] += np.bincount(ipts[c],minlength=min(IDX_CHUNK,npoints-i0))
+	return cn%2 # 0 if even (out), and 1 if  odd (in)
+
+def wn_PinPoly_idx(xyz, poly):
+	'''
+	WN_PINPOLY
+
+	2D algorithm.
+	Winding number test for an array of points in a polygon
+	using the slab index of the polygon.
+
+	Input:   xyz = an array of points,
+	Return:  wn = the winding number (=0 only when P is outside)
+	'''
+	npoints = xyz.shape[0]
+	wn = np.zeros((npoints,),dtype=int) # The  winding number counter
+	x, y = poly.x, poly.y
+	for i0 in range(0,npoints,IDX_CHUNK):
+		ipts, iedg = _slab_pairs(xyz[i0:i0+IDX_CHUNK],poly)
+		px, py = xyz[i0+ipts,0], xyz[i0+ipts,1]
+		left   = (x[iedg+1] - x[iedg])*(py - y[iedg]) - (px - x[iedg])*(y[iedg+1] - y[iedg])
+		up     = np.logical_and(np.logical_and(y[iedg] <= py,y[iedg+1] > py),left > 0)   # a valid up intersect
+		down   = np.logical_and(np.logical_and(y[iedg] > py,y[iedg+1] <= py),left < 0)   # a valid down intersect
+		nchunk = min(IDX_CHUNK,npoints-i0)
+		wn[i0:i0+IDX_CHUNK] += np.bincount(ipts[up],minlength=nchunk) - np.bincount(ipts[down],minlength=nchunk)
+	return wn
+
+def cn_PinPoly_grid(xyz, poly):
+	'''
+	CN_PINPOLY
+
+	2D algorithm.
+	Crossing number test for an array of points in a polygon
+	using the cell grid of the polygon. Points on boundary cells
+	change the parity of the cell center with each edge crossed
+	by the segment from the center to the point.
+
+	Input:   xyz = an array of points,
+	Return:  0 = outside, 1 = inside
+	'''
+	x0, x1, y0, y1, dx, dy, nx, ny, status, off, edges = poly._grid
+	npoints = xyz.shape[0]
+	cn = np.zeros((npoints,),dtype=int) # The crossing number counter
+	x, y = poly.x, poly.y
+	ig = np.where(np.logical_and(np.logical_and(xyz[:,0] >= x0,xyz[:,0] <= x1),np.logical_and(xyz[:,1] >= y0,xyz[:,1] <= y1)))[0]
+	c  = nx*_cell(xyz[ig,1],y0,dy,ny) + _cell(xyz[ig,0],x0,dx,nx)
+	st = status[c]
+	cn[ig[st == CELL_INSIDE]] = 1
+	im = ig[st == CELL_MIXED]
+	cn[im] = _cn_edges(xyz[im],poly)
+	# Boundary cells
+	bnd = np.logical_or(st == CELL_BOUNDARY_IN,st == CELL_BOUNDARY_OUT)
+	ib, cb = ig[bnd], c[bnd]
+	for i0 in range(0,ib.shape[0],IDX_CHUNK):
+		ibc, cbc = ib[i0:i0+IDX_CHUNK], cb[i0:i0+IDX_CHUNK]
+		cnc  = (status[cbc] == CELL_BOUNDARY_IN).astype(int)
+		cnt  = off[cbc+1] - off[cbc]
+		ipts = np.repeat(np.arange(ibc.shape[0]),cnt)
+		iedg = edges[_expand(off[cbc],cnt)]
+		px, py = xyz[ibc[ipts],0], xyz[ibc[ipts],1]
+		cxyz   = _cell_centers(cbc[ipts],poly._grid)
+		ax, ay, bx, by = x[iedg], y[iedg], x[iedg+1], y[iedg+1]
+		sP   = (bx - ax)*(py - ay) - (px - ax)*(by - ay)
+		sC   = (bx - ax)*(cxyz[:,1] - ay) - (cxyz[:,0] - ax)*(by - ay)
+		sa   = (px - cxyz[:,0])*(ay - cxyz[:,1]) - (ax - cxyz[:,0])*(py - cxyz[:,1])
+		sb   = (px - cxyz[:,0])*(by - cxyz[:,1]) - (bx - cxyz[:,0])*(py - cxyz[:,1])
+		# Edges crossed by the segment from the center
+		cross = np.logical_and((sa > 0) != (sb > 0),(sC > 0) != (sP > 0))
+		cnc   = (cnc + np.bincount(ipts[cross],minlength=ibc.shape[0]))%2
+		# Points within rounding of an edge (|sP| is their distance times
+		# the edge length) use the same rule as the full test
+		d  = EDGE_EPS*np.maximum(np.maximum(np.abs(px),np.abs(py)),np.maximum(np.maximum(np.abs(ax),np.abs(ay)),np.maximum(np.abs(bx),np.abs(by))))
+		on = np.logical_and(np.logical_and(sP*sP <= d*d*((bx - ax)**2 + (by - ay)**2),np.logical_and(px >= np.minimum(ax,bx) - d,px <= np.maximum(ax,bx) + d)),
+			np.logical_and(py >= np.minimum(ay,by) - d,py <= np.maximum(ay,by) + d))
+		on = np.unique(ipts[on])
+		cnc[on] = _cn_edges(xyz[ibc[on]],poly)
+		cn[ibc] = cnc
+	return cn
+
+
+def areinside_first(polys, x, y=None, nthreads=0, dtype=np.int32):
+	'''
+	Returns, for each point, the position of the first polygon of polys
+	that contains it or -1 if it is not inside any of them. Only the
+	points that have not been assigned yet are tested against the next
+	polygon.
+
+	The points are given either as an array x of shape (npoints,2) or
+	(npoints,3) or as two arrays of coordinates x and y. The output is
+	of type dtype (int8, int16 or int32).
+	'''
+	xyz  = _points(x,y)
+	out  = -np.ones((xyz.shape[0],),dtype=dtype)
+	if not out.dtype.kind == 'i' or out.dtype.itemsize > 4: raise ValueError('Label type <%s> not supported!'%out.dtype)
+	if len(polys) > np.iinfo(out.dtype).max + 1: raise ValueError('Too many polygons for labels of type <%s>!'%out.dtype)
+	cand = np.arange(xyz.shape[0])
+	for k, poly in enumerate(polys):
+		if cand.shape[0] == 0: break
+		if poly.isempty(): continue
+		mask = Polygon._areinside(poly,xyz[cand,:],'cn')
+		out[cand[mask]] = k
+		cand = cand[np.logical_not(mask)]
+	return out
+
+def areinside_all(polys, x, y=None):
+	'''
+	Returns every polygon of polys that contains each point in CSR
+	format, as a tuple (offsets, indices): the polygons that contain
+	the point ip are polys[indices[offsets[ip]:offsets[ip+1]]], in
+	increasing order (see membership_bits for a packed bit matrix).
+
+	The points are given as in areinside_first.
+	'''
+	xyz = _points(x,y)
+	ip, ib = [], []
+	for k, poly in enumerate(polys):
+		if poly.isempty(): continue
+		inside = np.flatnonzero(Polygon._areinside(poly,xyz,'cn'))
+		ip.append(inside)
+		ib.append(np.full(inside.shape,k,dtype=np.int32))
+	ip = np.concatenate(ip) if len(ip) > 0 else np.zeros((0,),dtype=int)
+	ib = np.concatenate(ib) if len(ib) > 0 else np.zeros((0,),dtype=np.int32)
+	order   = np.lexsort((ib,ip))
+	offsets = np.zeros((xyz.shape[0]+1,),dtype=np.int64)
+	offsets[1:] = np.cumsum(np.bincount(ip,minlength=xyz.shape[0]))
+	return offsets, ib[order]
+
+def areinside_polyline(points, radius, x, y=None, nthreads=0):
+	'''
+	Returns True if the points are within a distance radius of a
+	polyline given by its points, of shape (n,2) or (n,3), else False
+	(i.e., inside the capsules of its segments). The distance is
+	measured in 3D as for the Ball, z is 0 when not given.
+
+	The points are given as in areinside_first.
+	'''
+	points = np.asarray(points,dtype=np.double)
+	if not points.ndim == 2 or points.shape[1] not in (2,3): raise ValueError('Polyline must be of shape (n,2) or (n,3)!')
+	p = np.zeros((points.shape[0],3),dtype=np.double)
+	p[:,:points.shape[1]] = points
+	q   = _points(x,y)
+	out = np.zeros((q.shape[0],),dtype=bool)
+	if p.shape[0] == 0: return out
+	# Only the points inside the box of the polyline (grown by radius),
+	# sorted in y so that each segment only visits the points of its band
+	lo, hi = np.min(p[:,:2],axis=0) - radius, np.max(p[:,:2],axis=0) + radius
+	cand   = np.flatnonzero(np.all((q[:,:2] >= lo) & (q[:,:2] <= hi),axis=1))
+	cand   = cand[np.argsort(q[cand,1],kind='stable')]
+	ycand  = q[cand,1]
+	for ii in range(max(p.shape[0]-1,1)):
+		a, b  = p[ii], p[min(ii+1,p.shape[0]-1)]
+		i0    = np.searchsorted(ycand,min(a[1],b[1]) - radius,side='left')
+		i1    = np.searchsorted(ycand,max(a[1],b[1]) + radius,side='right')
+		idx   = cand[i0:i1]
+		ab, av = b - a, q[idx] - a
+		l2    = np.dot(ab,ab)
+		t     = np.clip(np.dot(av,ab)/l2,0.,1.) if l2 > 0. else np.zeros((idx.shape[0],))
+		out[idx[np.sum((av - t[:,None]*ab)**2,axis=1) < radius*radius]] = True
+	return out
+
+def areinside_halfspaces(planes, x, y=None, nthreads=0):
+	'''
+	Returns True if the points are inside the intersection of the
+	half-spaces given by planes, an array of shape (nplanes,4) where
+	each row (a,b,c,d) contains the points with a*x + b*y + c*z + d < 0,
+	else False. z is 0 when not given. The points on a plane are inside
+	only if its normal (a,b,c) points to negative x (else negative y,
+	else negative z), i.e., the half-open rule of the crossing number
+	test, so that the regions sharing a plane do not share its points.
+
+	The points are given as in areinside_first.
+	'''
+	planes = np.asarray(planes,dtype=np.double)
+	if not planes.ndim == 2 or not planes.shape[1] == 4: raise ValueError('Half-spaces must be of shape (nplanes,4)!')
+	xyz = _points(x,y)
+	out = np.ones((xyz.shape[0],),dtype=bool)
+	for a, b, c, d in planes:
+		closed = a < 0. if not a == 0. else (b < 0. if not b == 0. else c < 0.)
+		s      = a*xyz[:,0] + b*xyz[:,1] + c*xyz[:,2] + d
+		out   &= s <= 0. if closed else s < 0.
+	return out
+
+
+TRANS_AFFINE, TRANS_SPHERE = 0, 1 # Kinds of transforms (see areinside_transform)
+
+def _apply_transform(kind, params, xyz):
+	'''
+	Apply the transform given by its kind and params (see
+	areinside_transform) to an array of points of shape (npoints,3).
+	'''
+	params = np.asarray(params,dtype=np.double).ravel()
+	out    = xyz.copy()
+	if kind == TRANS_AFFINE:
+		if not params.shape[0] == 6: raise ValueError('Affine transforms need 6 parameters!')
+		a, b, c, d, e, f = params
+		out[:,0] = a*xyz[:,0] + b*xyz[:,1] + c
+		out[:,1] = d*xyz[:,0] + e*xyz[:,1] + f
+	elif kind == TRANS_SPHERE:
+		if not params.shape[0] == 9: raise ValueError('Rotations of the sphere need 9 parameters!')
+		lon, lat = np.deg2rad(xyz[:,0]), np.deg2rad(xyz[:,1])
+		v = np.matmul(np.column_stack([np.cos(lat)*np.cos(lon),np.cos(lat)*np.sin(lon),np.sin(lat)]),params.reshape((3,3)).T)
+		out[:,0] = np.rad2deg(np.arctan2(v[:,1],v[:,0]))
+		out[:,1] = np.rad2deg(np.arctan2(v[:,2],np.hypot(v[:,0],v[:,1])))
+	else:
+		raise ValueError('Transform <%d> not supported!'%kind)
+	return out
+
+def areinside_transform(poly, kind, params, x, y=None, nthreads=0):
+	'''
+	Returns True if the points are inside the polygon seen through a
+	transform, else False. The inverse transform, which brings the
+	points to the frame of the polygon, is given by its kind and params:
+		- TRANS_AFFINE: (a,b,c,d,e,f) so that the points (X,Y) are
+		  classified at (a*X + b*Y + c, d*X + e*Y + f).
+		- TRANS_SPHERE: a rotation matrix (9 values, row major) of the
+		  unit vectors of the points given as (lon,lat) in degrees.
+	The polygon and its index and prefilter are shared by all the
+	transforms.
+
+	The points are given as in areinside_first.
+	'''
+	xyz = _points(x,y)
+	if poly.isempty(): return np.zeros((xyz.shape[0],),dtype=bool)
+	return Polygon._areinside(poly,_apply_transform(kind,params,xyz),'cn')
@@ -9,10 +9,19 @@ from __future__ import print_function, division
 import numpy as np
 cimport numpy as np
 
+from .       import stream, cache
+from .stream import STREAM_CHUNK, STREAM_NWORKERS
+
 from libcpp cimport bool
+from libcpp.vector cimport vector
+from libc.stdint cimport int8_t, int16_t, int32_t
+from cpython.exc cimport PyErr_CheckSignals
 
 # Declare the class with cdef
-cdef extern from "geometry.h" namespace "Geom":
+cdef extern from "geometry.h" namespace "Geom" nogil:
+	# Threads
+	void c_set_num_threads "Geom::set_num_threads"(const int nthreads)
+	int  c_get_num_threads "Geom::get_num_threads"()
 	# Point class
 	cdef cppclass CPoint "Geom::Point":
 		CPoint() except +
@@ -52,6 +61,25 @@ cdef extern from "geometry.h" namespace "Geom":
 		bool isempty() const
 		bool isinside(const CPoint &p) const
 		bool isdisjoint(const CBall &b) const
+		void areinside(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz) const
+		void areinside(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz) const
+	# Cell grid class
+	cdef cppclass CCellGrid "Geom::CellGrid":
+		int     get_nx() const
+		int     get_ny() const
+		int     get_status(const int c) const
+	# Prefilter class
+	cdef cppclass CPrefilter "Geom::Prefilter":
+		void    get_aabb(double *b) const
+		void    get_circle(double *c) const
+		void    get_incircle(double *c) const
+		int     get_nrects() const
+		void    get_rect(const int k, double *b) const
+	# Transform class
+	cdef cppclass CTransform "Geom::Transform":
+		CTransform() except +
+		void    set_affine(const double *a)
+		void    set_sphere(const double *r)
 	# Polygon class
 	cdef cppclass CPolygon "Geom::Polygon":
 		CPolygon() except +
@@ -59,12 +87,22 @@ cdef extern from "geometry.h" namespace "Geom":
 		CPolygon(const int nn, const CPoint &v) except +
 		CPolygon(const int nn, const CPoint *v) except +
 		void    set_npoints(const int nn)
+		void    set_buffer(const int nn, CPoint *v)
 		void    set_point(const int i, const CPoint &v)
 		void    set_points(const CPoint v)
 		void    set_points(const CPoint *v)
 		void    set_centroid(const CPoint v)
 		void    set_bbox(CBall &b)
 		void    clear()
+		void    build_index(const int nslabs)
+		void    clear_index()
+		void    build_grid(const int nx, const int ny)
+		void    clear_grid()
+		void    build_prefilter()
+		void    clear_prefilter()
+		void    build_convex()
+		void    clear_convex()
+		void    prepare(const int np)
 		void    set(const int nn, const CPoint &v)
 		void    set(const int nn, const CPoint *v)
 		CPoint *get_points() const
@@ -72,15 +110,111 @@ cdef extern from "geometry.h" namespace "Geom":
 		CPoint  get_centroid() const
 		int     get_npoints() const
 		CBall   get_bbox() const
+		bool    has_index() const
+		bool    want_index(const int np) const
+		const CCellGrid &get_grid() const
+		bool    has_grid() const
+		const CPrefilter &get_prefilter() const
+		bool    has_prefilter() const
+		bool    has_convex() const
+		int     get_kind() const
+		void    classify()
+		int     prefilter(const CPoint &v) const
 		bool    isempty() const
 		bool    isinside(const CPoint &v) const
 		bool    isinside_cn(const CPoint &v) const
 		bool    isinside_wn(const CPoint &v) const
-		void    areinside(bool *out, const double *xyz, const int np)
-		void    areinside_cn(bool *out, const double *xyz, const int np)
-		void    areinside_wn(bool *out, const double *xyz, const int np)
+		void    areinside(bool *out, const double *xyz, const int np, const int nthreads)
+		void    areinside_cn(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, const int nthreads)
+		void    areinside_cn(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, const int nthreads)
+		void    areinside_wn(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, const int nthreads)
+		void    areinside_wn(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, const int nthreads)
+		void    grid_mask(bool *out, const float *x, const int nx, const int sx, const float *y, const int ny, const int sy, const int *order, const int nthreads)
+		void    grid_mask(bool *out, const double *x, const int nx, const int sx, const double *y, const int ny, const int sy, const int *order, const int nthreads)
 		CPoint  compute_centroid()
 		void    rotate(const double theta[3], const CPoint o);
+	# Composed regions
+	void c_areinside_first_f "Geom::areinside_first"[T](T *out, const float *x, const float *y, const float *z, const int npoints, const int sx, const int sy, const int sz, CPolygon **polys, const int npolys, const int nthreads)
+	void c_areinside_first "Geom::areinside_first"[T](T *out, const double *x, const double *y, const double *z, const int npoints, const int sx, const int sy, const int sz, CPolygon **polys, const int npolys, const int nthreads)
+	void c_areinside_all_f "Geom::areinside_all"(vector[int] &off, vector[int] &idx, const float *x, const float *y, const float *z, const int npoints, const int sx, const int sy, const int sz, CPolygon **polys, const int npolys)
+	void c_areinside_all "Geom::areinside_all"(vector[int] &off, vector[int] &idx, const double *x, const double *y, const double *z, const int npoints, const int sx, const int sy, const int sz, CPolygon **polys, const int npolys)
+	void c_areinside_polyline_f "Geom::areinside_polyline"(bool *out, const float *x, const float *y, const float *z, const int npoints, const int sx, const int sy, const int sz, const CPoint *p, const int n, const double r, const int nthreads)
+	void c_areinside_polyline "Geom::areinside_polyline"(bool *out, const double *x, const double *y, const double *z, const int npoints, const int sx, const int sy, const int sz, const CPoint *p, const int n, const double r, const int nthreads)
+	void c_areinside_transform_f "Geom::areinside_transform"(bool *out, const float *x, const float *y, const float *z, const int npoints, const int sx, const int sy, const int sz, CPolygon *poly, const CTransform &tr, const int nthreads)
+	void c_areinside_transform "Geom::areinside_transform"(bool *out, const double *x, const double *y, const double *z, const int npoints, const int sx, const int sy, const int sz, CPolygon *poly, const CTransform &tr, const int nthreads)
+	void c_areinside_halfspaces_f "Geom::areinside_halfspaces"(bool *out, const float *x, const float *y, const float *z, const int npoints, const int sx, const int sy, const int sz, const double *planes, const int nplanes, const int nthreads)
+	void c_areinside_halfspaces "Geom::areinside_halfspaces"(bool *out, const double *x, const double *y, const double *z, const int npoints, const int sx, const int sy, const int sz, const double *planes, const int nplanes, const int nthreads)
+
+
+# Number of points classified between checks for signals (e.g., Ctrl-C)
+# while the GIL is released
+cdef int AREINSIDE_CHUNK = 65536
+
+POLYGON_KINDS = ('unknown','rectangle','convex','simple','large') # Shapes of the polygons (see Polygon.kind)
+
+def _kernel(kind,convex,gridded,indexed):
+	'''
+	Kernel of the crossing number for a shape of polygon and the
+	structures that it has built (same order as the dispatch of areinside).
+	'''
+	if kind == 'rectangle': return 'interval'
+	if convex:              return 'convex'
+	if gridded:             return 'grid'
+	return 'index' if indexed else 'edges'
+
+
+# Coordinates of the points that are classified without conversion
+ctypedef fused real:
+	float
+	double
+
+
+cdef inline int _stride(Py_ssize_t stride, Py_ssize_t size) except? -1:
+	'''
+	Stride of an array in number of items of the given size.
+	'''
+	if not stride % size == 0: raise ValueError('Strides must be a multiple of the size of the coordinates!')
+	return <int>(stride//size)
+
+cdef inline const real *_offset(const real *v, int ip, int sv) nogil:
+	'''
+	Pointer to the point ip of a strided array (NULL stays NULL).
+	'''
+	if v == NULL: return v
+	return v + <long>ip*sv
+
+
+def as_coordinates(*arrays):
+	'''
+	Returns the arrays of coordinates as float32 arrays if all of them
+	are float32, else as float64 arrays. The arrays are only copied if
+	they need to be converted.
+
+	Float32 coordinates are classified as they are, as they are exactly
+	representable in double precision. However, a float32 coordinate may
+	be up to half an ulp (e.g., ~1e-5 degrees at 180 degrees) away from
+	the value it was rounded from, so points that close to an edge may
+	be classified differently than their float64 originals.
+	'''
+	arrays = [np.asarray(v) for v in arrays]
+	dtype  = np.float32 if all([v.dtype == np.float32 for v in arrays]) else np.double
+	arrays = [np.asarray(v,dtype=dtype) for v in arrays]
+	return arrays[0] if len(arrays) == 1 else arrays
+
+
+def set_num_threads(int nthreads):
+	'''
+	Set the default number of threads used to classify arrays of
+	points. Only has effect when compiled with OpenMP (OPENMP_PARALL).
+	'''
+	c_set_num_threads(nthreads)
+
+def get_num_threads():
+	'''
+	Returns the default number of threads used to classify arrays
+	of points (1 when not compiled with OpenMP).
+	'''
+	return c_get_num_threads()
 
 
 # Class wrapping a point
@@ -398,15 +532,42 @@ cdef class Ball:
 		cdef bool out = self._ball.isinside(point._point)
 		return out
 
-	def areinside(Ball self,double[:,:] xyz):
-		cdef int ii, npoints = xyz.shape[0]
-		cdef CPoint p
+	cdef object _areinside(Ball self,const real[:,:] xyz):
+		'''
+		Classify the points of a strided array of float or double.
+		'''
+		cdef int ip = 0, npoints = xyz.shape[0]
 		cdef np.ndarray[np.npy_bool,ndim=1,cast=True] out = np.ndarray((npoints,),dtype=np.bool_)
-		for ii in range(npoints):
-			p       = CPoint(xyz[ii,0],xyz[ii,1],xyz[ii,2])
-			out[ii] = self._ball.isinside(p)
+		if npoints == 0: return out
+		cdef bool *pout = <bool*>np.PyArray_DATA(out)
+		cdef const real *x = &xyz[0,0]
+		cdef const real *y = &xyz[0,1]
+		cdef const real *z = &xyz[0,2] if xyz.shape[1] == 3 else NULL
+		cdef int sxyz = _stride(xyz.strides[0],sizeof(real))
+		# Run without the GIL, checking for signals after each chunk
+		with nogil:
+			while ip < npoints:
+				self._ball.areinside(pout+ip,_offset(x,ip,sxyz),_offset(y,ip,sxyz),_offset(z,ip,sxyz),min(AREINSIDE_CHUNK,npoints-ip),sxyz,sxyz,sxyz)
+				ip += AREINSIDE_CHUNK
+				with gil:
+					PyErr_CheckSignals()
 		return out
 
+	def areinside(Ball self,object xyz):
+		'''
+		Returns True if the points, given as an array of shape (npoints,2)
+		or (npoints,3) of float32 or float64, are inside the ball.
+		'''
+		cdef const float[:,:]  xyzf
+		cdef const double[:,:] xyzd
+		xyz = as_coordinates(xyz)
+		if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+		if xyz.dtype == np.float32:
+			xyzf = xyz
+			return self._areinside(xyzf)
+		xyzd = xyz
+		return self._areinside(xyzd)
+
 	def isdisjoint(Ball self,Ball ball):
 		cdef bool out = self._ball.isdisjoint(ball._ball)
 		return out
@@ -449,17 +610,15 @@ cdef class Ball:
 cdef class Polygon:
 		'''
 		A polygon set as an array of points. Can be either 2D or 3D.
+		The points can be given as an array of Point or as an array
+		of coordinates of shape (npoints,2) or (npoints,3).
 		'''
 		cdef CPolygon _poly
-		cdef Point[:] _points
+		cdef object   _xyz  # Vertex buffer of shape (npoints+1,3) shared with _poly
+		cdef object   _hash # Content hash of the vertex buffer (see Basins.cache), None until needed
 		cdef Point    _centroid
-		def __init__(Polygon self,Point[:] points):
-			cdef int ip, npoints = points.shape[0]
-			self._poly.set_npoints(npoints) # Already allocates npoints + 1!
-			self._points = points
-			for ip in range(npoints):
-				self._poly.set_point(ip,points[ip]._point)
-			self._poly.set_point(npoints,points[0]._point)
+		def __init__(Polygon self,object points):
+			self._set_points(points)
 			# Set boundig box
 			cdef CBall bbox = CBall(self._poly)
 			self._poly.set_bbox(bbox)
@@ -472,11 +631,52 @@ cdef class Polygon:
 
 		def __str__(Polygon self):
 			cdef int ip = 0
-			cdef object retstr = 'Point %d %s' % (ip,self.points[ip].__str__())
+			cdef object retstr = 'Point %d %s' % (ip,self[ip].__str__())
 			for ip in range(1,self.npoints):
-				retstr += '\nPoint %d %s' % (ip,self.points[ip].__str__())
+				retstr += '\nPoint %d %s' % (ip,self[ip].__str__())
 			return retstr
 
+		cdef void _set_points(Polygon self,object points) except *:
+			'''
+			Fill the vertex buffer with a single copy of the points
+			and close the polygon.
+			'''
+			cdef int ip, npoints = len(points)
+			cdef Point p
+			cdef np.ndarray[np.double_t,ndim=2] xyz = np.zeros((npoints+1,3),dtype=np.double)
+			if isinstance(points,np.ndarray) and not points.dtype == object:
+				# Array of coordinates
+				if not points.ndim == 2 or points.shape[1] not in (2,3):
+					raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+				xyz[:npoints,:points.shape[1]] = points
+			else:
+				# Array of Point
+				for ip in range(npoints):
+					p = points[ip]
+					xyz[ip,0] = p._point.x()
+					xyz[ip,1] = p._point.y()
+					xyz[ip,2] = p._point.z()
+			xyz[npoints,:] = xyz[0,:]
+			self._xyz  = xyz
+			self._hash = None # Computed on demand (see hash)
+			self._poly.set_buffer(npoints,<CPoint*>&xyz[0,0])
+			self._poly.classify()
+
+		cdef object _cache_hash(Polygon self):
+			'''
+			Content hash to look the masks up, None (not computed)
+			if the cache is disabled.
+			'''
+			return None if cache.get_cache() is None else self.hash
+
+		cdef object _coord(Polygon self,int idim):
+			'''
+			Read-only view of one coordinate of the vertex buffer.
+			'''
+			out = self._xyz[:,idim]
+			out.flags.writeable = False
+			return out
+
 		# Operators
 		def __getitem__(Polygon self,int i):
 			'''
@@ -491,20 +691,18 @@ cdef class Polygon:
 			Polygon[i] = value
 			'''
 			self._poly.set_point(i,value._point)
+			self._hash = None
 
 		def __eq__(Polygon self,Polygon other):
 			'''
 			Polygon == Polygon
 			'''
-			cdef int ip, np1= self.npoints, np2 = other.npoints
+			cdef int np1= self.npoints, np2 = other.npoints
 			# Check if polygons have the same number of points
 			if not np1 == np2:
 				return False
 			# Check if the points are equal
-			for ip in range(np1):
-				if not self[ip] == other[ip]:
-					return False
-			return True
+			return np.array_equal(self._xyz[:np1],other._xyz[:np2])
 
 		def __ne__(Polygon self,Polygon other):
 			'''
@@ -544,17 +742,157 @@ cdef class Polygon:
 #			cdef bool out =  self._poly.isinside_wn(point._point)
 			return out
 
-		def areinside(Polygon self,double[:,:] xyz):
+		def isinside_xy(Polygon self,double x,double y):
 			'''
-			Returns True if the points are inside the polygon, else False.
+			Returns True if the point (x,y) is inside the polygon, else False.
+			'''
+			cdef bool out = self._poly.isinside_cn(CPoint(x,y,0.))
+			return out
+
+		cdef object _areinside(Polygon self,const real *x,const real *y,const real *z,int npoints,int sx,int sy,int sz,int nthreads):
 			'''
-			cdef npoints = xyz.shape[0]
+			Classify the points given by strided arrays of coordinates
+			(float or double).
+			'''
+			cdef int ip = 0
 			cdef np.ndarray[np.npy_bool,ndim=1,cast=True] out = np.ndarray((npoints,),dtype=np.bool_)
-#			self._poly.areinside(<bool*>&out[0],&xyz[0,0],npoints)
-			self._poly.areinside_cn(<bool*>&out[0],&xyz[0,0],npoints)
-#			self._poly.areinside_wn(<bool*>&out[0],&xyz[0,0],npoints)
+			if npoints == 0: return out
+			cdef bool *pout = <bool*>np.PyArray_DATA(out)
+			# Build the index and the prefilter while holding the GIL, so
+			# that they are not built concurrently by threads sharing the polygon.
+			# They are only published once complete, threads already querying
+			# the polygon keep using the edges until then
+			self._poly.prepare(npoints)
+			# Run without the GIL, checking for signals after each chunk
+			with nogil:
+				while ip < npoints:
+#					self._poly.areinside(pout+ip,_offset(x,ip,sx),_offset(y,ip,sy),_offset(z,ip,sz),min(AREINSIDE_CHUNK,npoints-ip),sx,sy,sz,nthreads)
+					self._poly.areinside_cn(pout+ip,_offset(x,ip,sx),_offset(y,ip,sy),_offset(z,ip,sz),min(AREINSIDE_CHUNK,npoints-ip),sx,sy,sz,nthreads)
+#					self._poly.areinside_wn(pout+ip,_offset(x,ip,sx),_offset(y,ip,sy),_offset(z,ip,sz),min(AREINSIDE_CHUNK,npoints-ip),sx,sy,sz,nthreads)
+					ip += AREINSIDE_CHUNK
+					with gil:
+						PyErr_CheckSignals()
 			return out
 
+		cdef object _areinside_xyz(Polygon self,const real[:,:] xyz,int nthreads):
+			if xyz.shape[0] == 0: return np.ndarray((0,),dtype=np.bool_)
+			cdef int sxyz = _stride(xyz.strides[0],sizeof(real))
+			return self._areinside(&xyz[0,0],&xyz[0,1],&xyz[0,2] if xyz.shape[1] == 3 else NULL,xyz.shape[0],sxyz,sxyz,sxyz,nthreads)
+
+		cdef object _areinside_xy(Polygon self,const real[:] x,const real[:] y,int nthreads):
+			if x.shape[0] == 0: return np.ndarray((0,),dtype=np.bool_)
+			return self._areinside(&x[0],&y[0],<const real*>NULL,x.shape[0],_stride(x.strides[0],sizeof(real)),_stride(y.strides[0],sizeof(real)),0,nthreads)
+
+		def areinside(Polygon self,object xyz,int nthreads=0):
+			'''
+			Returns True if the points are inside the polygon, else False.
+			The points are given as an array of shape (npoints,2) or (npoints,3),
+			that can be any strided view as it is read without copies.
+			Float32 points are classified without converting them to float64
+			(see as_coordinates), other types are converted to float64.
+			The points are classified using nthreads threads (or the default
+			number of threads, see set_num_threads, if 0).
+			'''
+			cdef const float[:,:]  xyzf
+			cdef const double[:,:] xyzd
+			xyz = as_coordinates(xyz)
+			if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+			key, out = cache.lookup('areinside',self._cache_hash(),xyz)
+			if out is not None: return out
+			if xyz.dtype == np.float32:
+				xyzf = xyz
+				out  = self._areinside_xyz(xyzf,nthreads)
+			else:
+				xyzd = xyz
+				out  = self._areinside_xyz(xyzd,nthreads)
+			return cache.store(key,out)
+
+		def areinside_xy(Polygon self,object x,object y,int nthreads=0):
+			'''
+			Returns True if the points are inside the polygon, else False.
+			The points are given as two arrays of coordinates x and y (e.g.,
+			longitude and latitude), that can be any strided view as they
+			are read without copies (see areinside). Both are classified
+			without conversion if they are float32 (see as_coordinates).
+			'''
+			cdef const float[:]  xf, yf
+			cdef const double[:] xd, yd
+			x, y = as_coordinates(x,y)
+			if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+			key, out = cache.lookup('areinside_xy',self._cache_hash(),x,y)
+			if out is not None: return out
+			if x.dtype == np.float32:
+				xf, yf = x, y
+				out    = self._areinside_xy(xf,yf,nthreads)
+			else:
+				xd, yd = x, y
+				out    = self._areinside_xy(xd,yd,nthreads)
+			return cache.store(key,out)
+
+		cdef object _grid_mask(Polygon self,const real[:] x,const real[:] y,int nthreads):
+			cdef int j = 0, nrows, nx = x.shape[0], ny = y.shape[0]
+			cdef np.ndarray[np.npy_bool,ndim=2,cast=True] out = np.ndarray((ny,nx),dtype=np.bool_)
+			if nx == 0 or ny == 0: return out
+			cdef bool *pout = <bool*>np.PyArray_DATA(out)
+			cdef const real *px = &x[0]
+			cdef const real *py = &y[0]
+			cdef int sx = _stride(x.strides[0],sizeof(real)), sy = _stride(y.strides[0],sizeof(real))
+			cdef np.ndarray[np.int32_t,ndim=1] order = np.argsort(x,kind='stable').astype(np.int32)
+			cdef const int *porder = <const int*>np.PyArray_DATA(order)
+			cdef int chunk = max(1,AREINSIDE_CHUNK//nx) # Rows between checks for signals
+			# Build the index while holding the GIL (see _areinside)
+			self._poly.prepare(ny)
+			with nogil:
+				while j < ny:
+					nrows = min(chunk,ny-j)
+					self._poly.grid_mask(pout+<long>j*nx,px,nx,sx,_offset(py,j,sy),nrows,sy,porder,nthreads)
+					j += chunk
+					with gil:
+						PyErr_CheckSignals()
+			return out
+
+		def grid_mask(Polygon self,object x,object y,int nthreads=0):
+			'''
+			Returns the mask of the polygon on a rectilinear grid given by
+			its axes x and y (e.g., 1D longitude and latitude), of shape
+			(ny,nx) so that mask[j,i] is True if (x[i],y[j]) is inside.
+
+			The polygon is rasterized one row at a time: the crossings of
+			the edges with each row are computed once and the points of
+			the row are swept in order, so no array of points is built.
+			The points follow the same crossing rule and bounding ball test
+			as areinside, without building the meshgrid.
+			'''
+			cdef const float[:]  xf, yf
+			cdef const double[:] xd, yd
+			x, y = as_coordinates(x,y)
+			if not x.ndim == 1 or not y.ndim == 1: raise ValueError('The axes of the grid must be 1D arrays!')
+			key, out = cache.lookup('grid_mask',self._cache_hash(),x,y)
+			if out is not None: return out
+			if x.dtype == np.float32:
+				xf, yf = x, y
+				out    = self._grid_mask(xf,yf,nthreads)
+			else:
+				xd, yd = x, y
+				out    = self._grid_mask(xd,yd,nthreads)
+			return cache.store(key,out)
+
+		def iter_areinside(Polygon self,source,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+			'''
+			Returns a generator of the masks of the chunks of points of a
+			source that does not need to fit in memory, e.g., an np.memmap,
+			a tuple (x,y) of arrays or an iterable of chunks (see
+			Basins.stream.iter_areinside).
+			'''
+			return stream.iter_areinside(self,source,chunk,nworkers)
+
+		def stream_areinside(Polygon self,source,out,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+			'''
+			Classify the chunks of points of a source and write the masks
+			into out, e.g., a memmapped array (see iter_areinside).
+			'''
+			return stream.stream_areinside(self,source,out,chunk,nworkers)
+
 		def compute_centroid(Polygon self):
 			'''
 			Returns the centroid (Point) of a (2D) polygon.
@@ -572,44 +910,250 @@ cdef class Polygon:
 			Rotate a polygon by a theta radians 3D angle array
 			wrt to an origin Point (o).
 			'''
-			cdef int ip
 			cdef Point p
 			# Input must be a 3D angle
 			if len(theta) != 3:
 				raise ValueError('Rotation does not contain a 3D angle')
 			p = self.centroid if o.size == 0 else Point.from_array(o)
-			# Compute the rotation
+			# Compute the rotation, the points are updated on the vertex buffer
+			# together with the bounding box and the centroid
 			self._poly.rotate(&theta[0],p._point)
-			# Update the points
-			for ip in range(self.npoints):
-				self._points[ip]._point = self._poly.get_point(ip)
+			self._hash = None
+			p = Point(0.,0.,0.)
+			p._point = self._poly.get_centroid()
+			self._centroid = p
+			return self
+
+		def build_index(Polygon self,int nslabs=0):
+			'''
+			Build the slab index of the polygon, i.e., sort its edges
+			in slabs in y so that each query only visits the edges that
+			overlap its y coordinate. The number of slabs is chosen from
+			the number of edges when nslabs is 0.
+
+			The index is built on the first call to areinside with enough
+			points and it is dropped when the points of the polygon change.
+			'''
+			self._poly.build_index(nslabs)
+			return self
+
+		def clear_index(Polygon self):
+			'''
+			Drop the slab index of the polygon.
+			'''
+			self._poly.clear_index()
+			return self
+
+		def build_grid(Polygon self,int nx=0,int ny=0):
+			'''
+			Build a uniform grid of nx by ny cells over the bounding box
+			of the polygon, where each cell is classified as inside, outside
+			or boundary. Points on inside or outside cells are answered with
+			a lookup and points on boundary cells only test the edges of their
+			cell. The number of cells is chosen from the number of edges when
+			nx or ny are 0.
+
+			The grid is dropped when the points of the polygon change.
+			'''
+			self._poly.build_grid(nx,ny)
+			return self
+
+		def clear_grid(Polygon self):
+			'''
+			Drop the cell grid of the polygon.
+			'''
+			self._poly.clear_grid()
+			return self
+
+		def build_prefilter(Polygon self):
+			'''
+			Build the prefilter of the polygon, i.e., the axis aligned box
+			and the minimal enclosing circle, to reject points, and an
+			inscribed circle and rectangles, to accept points, without
+			visiting the edges.
+
+			The prefilter is built on the first call to areinside with enough
+			points and it is dropped when the points of the polygon change.
+			'''
+			self._poly.build_prefilter()
+			return self
+
+		def clear_prefilter(Polygon self):
+			'''
+			Drop the prefilter of the polygon.
+			'''
+			self._poly.clear_prefilter()
 			return self
 
+		def build_convex(Polygon self):
+			'''
+			Find if the polygon is convex on the xy plane and, if so, sort
+			its upward and downward edges in y, so that each query only needs
+			a binary search on each chain of edges.
+
+			The check is done when the polygon is classified (see kind), i.e.,
+			when it is built, and redone after the points of the polygon change.
+			'''
+			self._poly.build_convex()
+			return self
+
+		def clear_convex(Polygon self):
+			'''
+			Drop the convex chains of the polygon.
+			'''
+			self._poly.clear_convex()
+			return self
+
+		cdef object _prefilter(Polygon self,const real[:,:] xyz):
+			'''
+			Prefilter the points given by an array of coordinates (float
+			or double) of shape (npoints,2) or (npoints,3).
+			'''
+			cdef int ip = 0, ic, iend, npoints = xyz.shape[0]
+			cdef np.ndarray[np.int8_t,ndim=1] out = np.ndarray((npoints,),dtype=np.int8)
+			if npoints == 0: return out
+			cdef np.int8_t *pout = <np.int8_t*>np.PyArray_DATA(out)
+			cdef int sxyz = _stride(xyz.strides[0],sizeof(real))
+			cdef const real *px = &xyz[0,0]
+			cdef const real *py = &xyz[0,1]
+			cdef const real *pz = &xyz[0,2] if xyz.shape[1] == 3 else NULL
+			# Run without the GIL, checking for signals after each chunk
+			with nogil:
+				while ip < npoints:
+					iend = min(ip+AREINSIDE_CHUNK,npoints)
+					for ic in range(ip,iend):
+						pout[ic] = <np.int8_t>self._poly.prefilter(CPoint(px[<long>ic*sxyz],py[<long>ic*sxyz],pz[<long>ic*sxyz] if pz != NULL else 0.))
+					ip = iend
+					with gil:
+						PyErr_CheckSignals()
+			return out
+
+		def prefilter(Polygon self,object xyz):
+			'''
+			Classify the points using only the bounding ball and the
+			prefilter: -1 = outside, 1 = inside and 0 = unknown.
+			The points are given as an array of shape (npoints,2) or
+			(npoints,3), read as in areinside.
+			'''
+			cdef const float[:,:]  xyzf
+			cdef const double[:,:] xyzd
+			xyz = as_coordinates(xyz)
+			if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+			if xyz.dtype == np.float32:
+				xyzf = xyz
+				return self._prefilter(xyzf)
+			xyzd = xyz
+			return self._prefilter(xyzd)
+
 		@classmethod
-		def from_array(Polygon cls,double[:,:] xyz):
+		def from_array(Polygon cls,object xyz):
 			'''
 			Build a polygon from an array of points
 			of shape (npoints,3).
 			'''
-			cdef int ii, npoints = xyz.shape[0]
-			pointList = np.array([Point.from_array(xyz[ii,:]) for ii in range(npoints)],dtype=Point)
-			return cls(pointList)
+			return cls(np.asarray(xyz,dtype=np.double))
 
 		@property
 		def npoints(Polygon self):
 			return self._poly.get_npoints() # Returns correctly
 		@property
 		def points(Polygon self):
-			return self._points
-		@points.setter
-		def points(Polygon self,Point[:] value):
-			cdef int ip
-			cdef npoints = value.shape[0]
-			self._poly.set_npoints(npoints) # Already allocates npoints + 1!
-			self._points = value
+			cdef int ip, npoints = self.npoints
+			cdef np.ndarray out = np.ndarray((npoints,),dtype=object)
 			for ip in range(npoints):
-				self._poly.set_point(ip,value[ip]._point)
-			self._poly.set_point(npoints,value[0]._point)
+				out[ip] = self[ip]
+			return out
+		@points.setter
+		def points(Polygon self,object value):
+			self._set_points(value)
+		@property
+		def hash(Polygon self):
+			'''
+			Content hash of the vertices, used to cache the masks. It is
+			computed on demand and dropped when the vertices change.
+			'''
+			if self._hash is None: self._hash = cache.content_hash(self._xyz)
+			return self._hash
+		@property
+		def indexed(Polygon self):
+			return self._poly.has_index()
+		@property
+		def gridded(Polygon self):
+			return self._poly.has_grid()
+		@property
+		def prefiltered(Polygon self):
+			return self._poly.has_prefilter()
+		@property
+		def convex(Polygon self):
+			return self._poly.has_convex()
+		@property
+		def kind(Polygon self):
+			'''
+			Shape of the polygon: 'rectangle' (axis aligned), 'convex',
+			'simple' (few edges) or 'large' (many edges).
+			'''
+			if self._poly.get_kind() == 0: self._poly.classify()
+			return POLYGON_KINDS[self._poly.get_kind()]
+		@property
+		def kernel(Polygon self):
+			'''
+			Kernel of the crossing number used by the next query: 'interval',
+			'convex', 'grid', 'index' or 'edges'. Large polygons use the
+			edges until their index is built, i.e., on the first call to
+			areinside with enough points (or with build_index).
+			'''
+			return _kernel(self.kind,self.convex,self.gridded,self.indexed)
+		@property
+		def aabb(Polygon self):
+			'''
+			Axis aligned box of the prefilter as [xmax,xmin,ymax,ymin].
+			'''
+			if not self._poly.has_prefilter(): return None
+			cdef np.ndarray[np.double_t,ndim=1] out = np.ndarray((4,),dtype=np.double)
+			self._poly.get_prefilter().get_aabb(&out[0])
+			return out
+		@property
+		def enclosing_circle(Polygon self):
+			'''
+			Minimal enclosing circle of the prefilter.
+			'''
+			if not self._poly.has_prefilter(): return None
+			cdef double c[3]
+			self._poly.get_prefilter().get_circle(c)
+			return Ball(Point(c[0],c[1],0.),c[2])
+		@property
+		def inscribed_circle(Polygon self):
+			'''
+			Inscribed circle of the prefilter (empty if none).
+			'''
+			if not self._poly.has_prefilter(): return None
+			cdef double c[3]
+			self._poly.get_prefilter().get_incircle(c)
+			return Ball(Point(c[0],c[1],0.),c[2])
+		@property
+		def inscribed_rectangles(Polygon self):
+			'''
+			Inscribed rectangles of the prefilter as an array
+			of shape (nrects,4) of [xmax,xmin,ymax,ymin].
+			'''
+			if not self._poly.has_prefilter(): return None
+			cdef int k, nr = self._poly.get_prefilter().get_nrects()
+			cdef np.ndarray[np.double_t,ndim=2] out = np.zeros((nr,4),dtype=np.double)
+			for k in range(nr):
+				self._poly.get_prefilter().get_rect(k,&out[k,0])
+			return out
+		@property
+		def grid_cells(Polygon self):
+			'''
+			Status of the cells of the grid as an array of shape (ny,nx),
+			0 = outside, 1 = inside and 2 = boundary.
+			'''
+			if not self._poly.has_grid(): return None
+			cdef int c, nx = self._poly.get_grid().get_nx(), ny = self._poly.get_grid().get_ny()
+			cdef np.ndarray[np.int8_t,ndim=1] out = np.ndarray((nx*ny,),dtype=np.int8)
+			for c in range(nx*ny):
+				out[c] = min(self._poly.get_grid().get_status(c),2)
+			return out.reshape((ny,nx))
 		@property
 		def bbox(Polygon self):
 			cdef Ball out = Ball()
@@ -626,23 +1170,363 @@ cdef class Polygon:
 			self._centroid = value
 			self._poly.set_centroid(self._centroid._point)
 		@property
-		def x(Polygon self):
-			cdef int ii, npoints = self.npoints+1
-			cdef np.ndarray[np.double_t,ndim=1] out = np.ndarray((npoints,),dtype=np.double)
-			for ii in range(npoints):
-				out[ii] = self._poly.get_point(ii).x()
+		def xyz(Polygon self):
+			out = self._xyz[:self.npoints,:]
+			out.flags.writeable = False
 			return out
 		@property
+		def x(Polygon self):
+			return self._coord(0)
+		@property
 		def y(Polygon self):
-			cdef int ii, npoints = self.npoints+1
-			cdef np.ndarray[np.double_t,ndim=1] out = np.ndarray((npoints,),dtype=np.double)
-			for ii in range(npoints):
-				out[ii] = self._poly.get_point(ii).y()
-			return out
+			return self._coord(1)
 		@property
 		def z(Polygon self):
-			cdef int ii, npoints = self.npoints+1
-			cdef np.ndarray[np.double_t,ndim=1] out = np.ndarray((npoints,),dtype=np.double)
-			for ii in range(npoints):
-				out[ii] = self._poly.get_point(ii).z()
-			return out
\ No newline at end of file
+			return self._coord(2)
+
+
+cdef object _areinside_first(object polys,const real[:] x,const real[:] y,const real[:] z,int nthreads,object dtype):
+	'''
+	Classify the points given by strided arrays of coordinates (float
+	or double, z can be None) in the first polygon that contains them.
+	'''
+	cdef int ip = 0, nchunk, npoints = x.shape[0], sz = 0
+	cdef Polygon poly
+	cdef vector[CPolygon*] cpolys
+	cdef np.ndarray out = np.ndarray((npoints,),dtype=dtype)
+	cdef int isize = out.dtype.itemsize
+	if not out.dtype.kind == 'i' or isize > 4: raise ValueError('Label type <%s> not supported!'%out.dtype)
+	if len(polys) > np.iinfo(out.dtype).max + 1: raise ValueError('Too many polygons for labels of type <%s>!'%out.dtype)
+	if npoints == 0: return out
+	cdef const real *px = &x[0]
+	cdef const real *py = &y[0]
+	cdef const real *pz = NULL
+	cdef int sx = _stride(x.strides[0],sizeof(real)), sy = _stride(y.strides[0],sizeof(real))
+	if z is not None:
+		pz = &z[0]
+		sz = _stride(z.strides[0],sizeof(real))
+	for poly in polys:
+		# Build the indices and the prefilters while holding the GIL
+		poly._poly.prepare(npoints)
+		cpolys.push_back(&poly._poly)
+	cdef char *pout = <char*>np.PyArray_DATA(out)
+	# Run without the GIL, checking for signals after each chunk
+	with nogil:
+		while ip < npoints:
+			nchunk = min(AREINSIDE_CHUNK,npoints-ip)
+			if real is float:
+				if isize == 1:
+					c_areinside_first_f[int8_t](<int8_t*>(pout+ip),_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size(),nthreads)
+				elif isize == 2:
+					c_areinside_first_f[int16_t](<int16_t*>(pout+2*ip),_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size(),nthreads)
+				else:
+					c_areinside_first_f[int32_t](<int32_t*>(pout+4*ip),_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size(),nthreads)
+			else:
+				if isize == 1:
+					c_areinside_first[int8_t](<int8_t*>(pout+ip),_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size(),nthreads)
+				elif isize == 2:
+					c_areinside_first[int16_t](<int16_t*>(pout+2*ip),_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size(),nthreads)
+				else:
+					c_areinside_first[int32_t](<int32_t*>(pout+4*ip),_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size(),nthreads)
+			ip += AREINSIDE_CHUNK
+			with gil:
+				PyErr_CheckSignals()
+	return out
+
+def areinside_first(object polys,object x,object y=None,int nthreads=0,object dtype=np.int32):
+	'''
+	Returns, for each point, the position of the first polygon of polys
+	that contains it or -1 if it is not inside any of them. Only the
+	points that have not been assigned yet are tested against the next
+	polygon.
+
+	The points are given either as an array x of shape (npoints,2) or
+	(npoints,3) or as two arrays of coordinates x and y, that can be any
+	strided view as they are read without copies (float32 coordinates
+	are not converted, see as_coordinates). The output is of type
+	dtype (int8, int16 or int32).
+	'''
+	cdef const float[:]  xf, yf, zf = None
+	cdef const double[:] xd, yd, zd = None
+	z = None
+	if y is None:
+		xyz = as_coordinates(x)
+		if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+		x, y = xyz[:,0], xyz[:,1]
+		if xyz.shape[1] == 3: z = xyz[:,2]
+	else:
+		x, y = as_coordinates(x,y)
+		if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+	if x.dtype == np.float32:
+		xf, yf = x, y
+		if z is not None: zf = z
+		return _areinside_first(polys,xf,yf,zf,nthreads,dtype)
+	xd, yd = x, y
+	if z is not None: zd = z
+	return _areinside_first(polys,xd,yd,zd,nthreads,dtype)
+
+
+cdef object _areinside_all(object polys,const real[:] x,const real[:] y,const real[:] z):
+	'''
+	Classify the points given by strided arrays of coordinates (float
+	or double, z can be None) in every polygon that contains them.
+	'''
+	cdef int ip = 0, nchunk, npoints = x.shape[0], sz = 0
+	cdef Polygon poly
+	cdef vector[CPolygon*] cpolys
+	cdef vector[int] off, idx
+	cdef np.ndarray[np.int64_t,ndim=1] offsets = np.zeros((npoints+1,),dtype=np.int64)
+	cdef list indices = []
+	if npoints == 0: return offsets, np.zeros((0,),dtype=np.int32)
+	cdef const real *px = &x[0]
+	cdef const real *py = &y[0]
+	cdef const real *pz = NULL
+	cdef int sx = _stride(x.strides[0],sizeof(real)), sy = _stride(y.strides[0],sizeof(real))
+	if z is not None:
+		pz = &z[0]
+		sz = _stride(z.strides[0],sizeof(real))
+	for poly in polys:
+		# Build the indices and the prefilters while holding the GIL
+		poly._poly.prepare(npoints)
+		cpolys.push_back(&poly._poly)
+	while ip < npoints:
+		nchunk = min(AREINSIDE_CHUNK,npoints-ip)
+		# Run each chunk without the GIL, checking for signals after it
+		with nogil:
+			if real is float:
+				c_areinside_all_f(off,idx,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size())
+			else:
+				c_areinside_all(off,idx,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,cpolys.data(),cpolys.size())
+		PyErr_CheckSignals()
+		offsets[ip+1:ip+nchunk+1] = np.asarray(<int[:nchunk+1]>off.data())[1:] + offsets[ip]
+		if idx.size() > 0: indices.append(np.array(<int[:idx.size()]>idx.data(),dtype=np.int32))
+		ip += AREINSIDE_CHUNK
+	return offsets, np.concatenate(indices) if len(indices) > 0 else np.zeros((0,),dtype=np.int32)
+
+def areinside_all(object polys,object x,object y=None):
+	'''
+	Returns every polygon of polys that contains each point in CSR
+	format, as a tuple (offsets, indices): the polygons that contain
+	the point ip are polys[indices[offsets[ip]:offsets[ip+1]]], in
+	increasing order. All the memberships are found in a single pass
+	over the points (see membership_bits for a packed bit matrix).
+
+	The points are given as in areinside_first.
+	'''
+	cdef const float[:]  xf, yf, zf = None
+	cdef const double[:] xd, yd, zd = None
+	z = None
+	if y is None:
+		xyz = as_coordinates(x)
+		if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+		x, y = xyz[:,0], xyz[:,1]
+		if xyz.shape[1] == 3: z = xyz[:,2]
+	else:
+		x, y = as_coordinates(x,y)
+		if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+	if x.dtype == np.float32:
+		xf, yf = x, y
+		if z is not None: zf = z
+		return _areinside_all(polys,xf,yf,zf)
+	xd, yd = x, y
+	if z is not None: zd = z
+	return _areinside_all(polys,xd,yd,zd)
+
+cdef object _areinside_polyline(np.ndarray[np.double_t,ndim=2] points,double radius,const real[:] x,const real[:] y,const real[:] z,int nthreads):
+	'''
+	Classify the points given by strided arrays of coordinates (float
+	or double, z can be None) that are within radius of a polyline.
+	'''
+	cdef int ip = 0, nchunk, npoints = x.shape[0], sz = 0, n = points.shape[0]
+	cdef np.ndarray[np.npy_bool,ndim=1,cast=True] out = np.ndarray((npoints,),dtype=np.bool_)
+	if npoints == 0: return out
+	cdef bool *pout = <bool*>np.PyArray_DATA(out)
+	cdef const CPoint *pp = <const CPoint*>np.PyArray_DATA(points)
+	cdef const real *px = &x[0]
+	cdef const real *py = &y[0]
+	cdef const real *pz = NULL
+	cdef int sx = _stride(x.strides[0],sizeof(real)), sy = _stride(y.strides[0],sizeof(real))
+	if z is not None:
+		pz = &z[0]
+		sz = _stride(z.strides[0],sizeof(real))
+	while ip < npoints:
+		nchunk = min(AREINSIDE_CHUNK,npoints-ip)
+		# Run each chunk without the GIL, checking for signals after it
+		with nogil:
+			if real is float:
+				c_areinside_polyline_f(pout+ip,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,pp,n,radius,nthreads)
+			else:
+				c_areinside_polyline(pout+ip,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,pp,n,radius,nthreads)
+		PyErr_CheckSignals()
+		ip += AREINSIDE_CHUNK
+	return out
+
+def areinside_polyline(object points,double radius,object x,object y=None,int nthreads=0):
+	'''
+	Returns True if the points are within a distance radius of a
+	polyline given by its points, of shape (n,2) or (n,3), else False
+	(i.e., inside the capsules of its segments). The distance is
+	measured in 3D as for the Ball, z is 0 when not given.
+
+	The points are given as in areinside_first.
+	'''
+	cdef const float[:]  xf, yf, zf = None
+	cdef const double[:] xd, yd, zd = None
+	points = np.asarray(points,dtype=np.double)
+	if not points.ndim == 2 or points.shape[1] not in (2,3): raise ValueError('Polyline must be of shape (n,2) or (n,3)!')
+	cdef np.ndarray[np.double_t,ndim=2] pxyz = np.zeros((points.shape[0],3),dtype=np.double)
+	pxyz[:,:points.shape[1]] = points
+	z = None
+	if y is None:
+		xyz = as_coordinates(x)
+		if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+		x, y = xyz[:,0], xyz[:,1]
+		if xyz.shape[1] == 3: z = xyz[:,2]
+	else:
+		x, y = as_coordinates(x,y)
+		if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+	if x.dtype == np.float32:
+		xf, yf = x, y
+		if z is not None: zf = z
+		return _areinside_polyline(pxyz,radius,xf,yf,zf,nthreads)
+	xd, yd = x, y
+	if z is not None: zd = z
+	return _areinside_polyline(pxyz,radius,xd,yd,zd,nthreads)
+
+cdef object _areinside_halfspaces(np.ndarray[np.double_t,ndim=2] planes,const real[:] x,const real[:] y,const real[:] z,int nthreads):
+	'''
+	Classify the points given by strided arrays of coordinates (float
+	or double, z can be None) that are inside all the half-spaces.
+	'''
+	cdef int ip = 0, nchunk, npoints = x.shape[0], sz = 0, nplanes = planes.shape[0]
+	cdef np.ndarray[np.npy_bool,ndim=1,cast=True] out = np.ndarray((npoints,),dtype=np.bool_)
+	if npoints == 0: return out
+	cdef bool *pout = <bool*>np.PyArray_DATA(out)
+	cdef const double *pp = <const double*>np.PyArray_DATA(planes)
+	cdef const real *px = &x[0]
+	cdef const real *py = &y[0]
+	cdef const real *pz = NULL
+	cdef int sx = _stride(x.strides[0],sizeof(real)), sy = _stride(y.strides[0],sizeof(real))
+	if z is not None:
+		pz = &z[0]
+		sz = _stride(z.strides[0],sizeof(real))
+	while ip < npoints:
+		nchunk = min(AREINSIDE_CHUNK,npoints-ip)
+		# Run each chunk without the GIL, checking for signals after it
+		with nogil:
+			if real is float:
+				c_areinside_halfspaces_f(pout+ip,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,pp,nplanes,nthreads)
+			else:
+				c_areinside_halfspaces(pout+ip,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,pp,nplanes,nthreads)
+		PyErr_CheckSignals()
+		ip += AREINSIDE_CHUNK
+	return out
+
+def areinside_halfspaces(object planes,object x,object y=None,int nthreads=0):
+	'''
+	Returns True if the points are inside the intersection of the
+	half-spaces given by planes, an array of shape (nplanes,4) where
+	each row (a,b,c,d) contains the points with a*x + b*y + c*z + d < 0,
+	else False. z is 0 when not given. The points on a plane are inside
+	only if its normal (a,b,c) points to negative x (else negative y,
+	else negative z), i.e., the half-open rule of the crossing number
+	test, so that the regions sharing a plane do not share its points.
+
+	The points are given as in areinside_first.
+	'''
+	cdef const float[:]  xf, yf, zf = None
+	cdef const double[:] xd, yd, zd = None
+	cdef np.ndarray[np.double_t,ndim=2] pplanes = np.ascontiguousarray(planes,dtype=np.double)
+	if not pplanes.shape[1] == 4: raise ValueError('Half-spaces must be of shape (nplanes,4)!')
+	z = None
+	if y is None:
+		xyz = as_coordinates(x)
+		if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+		x, y = xyz[:,0], xyz[:,1]
+		if xyz.shape[1] == 3: z = xyz[:,2]
+	else:
+		x, y = as_coordinates(x,y)
+		if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+	if x.dtype == np.float32:
+		xf, yf = x, y
+		if z is not None: zf = z
+		return _areinside_halfspaces(pplanes,xf,yf,zf,nthreads)
+	xd, yd = x, y
+	if z is not None: zd = z
+	return _areinside_halfspaces(pplanes,xd,yd,zd,nthreads)
+
+
+TRANS_AFFINE, TRANS_SPHERE = 0, 1 # Kinds of transforms (see areinside_transform)
+
+cdef object _areinside_transform(Polygon poly,int kind,np.ndarray[np.double_t,ndim=1] params,const real[:] x,const real[:] y,const real[:] z,int nthreads):
+	'''
+	Classify the points given by strided arrays of coordinates (float
+	or double, z can be None) in a polygon seen through a transform.
+	'''
+	cdef int ip = 0, nchunk, npoints = x.shape[0], sz = 0
+	cdef CTransform tr
+	cdef np.ndarray[np.npy_bool,ndim=1,cast=True] out = np.ndarray((npoints,),dtype=np.bool_)
+	if npoints == 0: return out
+	if kind == TRANS_AFFINE:
+		if not params.shape[0] == 6: raise ValueError('Affine transforms need 6 parameters!')
+		tr.set_affine(&params[0])
+	elif kind == TRANS_SPHERE:
+		if not params.shape[0] == 9: raise ValueError('Rotations of the sphere need 9 parameters!')
+		tr.set_sphere(&params[0])
+	else:
+		raise ValueError('Transform <%d> not supported!'%kind)
+	cdef bool *pout = <bool*>np.PyArray_DATA(out)
+	cdef const real *px = &x[0]
+	cdef const real *py = &y[0]
+	cdef const real *pz = NULL
+	cdef int sx = _stride(x.strides[0],sizeof(real)), sy = _stride(y.strides[0],sizeof(real))
+	if z is not None:
+		pz = &z[0]
+		sz = _stride(z.strides[0],sizeof(real))
+	# Build the index and the prefilter while holding the GIL
+	poly._poly.prepare(npoints)
+	while ip < npoints:
+		nchunk = min(AREINSIDE_CHUNK,npoints-ip)
+		# Run each chunk without the GIL, checking for signals after it
+		with nogil:
+			if real is float:
+				c_areinside_transform_f(pout+ip,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,&poly._poly,tr,nthreads)
+			else:
+				c_areinside_transform(pout+ip,_offset(px,ip,sx),_offset(py,ip,sy),_offset(pz,ip,sz),nchunk,sx,sy,sz,&poly._poly,tr,nthreads)
+		PyErr_CheckSignals()
+		ip += AREINSIDE_CHUNK
+	return out
+
+def areinside_transform(Polygon poly,int kind,object params,object x,object y=None,int nthreads=0):
+	'''
+	Returns True if the points are inside the polygon seen through a
+	transform, else False. The inverse transform, which brings the
+	points to the frame of the polygon, is given by its kind and params:
+		- TRANS_AFFINE: (a,b,c,d,e,f) so that the points (X,Y) are
+		  classified at (a*X + b*Y + c, d*X + e*Y + f).
+		- TRANS_SPHERE: a rotation matrix (9 values, row major) of the
+		  unit vectors of the points given as (lon,lat) in degrees.
+	The polygon and its index and prefilter are shared by all the
+	transforms.
+
+	The points are given as in areinside_first.
+	'''
+	cdef const float[:]  xf, yf, zf = None
+	cdef const double[:] xd, yd, zd = None
+	cdef np.ndarray[np.double_t,ndim=1] pparams = np.ascontiguousarray(params,dtype=np.double).ravel()
+	z = None
+	if y is None:
+		xyz = as_coordinates(x)
+		if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+		x, y = xyz[:,0], xyz[:,1]
+		if xyz.shape[1] == 3: z = xyz[:,2]
+	else:
+		x, y = as_coordinates(x,y)
+		if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+	if x.dtype == np.float32:
+		xf, yf = x, y
+		if z is not None: zf = z
+		return _areinside_transform(poly,kind,pparams,xf,yf,zf,nthreads)
+	xd, yd = x, y
+	if z is not None: zd = z
+	return _areinside_transform(poly,kind,pparams,xd,yd,zd,nthreads)
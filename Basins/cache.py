@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+
+from __future__ import print_function, division
+
+import os, hashlib, tempfile, threading, collections, numpy as np
+
+
+CACHE_MAXBYTES = 256 << 20 # Default size of the in-memory cache in bytes
+
+_CACHE = None # Active cache, None when disabled
+
+
+def content_hash(*items):
+	'''
+	Returns the hex digest (128 bits) of the content of a sequence
+	of arrays (hashed with their type and shape) or strings.
+	'''
+	h = hashlib.blake2b(digest_size=16)
+	for v in items:
+		if isinstance(v,str):
+			h.update(('s%d:' % len(v)).encode('utf-8'))
+			h.update(v.encode('utf-8'))
+		else:
+			v = np.ascontiguousarray(v)
+			h.update(('a%s%s:' % (v.dtype.str,v.shape)).encode('utf-8'))
+			h.update(v.data)
+	return h.hexdigest()
+
+
+class MaskCache(object):
+	'''
+	Cache of masks (or labels) keyed by a content hash of the geometry
+	and of the query (points or grid axes). The most recently used masks
+	are kept in memory up to maxbytes. If a path is given, the masks are
+	also stored in that directory as compressed npz files, so they can be
+	shared by different processes and runs.
+	'''
+	def __init__(self,maxbytes=CACHE_MAXBYTES,path=None):
+		self._maxbytes = maxbytes
+		self._path     = path
+		self._lru      = collections.OrderedDict()
+		self._nbytes   = 0
+		self._hits     = 0
+		self._misses   = 0
+		self._lock     = threading.Lock()
+		if path is not None and not os.path.isdir(path): os.makedirs(path)
+
+	def __len__(self):
+		return len(self._lru)
+
+	def __contains__(self,key):
+		return key in self._lru or (self._path is not None and os.path.isfile(self._fname(key)))
+
+	def _fname(self,key):
+		return os.path.join(self._path,key + '.npz')
+
+	def _insert(self,key,mask):
+		'''
+		Insert a mask in memory, evicting the least recently used ones.
+		Needs to be called holding the lock.
+		'''
+		if key in self._lru: self._nbytes -= self._lru.pop(key).nbytes
+		if mask.nbytes > self._maxbytes: return
+		self._lru[key] = mask
+		self._nbytes  += mask.nbytes
+		while self._nbytes > self._maxbytes:
+			self._nbytes -= self._lru.popitem(last=False)[1].nbytes
+
+	def key(self,kind,geometry,*arrays):
+		'''
+		Returns the key of a query of a kind (e.g., 'areinside') on a
+		geometry given by its content hash.
+		'''
+		return content_hash(kind,geometry,*arrays)
+
+	def get(self,key):
+		'''
+		Returns a copy of a mask or None if it is not cached.
+		'''
+		with self._lock:
+			mask = self._lru.get(key,None)
+			if mask is not None: self._lru.move_to_end(key)
+		if mask is None and self._path is not None and os.path.isfile(self._fname(key)):
+			try:
+				with np.load(self._fname(key)) as data:
+					mask = data['mask']
+			except (IOError, OSError, ValueError, KeyError):
+				mask = None # Unreadable file, recomputed and overwritten
+			if mask is not None:
+				mask.flags.writeable = False
+				with self._lock: self._insert(key,mask)
+		with self._lock:
+			if mask is None: self._misses += 1
+			else:            self._hits   += 1
+		return None if mask is None else mask.copy()
+
+	def put(self,key,mask):
+		'''
+		Store a copy of a mask.
+		'''
+		mask = np.array(mask)
+		mask.flags.writeable = False
+		with self._lock: self._insert(key,mask)
+		if self._path is not None:
+			# Write to a temporary file and rename so that other processes
+			# never read a partial file
+			fd, tmp = tempfile.mkstemp(suffix='.npz',dir=self._path)
+			try:
+				with os.fdopen(fd,'wb') as f: np.savez_compressed(f,mask=mask)
+				os.replace(tmp,self._fname(key))
+			except:
+				if os.path.exists(tmp): os.remove(tmp)
+				raise
+
+	def clear(self,disk=False):
+		'''
+		Drop the masks in memory and, if disk, also those stored in path.
+		'''
+		with self._lock:
+			self._lru.clear()
+			self._nbytes = 0
+		if disk and self._path is not None:
+			for fname in os.listdir(self._path):
+				if fname.endswith('.npz'): os.remove(os.path.join(self._path,fname))
+
+	@property
+	def maxbytes(self):
+		return self._maxbytes
+	@property
+	def nbytes(self):
+		return self._nbytes
+	@property
+	def path(self):
+		return self._path
+	@property
+	def hits(self):
+		return self._hits
+	@property
+	def misses(self):
+		return self._misses
+
+
+def enable_cache(maxbytes=CACHE_MAXBYTES,path=None):
+	'''
+	Enable the cache of masks used by areinside and grid_mask, optionally
+	stored on disk in path. Returns the cache.
+	'''
+	global _CACHE
+	_CACHE = MaskCache(maxbytes,path)
+	return _CACHE
+
+def disable_cache():
+	'''
+	Disable the cache of masks.
+	'''
+	global _CACHE
+	_CACHE = None
+
+def get_cache():
+	'''
+	Returns the active cache of masks or None if disabled.
+	'''
+	return _CACHE
+
+def lookup(kind,geometry,*arrays):
+	'''
+	Look a query up in the active cache. Returns its key (None if the
+	cache is disabled) and the cached mask (None if not found).
+	'''
+	cache = _CACHE
+	if cache is None or geometry is None: return None, None
+	key = cache.key(kind,geometry,*arrays)
+	return key, cache.get(key)
+
+def store(key,mask):
+	'''
+	Store the mask of a query in the active cache (see lookup) and
+	return it.
+	'''
+	cache = _CACHE
+	if cache is not None and key is not None: cache.put(key,mask)
+	return mask
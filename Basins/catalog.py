@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+
+from __future__ import print_function, division
+
+import importlib, numpy as np
+
+from .basic    import as_coordinates
+from .entities import label_dtype
+
+
+BINS_PER_BOX  = 64    # Average number of bins per box of the index
+MAX_BINS      = 65536 # Maximum number of bins of the index
+CATALOG_CHUNK = 65536 # Number of points labeled at once
+
+
+def _expand(start, cnt):
+	'''
+	Concatenation of the ranges start[i], ..., start[i]+cnt[i]-1.
+	'''
+	return np.repeat(start - np.cumsum(cnt) + cnt,cnt) + np.arange(np.sum(cnt))
+
+def _segments_cross(ax, ay, bx, by, cx, cy, dx, dy):
+	'''
+	True if the segments a-b cross (or touch) the segments c-d.
+	'''
+	def orient(px, py, qx, qy, rx, ry):
+		return np.sign((qx - px)*(ry - py) - (qy - py)*(rx - px))
+	o1, o2 = orient(ax,ay,bx,by,cx,cy), orient(ax,ay,bx,by,dx,dy)
+	o3, o4 = orient(cx,cy,dx,dy,ax,ay), orient(cx,cy,dx,dy,bx,by)
+	return (o1*o2 <= 0) & (o3*o4 <= 0)
+
+def poly_intersects_box(poly, box):
+	'''
+	Returns True if a polygon intersects a box [xmax,xmin,ymax,ymin]:
+	a vertex is inside the box, a corner of the box is inside the
+	polygon or an edge crosses the boundary of the box.
+	'''
+	x, y = poly.x, poly.y
+	if np.any((x >= box[1]) & (x <= box[0]) & (y >= box[3]) & (y <= box[2])): return True
+	corners = np.array([[box[1],box[3]],[box[0],box[3]],[box[0],box[2]],[box[1],box[2]]],dtype=np.double)
+	if np.any(poly.areinside_xy(corners[:,0],corners[:,1])): return True
+	for k in range(4):
+		c, d = corners[k], corners[(k+1)%4]
+		if np.any(_segments_cross(x[:-1],y[:-1],x[1:],y[1:],c[0],c[1],d[0],d[1])): return True
+	return False
+
+
+class BoxIndex(object):
+	'''
+	Spatial index over a set of boxes [xmax,xmin,ymax,ymin]: a uniform
+	grid of bins over their extent stores, in CSR format, the boxes that
+	overlap each bin (in increasing order). A query only tests the boxes
+	of the bin of each point, so routing an array of points costs a few
+	vectorized passes regardless of the number of boxes.
+	'''
+	def __init__(self,boxes,nbins=0):
+		boxes = np.asarray(boxes,dtype=np.double).reshape((-1,4))
+		self._n  = boxes.shape[0]
+		self._x0, self._x1, self._y0, self._y1 = boxes[:,1], boxes[:,0], boxes[:,3], boxes[:,2]
+		if self._n == 0: return
+		# Extent and number of bins, keeping them as square as possible
+		X0, X1, Y0, Y1 = np.min(self._x0), np.max(self._x1), np.min(self._y0), np.max(self._y1)
+		if nbins <= 0: nbins = min(max(BINS_PER_BOX*self._n,1),MAX_BINS)
+		lx, ly   = max(X1 - X0,1e-12), max(Y1 - Y0,1e-12)
+		nx       = min(max(1,int(np.sqrt(nbins*lx/ly))),nbins)
+		ny       = max(1,nbins//nx)
+		self._extent = (X0,X1,Y0,Y1,lx/nx,ly/ny,nx,ny)
+		# Bins overlapped by each box
+		c0, r0 = self._bins(self._x0,self._y0)
+		c1, r1 = self._bins(self._x1,self._y1)
+		ncol   = c1 - c0 + 1
+		nbox   = ncol*(r1 - r0 + 1)
+		e      = np.repeat(np.arange(self._n),nbox)
+		k      = _expand(np.zeros_like(nbox),nbox)
+		b      = (r0[e] + k//ncol[e])*nx + c0[e] + k%ncol[e]
+		# Store the boxes of each bin (CSR format)
+		self._off   = np.zeros((nx*ny+1,),dtype=int)
+		self._off[1:] = np.cumsum(np.bincount(b,minlength=nx*ny))
+		self._boxes = e[np.argsort(b,kind='stable')]
+
+	def __len__(self):
+		return self._n
+
+	def _bins(self,x,y):
+		'''
+		Column and row of the bins that contain each point (clipped).
+		'''
+		X0, X1, Y0, Y1, dx, dy, nx, ny = self._extent
+		return np.clip(((x - X0)/dx).astype(int),0,nx-1), np.clip(((y - Y0)/dy).astype(int),0,ny-1)
+
+	def _contains(self,ib,x,y):
+		'''
+		True if each point is inside (or on the boundary of) each box.
+		'''
+		return (x >= self._x0[ib]) & (x <= self._x1[ib]) & (y >= self._y0[ib]) & (y <= self._y1[ib])
+
+	def query_points(self,x,y):
+		'''
+		Returns the pairs (point, box) of the boxes that contain each
+		point (boundary included) as two arrays, sorted by point and box.
+		'''
+		ip = np.arange(x.shape[0])
+		if self._n == 0: return ip[:0], ip[:0]
+		X0, X1, Y0, Y1 = self._extent[:4]
+		ip   = ip[(x >= X0) & (x <= X1) & (y >= Y0) & (y <= Y1)]
+		i, j = self._bins(x[ip],y[ip])
+		b    = j*self._extent[6] + i
+		cnt  = self._off[b+1] - self._off[b]
+		ib   = self._boxes[_expand(self._off[b],cnt)]
+		ip   = np.repeat(ip,cnt)
+		keep = self._contains(ib,x[ip],y[ip])
+		return ip[keep], ib[keep]
+
+	def query_box(self,box):
+		'''
+		Returns, sorted, the boxes that intersect a box [xmax,xmin,ymax,ymin].
+		'''
+		ib = np.arange(self._n)
+		return ib[(self._x1 >= box[1]) & (self._x0 <= box[0]) & (self._y1 >= box[3]) & (self._y0 <= box[2])]
+
+
+class Catalog(object):
+	'''
+	Labeling engine over the basins of a set of catalog modules (all of
+	them by default). The boxes of the basins are read from the manifests
+	and indexed (see BoxIndex), so no geometry is loaded until a point
+	falls inside the box of a basin. Composed basins are not labeled, as
+	their members already are.
+
+	Each point is only tested against the basins whose box contains it,
+	and the labels of every module are obtained in a single pass, e.g.,
+
+		catalog = Basins.Catalog(['worldseas','mediterranean'])
+		labels  = catalog.label(lon,lat)
+		catalog.keys('worldseas')[labels['worldseas'][ip]]
+	'''
+	def __init__(self,modules=None):
+		from . import CATALOG_MODULES
+		self._modules = list(CATALOG_MODULES if modules is None else modules)
+		self._keys    = {}
+		item_module, item_label, boxes = [], [], []
+		for imod, name in enumerate(self._modules):
+			manifest = importlib.import_module('.'+name,__package__).manifest
+			self._keys[name] = []
+			for key in manifest:
+				info = manifest.info(key)
+				if info.iscomposed or info.box is None: continue
+				item_module.append(imod)
+				item_label.append(len(self._keys[name]))
+				boxes.append(info.box)
+				self._keys[name].append(key)
+		self._item_module = np.array(item_module,dtype=int)
+		self._item_label  = np.array(item_label,dtype=int)
+		self._index       = BoxIndex(np.array(boxes,dtype=np.double).reshape((-1,4)))
+
+	def __len__(self):
+		return len(self._index)
+
+	def __iter__(self):
+		return self._modules.__iter__()
+
+	def keys(self,module):
+		'''
+		Returns the keys of the labeled basins of a module, so that
+		keys(module)[label] is the basin of a label.
+		'''
+		return self._keys[module]
+
+	def basin(self,module,label):
+		'''
+		Returns (builds if needed) the basin of a label of a module.
+		'''
+		return getattr(importlib.import_module('.'+module,__package__),self._keys[module][label])
+
+	def _coordinates(self,x,y):
+		'''
+		Arrays of coordinates x and y of the points, given either as an
+		array x of shape (npoints,2) or (npoints,3) or as x and y.
+		'''
+		if y is None:
+			xyz = as_coordinates(x)
+			if not xyz.ndim == 2 or xyz.shape[1] not in (2,3): raise ValueError('Points must be of shape (npoints,2) or (npoints,3)!')
+			return xyz[:,0], xyz[:,1]
+		x, y = as_coordinates(x,y)
+		if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+		return x, y
+
+	def label(self,x,y=None,nthreads=0,chunk=CATALOG_CHUNK):
+		'''
+		Returns a dictionary with the labels of the points for each
+		module, i.e., the position in keys(module) of the first basin of
+		the module that contains each point (-1 if none).
+
+		The points are given either as an array x of shape (npoints,2) or
+		(npoints,3) or as two arrays of coordinates x and y.
+		'''
+		x, y    = self._coordinates(x,y)
+		npoints = x.shape[0]
+		out = dict([(m,-np.ones((npoints,),dtype=label_dtype(len(self._keys[m])))) for m in self._modules])
+		for ip0 in range(0,npoints,chunk):
+			xc, yc = x[ip0:ip0+chunk], y[ip0:ip0+chunk]
+			ip, item = self._index.query_points(xc,yc)
+			# Visit the basins in the order of the modules so that
+			# each point keeps the first basin of each module
+			order    = np.lexsort((ip,item))
+			ip, item = ip[order], item[order]
+			bounds   = np.flatnonzero(np.diff(item)) + 1
+			for i0, i1 in zip(np.r_[0,bounds],np.r_[bounds,item.shape[0]]):
+				if i1 == i0: continue
+				module = self._modules[self._item_module[item[i0]]]
+				lab    = out[module][ip0:ip0+chunk]
+				cand   = ip[i0:i1]
+				cand   = cand[lab[cand] < 0]
+				if cand.shape[0] == 0: continue
+				basin  = self.basin(module,self._item_label[item[i0]])
+				mask   = basin.areinside_xy(xc[cand],yc[cand],nthreads=nthreads)
+				lab[cand[mask]] = self._item_label[item[i0]]
+		return out
+
+	def memberships(self,x,y=None,nthreads=0,chunk=CATALOG_CHUNK):
+		'''
+		Returns every basin of the catalog (across all the modules) that
+		contains each point in CSR format, (offsets, indices), so that the
+		point ip is inside the basins items()[indices[offsets[ip]:offsets[ip+1]]].
+		'''
+		x, y    = self._coordinates(x,y)
+		npoints = x.shape[0]
+		pts, its = [], []
+		for ip0 in range(0,npoints,chunk):
+			xc, yc   = x[ip0:ip0+chunk], y[ip0:ip0+chunk]
+			ip, item = self._index.query_points(xc,yc)
+			order    = np.argsort(item,kind='stable')
+			ip, item = ip[order], item[order]
+			bounds   = np.flatnonzero(np.diff(item)) + 1
+			for i0, i1 in zip(np.r_[0,bounds],np.r_[bounds,item.shape[0]]):
+				if i1 == i0: continue
+				basin = self.basin(self._modules[self._item_module[item[i0]]],self._item_label[item[i0]])
+				cand  = ip[i0:i1]
+				cand  = cand[basin.areinside_xy(xc[cand],yc[cand],nthreads=nthreads)]
+				pts.append(cand + ip0)
+				its.append(np.full(cand.shape,item[i0],dtype=np.int32))
+		pts = np.concatenate(pts) if len(pts) > 0 else np.zeros((0,),dtype=int)
+		its = np.concatenate(its) if len(its) > 0 else np.zeros((0,),dtype=np.int32)
+		offsets = np.zeros((npoints+1,),dtype=np.int64)
+		offsets[1:] = np.cumsum(np.bincount(pts,minlength=npoints))
+		return offsets, its[np.lexsort((its,pts))]
+
+	def items(self):
+		'''
+		Returns the list of (module, key) of all the indexed basins,
+		in the order of the indices of memberships.
+		'''
+		return [(self._modules[m],self._keys[self._modules[m]][l]) for m, l in zip(self._item_module,self._item_label)]
+
+	def intersects(self,box,exact=False):
+		'''
+		Returns the list of (module, key) of the basins that intersect a
+		box [xmax,xmin,ymax,ymin] (e.g., the domain of a model). Only the
+		boxes of the basins are compared unless exact, in which case the
+		candidate basins are loaded and their polygons are tested.
+		'''
+		out = []
+		for item in self._index.query_box(box):
+			module, label = self._modules[self._item_module[item]], self._item_label[item]
+			if exact and not poly_intersects_box(self.basin(module,label),box): continue
+			out.append((module,self._keys[module][label]))
+		return out
+
+	@property
+	def modules(self):
+		return self._modules
@@ -4,20 +4,24 @@
 
 from __future__ import print_function, division
 
-from .entities import Basin, ComposedBasin, SimpleRectangle
+from .manifest import Manifest
 
+# Basins are built on first access
+manifest = Manifest(__name__)
 
-npolar     = Basin('npole',  'North Pole',      SimpleRectangle(-180, 180, 66.56, 90).points)   # between the North Pole and the  Arctic Cicle
-ntemperate = Basin('ntemp',  'North Temperate', SimpleRectangle(-180, 180, 40, 66.56).points)   # between the Arctic Circle and 40 degrees
-nsubtrop   = Basin('nstrop', 'North Subtropic', SimpleRectangle(-180, 180, 23.5, 40).points)    # between 40 degrees and the Tropic of Cancer
-tropic     = Basin('trop',   'Tropic',          SimpleRectangle(-180, 180, -23.5, 23.5).points) # between the Tropic of Cancer and the Tropic of Capricorn
-ssubtrop   = Basin('sstrop', 'South subtropic', SimpleRectangle(-180, 180, -40, -23.5).points)  # between -40 degrees and the Tropic of Capricorn
-stemperate = Basin('stemp',  'South Temperate', SimpleRectangle(-180, 180, -60, -40).points)    # between Antarctic Cicle and -40 degrees
-spolar     = Basin('spole',  'South Pole',      SimpleRectangle(-180, 180, -90, -66.56).points) # between the South Pole and Antarctic Cicle
+manifest.rectangle('npolar'    , 'npole',  'North Pole',      -180, 180, 66.56, 90)   # between the North Pole and the  Arctic Cicle
+manifest.rectangle('ntemperate', 'ntemp',  'North Temperate', -180, 180, 40, 66.56)   # between the Arctic Circle and 40 degrees
+manifest.rectangle('nsubtrop'  , 'nstrop', 'North Subtropic', -180, 180, 23.5, 40)    # between 40 degrees and the Tropic of Cancer
+manifest.rectangle('tropic'    , 'trop',   'Tropic',          -180, 180, -23.5, 23.5) # between the Tropic of Cancer and the Tropic of Capricorn
+manifest.rectangle('ssubtrop'  , 'sstrop', 'South subtropic', -180, 180, -40, -23.5)  # between -40 degrees and the Tropic of Capricorn
+manifest.rectangle('stemperate', 'stemp',  'South Temperate', -180, 180, -60, -40)    # between Antarctic Cicle and -40 degrees
+manifest.rectangle('spolar'    , 'spole',  'South Pole',      -180, 180, -90, -66.56) # between the South Pole and Antarctic Cicle
 
-subtropic  = ComposedBasin('strop', 'Subtropic', [nsubtrop,ssubtrop])
-temperate  = ComposedBasin('temp',  'Temperate', [ntemperate,stemperate])
-polar      = ComposedBasin('polar', 'Polar',     [npolar,spolar])
+manifest.composed('subtropic', 'strop', 'Subtropic', ['nsubtrop','ssubtrop'])
+manifest.composed('temperate', 'temp',  'Temperate', ['ntemperate','stemperate'])
+manifest.composed('polar'    , 'polar', 'Polar',     ['npolar','spolar'])
 
+__getattr__ = manifest.getattr
+__dir__     = manifest.dir
 
-del print_function, division, Basin, ComposedBasin, SimpleRectangle
\ No newline at end of file
+del print_function, division, Manifest
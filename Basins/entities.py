@@ -6,9 +6,11 @@ from __future__ import print_function, division
 
 import numpy as np
 
-from scipy.spatial  import ConvexHull
-
-from .basic import Point, Ball, Polygon
+from .          import stream, cache
+from .basic     import Point, Polygon, areinside_first, areinside_all, areinside_polyline, areinside_halfspaces, as_coordinates
+from .stream    import STREAM_CHUNK, STREAM_NWORKERS
+from .simplify  import simplify, BoundaryBand, LOD_TOLERANCES
+from .transform import PolygonView
 
 
 class Basin3D(Polygon):
@@ -17,8 +19,12 @@ class Basin3D(Polygon):
 	'''
 	def __init__(self,abbrev,name,points):
 		super(Basin3D, self).__init__(points)
-		self._abbrev = abbrev
-		self._name   = name
+		self._abbrev     = abbrev
+		self._name       = name
+		self._lods       = {}
+		self._bands      = {}   # Boundary bands of the levels of detail
+		self._lods_hash  = None # Hash of the vertices the levels were built from
+		self._lod_source = None # Stored levels of detail, e.g., from the shape pack
 
 	def __str__(self):
 		retstr = 'Basin %s (%s) with %d points:\n' % (self.name,self.abbrev,self.npoints)
@@ -41,18 +47,72 @@ class Basin3D(Polygon):
 		Build a basin from an array of points
 		of shape (npoints,3).
 		'''
-		pointList = np.array([Point.from_array(p) for p in xyz],dtype=Point)
-		return cls(abbrev,name,pointList)
+		return cls(abbrev,name,np.asarray(xyz,dtype=np.double))
+
+	def simplify(self,tol,method='dp',units='deg',topology=True):
+		'''
+		Returns a new basin simplified with a tolerance tol in degrees
+		or km (see simplify.simplify), so that the boundary moves at
+		most tol with far fewer edges.
+		'''
+		return self.__class__.from_array(self.abbrev,self.name,simplify(self.xyz,tol,method,units,topology))
+
+	def transformed(self,transform):
+		'''
+		Returns a view of the basin through a transform (see
+		transform.PolygonView), which shares its geometry.
+		'''
+		return PolygonView(self,transform)
+
+	def lod(self,tol):
+		'''
+		Returns the level of detail of the basin simplified (Douglas-Peucker)
+		with a tolerance tol in degrees. The levels are built only once
+		or read from the shape pack for the basins of the catalog.
+		'''
+		if not self._lods_hash == self.hash: # Vertices modified, drop the levels
+			self._lods, self._bands, self._lods_hash = {}, {}, self.hash
+		if tol not in self._lods:
+			xyz = self._lod_source(tol) if self._lod_source is not None else None
+			self._lods[tol] = self.simplify(tol) if xyz is None else self.__class__.from_array(self.abbrev,self.name,xyz)
+		return self._lods[tol]
+
+	def lod_tolerance(self,tol):
+		'''
+		Returns the coarsest level of detail (among LOD_TOLERANCES and the
+		levels already built) whose error is within tol, None if none.
+		'''
+		levels = [t for t in set(LOD_TOLERANCES) | set(self._lods.keys()) if t <= tol]
+		return max(levels) if len(levels) > 0 else None
+
+	def _areinside_lod(self,x,y,tol,nthreads,refine):
+		'''
+		Classify the points against the coarsest level of detail within tol.
+		The cells of its boundary band (see BoundaryBand) that are farther
+		than its tolerance from its edges are entirely inside or outside the
+		basin as well, so only the points on band cells are classified
+		against the basin if refine (or against the level if not).
+		'''
+		t = self.lod_tolerance(tol)
+		if t is None: return Polygon.areinside_xy(self,x,y,nthreads=nthreads)
+		lod = self.lod(t)
+		if t not in self._bands: self._bands[t] = BoundaryBand(lod,t)
+		cells = self._bands[t].classify(x,y)
+		out   = cells == 1
+		idx   = np.flatnonzero(cells == 2)
+		if idx.shape[0] > 0: out[idx] = Polygon.areinside_xy(self if refine else lod,x[idx],y[idx],nthreads=nthreads)
+		return out
 
 	@classmethod
-	def from_npy(cls,abbrev,name,fname,downsample=1):
+	def from_npy(cls,abbrev,name,fname,downsample=1,tol=None):
 		'''
 		Build a basin from an array of points
-		obtained by reading an npy file.
+		obtained by reading an npy file, optionally
+		simplified with a tolerance tol in degrees.
 		'''
 		xyz = np.load(fname)
-		pointList = np.array([Point.from_array(p) for p in xyz[::downsample,:]],dtype=Point)
-		return cls(abbrev,name,pointList)
+		if tol is not None: return cls(abbrev,name,simplify(xyz,tol))
+		return cls(abbrev,name,xyz[::downsample,:])
 
 	@property
 	def abbrev(self):
@@ -66,6 +126,13 @@ class Basin3D(Polygon):
 	def box(self):
 		return [np.max(self.x),np.min(self.x),np.max(self.y),np.min(self.y)]
 
+	@property
+	def lods(self):
+		'''
+		Tolerances of the levels of detail built so far.
+		'''
+		return sorted(self._lods.keys())
+
 class Basin(Basin3D):
 	'''
 	A region defined by a polygon.
@@ -73,31 +140,103 @@ class Basin(Basin3D):
 	def __init__(self,abbrev,name,points):
 		super(Basin, self).__init__(abbrev,name,points)
 
-	def areinside(self,xy):
+	def areinside(self,xy,nthreads=0,tol=None,refine=True):
 		'''
 		Returns True if the points are inside the polygon, else False.
+		Only the x and y coordinates of the points are used, which are
+		read without copies (see areinside_xy), also if they are float32.
+		'''
+		xy = as_coordinates(xy)
+		return self.areinside_xy(xy[:,0],xy[:,1],nthreads=nthreads,tol=tol,refine=refine)
+
+	def areinside_xy(self,x,y,nthreads=0,tol=None,refine=True):
+		'''
+		Returns True if the points, given as two arrays of coordinates
+		x and y, are inside the polygon, else False.
+
+		If a tolerance tol (in degrees) is given, the points are first
+		classified against the coarsest level of detail whose error is
+		within tol (see lod) and only the points near its edges are
+		classified again against the basin, so the result is the same
+		with far fewer edges visited. Without refine, the points closer
+		than tol to the edges may be misclassified.
 		'''
-		xyz = np.array([[p[0],p[1],0.] for p in xy])
-		return super(Basin, self).areinside(xyz)
+		if tol is None: return super(Basin, self).areinside_xy(x,y,nthreads=nthreads)
+		x, y = as_coordinates(x,y)
+		if not x.shape[0] == y.shape[0]: raise ValueError('x and y must have the same number of points!')
+		return self._areinside_lod(x,y,tol,nthreads,refine)
 
 	@classmethod
 	def from_array(cls,abbrev,name,xyz):
 		'''
 		Build a basin from an array of points
-		of shape (npoints,3).
+		of shape (npoints,2) or (npoints,3), z is set to 0.
 		'''
-		pointList = np.array([Point.from_array(np.array([p[0],p[1],0.],np.double)) for p in xyz],dtype=Point)
-		return cls(abbrev,name,pointList)
+		return cls(abbrev,name,np.asarray(xyz,dtype=np.double)[:,:2])
 
 	@classmethod
-	def from_npy(cls,abbrev,name,fname,downsample=1):
+	def from_npy(cls,abbrev,name,fname,downsample=1,tol=None):
 		'''
 		Build a basin from an array of points
-		obtained by reading an npy file.
+		obtained by reading an npy file, optionally
+		simplified with a tolerance tol in degrees.
 		'''
 		xyz = np.load(fname)
-		pointList = np.array([Point.from_array(np.array([p[0],p[1],0.],np.double)) for p in xyz[::downsample,:2]],dtype=Point)
-		return cls(abbrev,name,pointList)
+		if tol is not None: return cls(abbrev,name,simplify(xyz[:,:2],tol))
+		return cls(abbrev,name,xyz[::downsample,:2])
+
+
+_NOT_FOUND = None
+
+def not_found():
+	'''
+	Placeholder basin for the points that are not inside
+	any basin, built only once.
+	'''
+	global _NOT_FOUND
+	if _NOT_FOUND is None: _NOT_FOUND = Basin('none','Not Found',np.array([Point(0.,0.,0.)]))
+	return _NOT_FOUND
+
+def label_dtype(nlabels):
+	'''
+	Returns the smallest integer type able to hold
+	nlabels labels and -1.
+	'''
+	for dtype in [np.int8,np.int16]:
+		if nlabels <= np.iinfo(dtype).max + 1: return dtype
+	return np.int32
+
+def membership_bits(offsets,indices,ncols):
+	'''
+	Returns the memberships in CSR format (see areinside_all) as a
+	packed bit matrix of shape (npoints,ceil(ncols/8)), which can be
+	unpacked with np.unpackbits(bits,axis=1,count=ncols).
+	'''
+	npoints = offsets.shape[0] - 1
+	indices = np.asarray(indices,dtype=np.int64)
+	bits    = np.zeros((npoints,(ncols + 7)//8),dtype=np.uint8)
+	rows    = np.repeat(np.arange(npoints),np.diff(offsets))
+	np.bitwise_or.at(bits,(rows,indices >> 3),(0x80 >> (indices & 7)).astype(np.uint8))
+	return bits
+
+def isnative(basin):
+	'''
+	True if the basin is classified by the kernels of Polygon (i.e.,
+	a Polygon or a Basin), which areinside_first and areinside_all
+	run at once, else False (e.g., a Rectangle, a Cube or a view).
+	'''
+	return isinstance(basin,Polygon) and type(basin).areinside in (Polygon.areinside,Basin.areinside)
+
+def member_areinside(basin,x,y,z=None):
+	'''
+	Returns True if the points (x,y,z) are inside a basin that is not
+	native (see isnative), using its own areinside, else False. The
+	points are on the plane z = 0 if z is None.
+	'''
+	xyz = np.zeros((np.shape(x)[0],3),dtype=np.double)
+	xyz[:,0], xyz[:,1] = x, y
+	if z is not None: xyz[:,2] = z
+	return np.asarray(basin.areinside(xyz),dtype=bool)
 
 
 class ComposedBasin(object):
@@ -167,27 +306,225 @@ class ComposedBasin(object):
 		'''
 		for basin in self.basins:
 			if basin.isinside(point): return basin
-		return Basin('none','Not Found',np.array([Point(0.,0.,0.)]))
+		return not_found()
 
-	def areinside(self,xyz):
+	def isinside_xy(self,x,y):
+		'''
+		Returns True if the point (x,y) is inside the polygon, else False.
+		'''
+		for basin in self.basins:
+			if basin.isinside_xy(x,y): return True
+		return False
+
+	def areinside(self,xyz,nthreads=0,tol=None,refine=True):
 		'''
 		Returns True if the points are inside the polygon, else False.
+		Only the x and y coordinates of the points are used for the
+		polygons, the basins that are not native (see isnative), e.g.,
+		cubes, also get the z coordinate.
+		'''
+		xyz = as_coordinates(xyz)
+		z   = xyz[:,2] if xyz.shape[1] > 2 else None
+		return self._areinside(xyz[:,0],xyz[:,1],z,nthreads,tol,refine)
+
+	def areinside_xy(self,x,y,nthreads=0,tol=None,refine=True):
+		'''
+		Returns True if the points, given as two arrays of coordinates
+		x and y, are inside the polygon, else False. If tol is given,
+		each basin is classified by levels of detail (see Basin.areinside_xy).
+		'''
+		x, y = as_coordinates(x,y)
+		return self._areinside(x,y,None,nthreads,tol,refine)
+
+	def _areinside(self,x,y,z,nthreads,tol,refine):
+		'''
+		Returns True if the points (x,y,z) are inside the polygon, else
+		False (see areinside), z can be None.
+		'''
+		if tol is not None:
+			out = np.zeros((x.shape[0],),dtype=bool)
+			for basin in self.basins:
+				if isinstance(basin,ComposedBasin):
+					out |= basin._areinside(x,y,z,nthreads,tol,refine)
+				elif isinstance(basin,Basin):
+					out |= basin.areinside_xy(x,y,nthreads=nthreads,tol=tol,refine=refine)
+				else:
+					out |= member_areinside(basin,x,y,z)
+			return out
+		if z is None:
+			key, out = cache.lookup('areinside_xy',self._cache_hash(),x,y)
+		else:
+			key, out = cache.lookup('areinside',self._cache_hash(),x,y,z)
+		if out is not None: return out
+		return cache.store(key,self._areinside_first(x,y,z,nthreads=nthreads) >= 0)
+
+	def grid_mask(self,x,y,nthreads=0):
+		'''
+		Returns the mask of the union of the basins on a rectilinear grid
+		given by its axes x and y, of shape (ny,nx) (see Polygon.grid_mask).
+		The native basins (see isnative) are rasterized while any other
+		basin uses its own areinside on the nodes of the grid.
+		'''
+		out = np.zeros((np.shape(y)[0],np.shape(x)[0]),dtype=bool)
+		xx, yy = None, None
+		for _, basin in self._members():
+			if isnative(basin):
+				out |= basin.grid_mask(x,y,nthreads=nthreads)
+			else:
+				if xx is None: xx, yy = [a.ravel() for a in np.meshgrid(np.asarray(x,dtype=np.double),np.asarray(y,dtype=np.double))]
+				out |= member_areinside(basin,xx,yy).reshape(out.shape)
+		return out
+
+	def iter_areinside(self,source,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+		'''
+		Returns a generator of the masks of the chunks of points of a
+		source that does not need to fit in memory (see Polygon.iter_areinside).
 		'''
-		out = np.zeros((xyz.shape[0],len(self.basins)),dtype=bool)
-		for ii,basin in enumerate(self.basins):
-			out[:,ii] = basin.areinside(xyz)
-		return np.logical_or.reduce(out,axis=1)
+		return stream.iter_areinside(self,source,chunk,nworkers)
 
-	def areinbasin(self,xyz):
+	def stream_areinside(self,source,out,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+		'''
+		Classify the chunks of points of a source and write the masks
+		into out (see Polygon.stream_areinside).
+		'''
+		return stream.stream_areinside(self,source,out,chunk,nworkers)
+
+	def areinbasin(self,xyz,nthreads=0):
 		'''
 		Returns a list with the basins that the points are inside 
-		'''		
-		out = np.array([Basin('none','Not Found',np.array([Point(0.,0.,0.)]))]*xyz.shape[0],object)
-		for ii,basin in enumerate(self.basins):
-			mask = basin.areinside(xyz)
-			out[mask] = basin
+		'''
+		labels, basins = self.areinbasin_labels(xyz,nthreads=nthreads)
+		lookup = np.empty((len(basins)+1,),object)
+		lookup[:-1] = basins
+		lookup[-1]  = not_found()
+		return lookup[labels]
+
+	def areinbasin_labels(self,xyz,nthreads=0):
+		'''
+		Returns, for each point, the position of the basin that it is
+		inside (-1 if none) as a compact integer array (int8 for up to
+		128 basins, else int16) together with the list of basins to look
+		the labels up, i.e., basins[labels[ip]].
+		'''
+		xyz    = as_coordinates(xyz)
+		z      = xyz[:,2] if xyz.shape[1] > 2 else None
+		labels = self._areinside_first(xyz[:,0],xyz[:,1],z,nthreads=nthreads,dtype=label_dtype(len(self.basins)))
+		return labels, list(self.basins)
+
+	def areinbasin_all(self,xyz,nthreads=0):
+		'''
+		Returns every basin that contains each point in CSR format,
+		(offsets, indices), together with the list of basins to look
+		the indices up, i.e., the point ip is inside the basins
+		basins[indices[offsets[ip]:offsets[ip+1]]] (see areinside_all).
+		'''
+		xyz = as_coordinates(xyz)
+		z   = xyz[:,2] if xyz.shape[1] > 2 else None
+		offsets, indices = self._areinside_all(xyz[:,0],xyz[:,1],z)
+		return offsets, indices, list(self.basins)
+
+	def _members(self):
+		'''
+		Returns the basins, with the nested composed basins flattened,
+		as a list of (position, basin) where position is that of the
+		basin (or of the composed basin that holds it) in self.basins.
+		'''
+		out = []
+		for ib, basin in enumerate(self.basins):
+			if isinstance(basin,ComposedBasin):
+				out += [(ib,b) for _,b in basin._members()]
+			else:
+				out.append((ib,basin))
 		return out
 
+	def _areinside_first(self,x,y,z=None,nthreads=0,dtype=np.int32):
+		'''
+		Returns, for each point, the position in self.basins of the first
+		basin that contains it or -1 (see areinside_first). The runs of
+		native basins (see isnative) go to areinside_first at once while
+		any other basin uses its own areinside (with z, if given), both
+		only on the points that have not been assigned yet.
+		'''
+		members = self._members()
+		if all(pos == ib and isnative(b) for ib,(pos,b) in enumerate(members)):
+			return areinside_first([b for _,b in members],x,y,nthreads=nthreads,dtype=dtype)
+		out = -np.ones((x.shape[0],),dtype=dtype)
+		ib  = 0
+		while ib < len(members):
+			cand = np.flatnonzero(out < 0)
+			if cand.shape[0] == 0: break
+			if isnative(members[ib][1]):
+				ie = ib
+				while ie < len(members) and isnative(members[ie][1]): ie += 1
+				pos   = np.array([p for p,_ in members[ib:ie]] + [-1],dtype=dtype)
+				first = areinside_first([b for _,b in members[ib:ie]],x[cand],y[cand],nthreads=nthreads)
+				out[cand] = pos[first] # -1 picks the last position, i.e., -1
+				ib = ie
+			else:
+				pos, basin = members[ib]
+				out[cand[member_areinside(basin,x[cand],y[cand],None if z is None else z[cand])]] = pos
+				ib += 1
+		return out
+
+	def _areinside_all(self,x,y,z=None):
+		'''
+		Returns every basin of self.basins that contains each point in
+		CSR format (see areinside_all). The native basins (see isnative)
+		go to areinside_all at once while any other basin uses its own
+		areinside (with z, if given).
+		'''
+		members = self._members()
+		if all(pos == ib and isnative(b) for ib,(pos,b) in enumerate(members)):
+			return areinside_all([b for _,b in members],x,y)
+		npoints = x.shape[0]
+		native  = [(pos,b) for pos,b in members if isnative(b)]
+		ip, ib  = [], []
+		if len(native) > 0:
+			offsets, indices = areinside_all([b for _,b in native],x,y)
+			ip.append(np.repeat(np.arange(npoints),np.diff(offsets)))
+			ib.append(np.array([pos for pos,_ in native],dtype=np.int32)[indices])
+		for pos, basin in members:
+			if isnative(basin): continue
+			inside = np.flatnonzero(member_areinside(basin,x,y,z))
+			ip.append(inside)
+			ib.append(np.full(inside.shape,pos,dtype=np.int32))
+		# Sorted and unique pairs (point, position) as a single key
+		nbasins = max(len(self.basins),1)
+		key     = np.unique(np.concatenate(ip).astype(np.int64)*nbasins + np.concatenate(ib)) if len(ip) > 0 else np.zeros((0,),dtype=np.int64)
+		offsets = np.zeros((npoints+1,),dtype=np.int64)
+		offsets[1:] = np.cumsum(np.bincount(key//nbasins,minlength=npoints))
+		return offsets, (key % nbasins).astype(np.int32)
+
+	def build_grid(self,nx=0,ny=0):
+		'''
+		Build the cell grid of each basin (see Polygon.build_grid).
+		'''
+		for basin in self.basins:
+			basin.build_grid(nx,ny)
+		return self
+
+	def clear_grid(self):
+		'''
+		Drop the cell grid of each basin.
+		'''
+		for basin in self.basins:
+			basin.clear_grid()
+		return self
+
+	def simplify(self,tol,method='dp',units='deg',topology=True):
+		'''
+		Returns a new composed basin with each basin simplified
+		(see Basin3D.simplify).
+		'''
+		return ComposedBasin(self.abbrev,self.name,[basin.simplify(tol,method,units,topology) for basin in self.basins])
+
+	def lod(self,tol):
+		'''
+		Returns the composed basin of the levels of detail
+		of each basin (see Basin3D.lod).
+		'''
+		return ComposedBasin(self.abbrev,self.name,[basin.lod(tol) for basin in self.basins])
+
 	def compute_centroid(self):
 		'''
 		Returns the centroid.
@@ -206,6 +543,22 @@ class ComposedBasin(object):
 	def name(self):
 		return self._name
 
+	def _cache_hash(self):
+		'''
+		Content hash to look the masks up, None (not computed)
+		if the cache is disabled.
+		'''
+		return None if cache.get_cache() is None else self.hash
+
+	@property
+	def hash(self):
+		'''
+		Content hash of the basins (in order), used to cache the masks.
+		None (no caching) if some basin has no content hash.
+		'''
+		hashes = [getattr(basin,'hash',None) for basin in self.basins]
+		if any(h is None for h in hashes): return None
+		return cache.content_hash(*hashes)
 	@property
 	def basins(self):
 		return self._list
@@ -225,27 +578,36 @@ class ComposedBasin(object):
 
 class Line(object):
 	'''
-	A 2D line defined by 2 points and discretized by a number
-	of points inside that line.
+	A line (polyline) defined by its vertices and discretized by a
+	number of points along it. A point is inside (close to) the line
+	if it is within the spacing of the discretization (width) of one
+	of its segments.
 	'''
 	def __init__(self, p1, p2, npoints=100):
-		d = p2 - p1 # vector pointing in the direction of the line
-		f = np.linspace(0.,1.,npoints)
-		# Preallocate
-		self._points = [Point(p1.x,p1.y,p1.z) for p in range(npoints)]
-		self._bbox   = [Ball() for p in range(npoints)]
-		for ip in range(1,npoints):
-			# Build the point list
-			self._points[ip].xyz = p1.xyz + f[ip]*d.xyz
-			# For each point compute a ball centered on the point with
-			# a radius of half the distance to the last point
-			vec = self._points[ip] - self._points[ip-1]
-			self._bbox[ip] = Ball(self._points[ip],vec.norm())
-		# Add the ball for the first point
-		vec = self._points[1] - self._points[0]
-		self._bbox[0] = Ball(self._points[0],vec.norm())
-		if not self._points[-1] == p2: raise ValueError('Last point does not match!!')
-		self._dist = np.array([])
+		self._set(np.array([p1.xyz,p2.xyz],dtype=np.double),npoints)
+
+	def _set(self,vertices,npoints):
+		'''
+		Set the vertices and discretize the polyline by arc length.
+		'''
+		vertices = np.asarray(vertices,dtype=np.double)
+		s   = np.concatenate(([0.],np.cumsum(np.sqrt(np.sum(np.diff(vertices,axis=0)**2,axis=1)))))
+		f   = np.linspace(0.,s[-1],npoints)
+		xyz = np.column_stack([np.interp(f,s,vertices[:,idim]) for idim in range(3)])
+		xyz[0], xyz[-1] = vertices[0], vertices[-1]
+		self._vertices = vertices
+		self._width    = s[-1]/max(npoints-1,1)
+		self._set_points(xyz)
+
+	def _set_points(self,xyz):
+		'''
+		Set the points of the discretization, each with a ball of radius
+		the distance to the previous point (the next one for the first).
+		'''
+		d = np.sqrt(np.sum(np.diff(xyz,axis=0)**2,axis=1))
+		self._xyz     = xyz
+		self._radius  = np.concatenate((d[:1],d))
+		self._weights = None # Interpolation weights of the last points (key, matrix)
 
 	def isempty(self):
 		return self.npoints == 0
@@ -254,62 +616,86 @@ class Line(object):
 		'''
 		Returns True if the point is inside (close to) the line, else False.
 		'''
-		for b in self._bbox:
-			if b.isinside(point): return True # Point is inside the bounding box
-		return False
+		return bool(areinside_polyline(self._vertices,self._width,np.array([point.xyz]))[0])
+
+	def areinside(self,xyz,algorithm=None,nthreads=0):
+		'''
+		Returns True if the points are inside (close to) the line, else False.
+		The distance to the segments is computed in a single compiled call.
+		'''
+		return areinside_polyline(self._vertices,self._width,xyz,nthreads=nthreads)
+
+	def weights(self,xyz):
+		'''
+		Returns the sparse matrix of shape (npoints,N) of the inverse
+		distance weights of the N points xyz that are inside the ball of
+		each point of the line. The points near the line are found with
+		a KD-tree and the weights are kept for the last xyz (by content).
+		'''
+		from scipy.spatial import cKDTree  # Only needed here, import on demand
+		from scipy.sparse  import csr_matrix
+		xyz = np.asarray(xyz,dtype=np.double)
+		key = cache.content_hash(xyz)
+		if self._weights is not None and self._weights[0] == key: return self._weights[1]
+		center = self._xyz[:,:xyz.shape[1]]
+		radius = self._radius
+		# Only the points in the box of the balls are indexed
+		lo, hi = np.min(center,axis=0) - np.max(radius), np.max(center,axis=0) + np.max(radius)
+		cand   = np.flatnonzero(np.all((xyz >= lo) & (xyz <= hi),axis=1))
+		near   = cKDTree(xyz[cand]).query_ball_point(center,radius) if cand.shape[0] > 0 else [[] for _ in range(self.npoints)]
+		cnt    = np.array([len(n) for n in near],dtype=np.intp)
+		row    = np.repeat(np.arange(self.npoints),cnt)
+		col    = cand[np.concatenate(near).astype(np.intp)] if np.sum(cnt) > 0 else np.array([],np.intp)
+		dist   = np.sqrt(np.sum((xyz[col] - center[row])**2,axis=1))
+		mask   = dist < radius[row] # Same criteria as Ball.areinside
+		row, col, dist = row[mask], col[mask], dist[mask]
+		# If there is a point matching exactly our point then the distance
+		# is 0, so the weight should be infinite
+		w = np.where(dist > 0.,1./np.where(dist > 0.,dist,1.),1.e20)
+		self._weights = (key,csr_matrix((w,(row,col)),shape=(self.npoints,xyz.shape[0])))
+		return self._weights[1]
 
-	def areinside(self,xyz,algorithm=None):
+	def interpolate(self,xyz,var):
 		'''
-		Returns True if the points are inside (close to) the polygon, else False.
+		Interpolates a variable value to the points of the line.
+		Assume xyz and var as masked points. The variable can be of
+		shape (N,) or (N,...), e.g., several variables or timesteps,
+		which are interpolated at once.
 		'''
-		out = np.zeros((xyz.shape[0],),dtype=bool)
-		# Loop on the point boxes and compute the points that are inside the box
-		for b in self._bbox:
-			idx      = b.areinside(xyz) # Points are inside the bounding box
-			out[idx] = True
-		return out
+		w   = self.weights(xyz)
+		var = np.asarray(var)
+		out = w.dot(var.reshape((var.shape[0],-1)))/np.asarray(w.sum(axis=1))
+		return out.reshape((self.npoints,) + var.shape[1:]).astype(var.dtype,copy=False)
 
-	def interpolate(self,xyz,var):
+	@classmethod
+	def from_array(cls,vertices,npoints=100):
 		'''
-		Interpolates a variable value to the points of the line.
-		Assume xyz and var as masked points.
-		'''
-		if len(self._dist) == 0:
-			self._dist = np.zeros((self.npoints,xyz.shape[0]),dtype=np.double)
-			# Loop on the point boxes and compute the points that are inside the box
-			for ip,b in enumerate(self._bbox):
-				idx = b.areinside(xyz) # Points are inside the bounding box
-				if len(idx) > 0:
-					vec = xyz[idx] - np.tile(b.center.xyz,(xyz[idx].shape[0],1))
-					self._dist[ip,idx] = np.sqrt(np.sum(vec*vec,axis=1))
-					# If there is a point matching exactly our point then
-					# the distance will be 0, so when we invert the distances
-					# the weight should be infinite
-					id0 = self._dist[ip,idx] == 0.
-					self._dist[ip,idx]      = 1./self._dist[ip,idx]
-					self._dist[ip,idx][id0] = 1.e20
-		# Compute interpolated variable	
-		out = np.zeros((len(self._bbox),var.shape[1]) if len(var.shape) > 1 else (len(self._bbox),) ,dtype=var.dtype)
-		sum_dist = np.sum(self._dist,axis=1) # length of npoints on the line
-		# Compute the averaged for the field
-		if len(var.shape) > 1: 
-			# Vectorial array
-			for idim in range(var.shape[1]):
-				out[:,idim] = np.matmul(self._dist,var[:,idim])/sum_dist
-		else:
-			# Scalar array
-			out[:] = np.matmul(self._dist,var)/sum_dist
+		Build a line from an array of vertices of shape
+		(nvertices,2) or (nvertices,3), z is set to 0.
+		'''
+		vertices = np.asarray(vertices,dtype=np.double)
+		out = cls.__new__(cls)
+		out._set(np.column_stack((vertices,np.zeros((vertices.shape[0],3-vertices.shape[1])))),npoints)
 		return out
 
 	@property
 	def npoints(self):
-		return len(self._points)
+		return self._xyz.shape[0]
 	@property
 	def points(self):
-		return self._points
+		return [Point.from_array(xyz) for xyz in self._xyz]
 	@points.setter
 	def points(self,value):
-		self._points = value
+		self._set_points(np.array([p.xyz for p in value],dtype=np.double))
+	@property
+	def xyz(self):
+		return self._xyz
+	@property
+	def vertices(self):
+		return self._vertices
+	@property
+	def width(self):
+		return self._width
 
 
 class SimpleRectangle(Polygon):
@@ -385,8 +771,9 @@ class Rectangle(Polygon):
 		if not len(points) == 4: raise ValueError('Invalid Rectangle!')
 		self._abbrev = 'r'
 		self._name   = 'Rectangle'
-		self._center = Point.from_array(0.25*(points[0].xyz+points[1].xyz+points[2].xyz+points[3].xyz))
 		super(Rectangle, self).__init__(points)
+		self._center     = Point.from_array(np.mean(self.xyz,axis=0))
+		self._halfspaces = None
 
 	def normal(self):
 		'''
@@ -416,36 +803,54 @@ class Rectangle(Polygon):
 			vp      = point - np.tile(self.points[0].xyz,(npoints,)).reshape(npoints,3)
 			dist    = np.tile(np.sum(vp*n,axis=1),(3,1)).T
 		# Projected point in the Rectangle plane
-		return point + n*dist, dist
+		return point - n*dist, dist
 
-	def inclusion3D(self,point):
+	def _build_halfspaces(self):
 		'''
-		3D inclusion is easily determined by projecting the point and polygon into 2D. 
-		To do this, one simply ignores one of the 3D coordinates and uses the other two.
-		To optimally select the coordinate to ignore, compute a normal vector to the plane, 
-		and select the coordinate with the largest absolute value [Snyder & Barr, 1987]. 
-		This gives the projection of the polygon with maximum area, and results in robust computations.
+		Half-spaces (a,b,c,d) of the edges of the Rectangle on the
+		xy plane, so that the inside is a*x + b*y + d < 0 (see
+		areinside_halfspaces for the points on the edges).
+		'''
+		xy = self.xyz[:,:2]
+		e  = np.roll(xy,-1,axis=0) - xy
+		# Outward normals of the edges, regardless of the orientation
+		n  = np.column_stack([e[:,1],-e[:,0],np.zeros((4,))])
+		n *= np.sign(np.sum(xy[:,0]*np.roll(xy[:,1],-1) - np.roll(xy[:,0],-1)*xy[:,1]))
+		n /= np.linalg.norm(n,axis=1)[:,None]
+		return np.column_stack([n,-np.sum(n[:,:2]*xy,axis=1)])
 
-		This function is for internal use inside the Cube method.
+	@property
+	def halfspaces(self):
 		'''
-		n   = self.normal()       # Normal to the plane
-		p,_ = self.project(point) # Projected point
-		# Which is the biggest dimension?
-		idmax = np.argmax(np.abs(n.xyz))
-		# Convert to xy the smallest dimensions for Rectangle
-		points = self.points
-		for ip in range(self.npoints):
-			points[ip].xyz = np.append(np.delete(self.points[ip].xyz,idmax),np.zeros((1,)))
-		self.points = points
-		# Redo the bounding box
-		self.bbox = Ball.fastBall(self)
-		# Do the same for the points
-		if isinstance(point,Point):
-			p.xyz =  np.append(np.delete(p.xyz,idmax),np.zeros((1,)))
-		else:
-			npoints = p.shape[0]
-			p =  np.append(np.delete(p,idmax,axis=1),np.zeros((npoints,1)),axis=1)
-		return p
+		Half-spaces of the region as an array of shape (nplanes,4) where
+		each row (a,b,c,d) contains the points with a*x + b*y + c*z + d < 0
+		and the points on the edges follow the half-open rule of Polygon
+		(see areinside_halfspaces). They are computed once and recomputed
+		only if the vertices change.
+		'''
+		if self._halfspaces is None or not self._halfspaces[0] == self.hash:
+			self._halfspaces = (self.hash,self._build_halfspaces())
+		return self._halfspaces[1]
+
+	def isinside(self,point,algorithm=None):
+		'''
+		Returns True if the point is inside all the half-spaces, else False.
+		'''
+		return bool(areinside_halfspaces(self.halfspaces,point.xyz.reshape((1,3)))[0])
+
+	def areinside(self,xyz,algorithm=None,nthreads=0):
+		'''
+		Returns True if the points are inside all the half-spaces, else False.
+		The points are given as an array of shape (npoints,2) or (npoints,3).
+		'''
+		return areinside_halfspaces(self.halfspaces,xyz,nthreads=nthreads)
+
+	def areinside_xy(self,x,y,algorithm=None,nthreads=0):
+		'''
+		Returns True if the points (x,y) are inside all the half-spaces,
+		else False.
+		'''
+		return areinside_halfspaces(self.halfspaces,x,y,nthreads=nthreads)
 
 	@classmethod
 	def from_array(cls,xyz):
@@ -486,44 +891,31 @@ class Plane(Rectangle):
 		self._name   = 'Plane'
 		super(Plane, self).__init__(points)
 
-	def isinside(self,point,algorithm=None):
+	def _build_halfspaces(self):
 		'''
-		Project the point to the plane defined by the 3D rectangle
-		and obtain the inclusion.
-		'''
-		# Create an auxiliary rectangle
-		points = np.array([self.points[0].xyz,
-						   self.points[1].xyz,
-						   self.points[2].xyz,
-						   self.points[3].xyz
-						  ]).copy()
-		aux = Rectangle.from_array(points)
-		# Obtain the distance of the point to the plane
-		_,dist = aux.project(point)
-		# Check if the projected point is inside the face
-		inside = aux.isinside(aux.inclusion3D(point))
-		# Appart from being inside the point has to fulfill the minimum distance
-		return inside and dist <= self._mindist
-
-	def areinside(self,xyz,algorithm=None):
+		Half-spaces of the slab of thickness 2*mindist around the plane
+		and of the in-plane normals of the edges, so that a point is inside
+		if its projection is inside the rectangle and it fulfills the
+		minimum distance.
 		'''
-		Project the points to the plane defined by the 3D rectangle
-		and obtain the inclusion.
-		'''
-		# Create an auxiliary rectangle
-		points = np.array([self.points[0].xyz,
-						   self.points[1].xyz,
-						   self.points[2].xyz,
-						   self.points[3].xyz
-						  ]).copy()
-		aux = Rectangle.from_array(points)
-		# Obtain the distance of the point to the plane
-		_,dist = aux.project(xyz)
-		# Check if the projected point is inside the face
-		inside = aux.areinside(aux.inclusion3D(xyz))
-		# Appart from being inside the point has to fulfill the minimum distance
-		print(inside,dist)
-		return np.logical_and(inside,np.abs(dist[:,0]) <= self._mindist)
+		xyz = self.xyz
+		c   = np.mean(xyz,axis=0)
+		n   = self.normal().xyz
+		hs  = [np.append(n,-np.dot(n,c)-self._mindist),np.append(-n,np.dot(n,c)-self._mindist)]
+		for ip in range(4):
+			m = np.cross(n,xyz[(ip+1)%4]-xyz[ip])
+			m = m/np.linalg.norm(m)
+			if np.dot(m,c-xyz[ip]) > 0: m = -m # Outward
+			hs.append(np.append(m,-np.dot(m,xyz[ip])))
+		return np.array(hs)
+
+	@property
+	def mindist(self):
+		return self._mindist
+	@mindist.setter
+	def mindist(self,value):
+		self._mindist    = value
+		self._halfspaces = None
 
 	@property
 	def abbrev(self):
@@ -607,52 +999,51 @@ class Cube(Polygon):
 		if not len(points) == 8: raise ValueError('Invalid Cube!')
 		super(Cube, self).__init__(points)
 		# Generate the indices for each face
-		self._face_ids = [(0,1,2,3),(4,5,6,7),(0,1,5,4),(2,6,7,3),(0,3,7,4),(1,2,6,5)]
+		self._face_ids   = [(0,1,2,3),(4,5,6,7),(0,1,5,4),(2,6,7,3),(0,3,7,4),(1,2,6,5)]
+		self._halfspaces = None
 
-	def isinside(self,point,algorithm=None):
+	def _build_halfspaces(self):
 		'''
-		Project the point to each of the faces of the cube and check
-		if the point is inside or outside of the 2D geometry.
-		Each face is a rectangle
+		Half-spaces of the faces of the cube with outward normals.
 		'''
-		# Loop the faces
+		xyz = self.xyz
+		c   = np.mean(xyz,axis=0)
+		hs  = []
 		for face_id in self._face_ids:
-			face_points = np.array([self.points[face_id[0]].xyz,
-							        self.points[face_id[1]].xyz,
-							        self.points[face_id[2]].xyz,
-							        self.points[face_id[3]].xyz
-							      ]).copy()
-			# Obtain each face as a Rectangle
-			face = Rectangle.from_array(face_points)
-			# Check if the projected point is inside the face
-			inside = face.isinside(face.inclusion3D(point))
-			# If the point is outside the face we can already stop
-			if not inside: return False
-		# If we reached here it means the point is inside all the faces
-		return True
+			f = xyz[list(face_id)]
+			n = np.cross(f[2]-f[0],f[3]-f[1]) # Normal from the diagonals
+			n = n/np.linalg.norm(n)
+			fc = np.mean(f,axis=0)
+			if np.dot(n,c-fc) > 0: n = -n     # Outward
+			hs.append(np.append(n,-np.dot(n,fc)))
+		return np.array(hs)
 
-	def areinside(self,xyz,algorithm=None):
+	@property
+	def halfspaces(self):
 		'''
-		Project the point to each of the faces of the cube and check
-		if the point is inside or outside of the 2D geometry.
-		Each face is a rectangle
+		Half-spaces of the faces as an array of shape (6,4) where each row
+		(a,b,c,d) contains the points with a*x + b*y + c*z + d < 0 and the
+		points on the faces follow the half-open rule of Polygon (see
+		areinside_halfspaces). They are computed once and recomputed only
+		if the vertices change.
 		'''
-		npoints = xyz.shape[0]
-		out     = np.ones((npoints,),dtype=bool)
-		# Loop the faces
-		for face_id in self._face_ids:
-			face_points = np.array([self.points[face_id[0]].xyz,
-							        self.points[face_id[1]].xyz,
-							        self.points[face_id[2]].xyz,
-							        self.points[face_id[3]].xyz
-							      ]).copy()
-			# Obtain each face as a Rectangle
-			face = Rectangle.from_array(face_points)
-			# Check if the projected points are inside the face
-			inside = face.areinside(face.inclusion3D(xyz))
-			# Filter out the points that are outside (False)
-			out = np.logical_and(out,inside)
-		return out
+		if self._halfspaces is None or not self._halfspaces[0] == self.hash:
+			self._halfspaces = (self.hash,self._build_halfspaces())
+		return self._halfspaces[1]
+
+	def isinside(self,point,algorithm=None):
+		'''
+		Returns True if the point is inside the half-spaces of all
+		the faces of the cube, else False.
+		'''
+		return bool(areinside_halfspaces(self.halfspaces,point.xyz.reshape((1,3)))[0])
+
+	def areinside(self,xyz,algorithm=None,nthreads=0):
+		'''
+		Returns True if the points are inside the half-spaces of all
+		the faces of the cube, else False.
+		'''
+		return areinside_halfspaces(self.halfspaces,xyz,nthreads=nthreads)
 
 	@classmethod
 	def from_array(cls,xyz):
@@ -668,39 +1059,30 @@ class Cube(Polygon):
 class ConvexHull2D(Polygon):
 	'''
 	ConvexHull. One needs to provide the list of points on
-	the space
+	the space. The polygon is the hull of the points on the
+	xy plane, so its inclusion uses the convex chains (see
+	Polygon.build_convex).
 	'''
 	def __init__(self,points):
-		super(ConvexHull2D, self).__init__(points)
-		self.centroid = Point.from_array(np.mean([p.xyz[:2] for p in points],axis=0))
-		# Store a convex hull representation of the polygon
-		self._hull = ConvexHull([p.xyz[:2] for p in points])
-
-	def isinside(self,point,*kwargs):
-		'''
-		Project the point to each of the faces of the cube and check
-		if the point is inside or outside of the 2D geometry.
-		Each face is a rectangle
-		'''
-		eps = np.finfo(point.xyz.dtype).eps
-		A, b = self._hull.equations[:, :-1], self._hull.equations[:, -1:]
-		return np.all(np.dot(point.xyz[:2],A.T) + b.T < eps, axis=1)
-
-	def areinside(self,xyz):
-		'''
-		Project the point to each of the faces of the cube and check
-		if the point is inside or outside of the 2D geometry.
-		Each face is a rectangle
-		'''
-		eps = np.finfo(xyz.dtype).eps
-		A, b = self._hull.equations[:, :-1], self._hull.equations[:, -1:]
-		print(xyz.shape,A.T.shape,b.shape)
-		return np.all(np.matmul(xyz[:,:2],A.T) + b.T < eps, axis=1)
+		from scipy.spatial import ConvexHull # Only needed here, import on demand
+		if isinstance(points,np.ndarray) and not points.dtype == object:
+			xyz = np.asarray(points,dtype=np.double)
+		else:
+			xyz = np.array([p.xyz for p in points],dtype=np.double)
+		# Store a convex hull representation of the points
+		self._hull = ConvexHull(xyz[:,:2])
+		# The vertices of the hull are given in counterclockwise order
+		super(ConvexHull2D, self).__init__(xyz[self._hull.vertices])
+		self.build_convex()
 
 	@classmethod
 	def from_array(cls,xyz):
 		'''
-		Build a cube from an array of points
+		Build a convex hull from an array of points
 		of shape (npoints,3).
 		'''
-		return super(ConvexHull2D,cls).from_array(xyz)
\ No newline at end of file
+		return super(ConvexHull2D,cls).from_array(xyz)
+
+	@property
+	def hull(self):
+		return self._hull
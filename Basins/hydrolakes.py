@@ -4,16 +4,18 @@
 
 from __future__ import print_function, division
 
-import os, numpy as np
+from .manifest import Manifest
 
-from .entities import Basin
-
-# Path to the shapes directory
-SHAPESPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),'shapes')
+# Basins are built on first access
+manifest = Manifest(__name__)
 
 # Skadar lake, shapefile from HydroLAKES
-skadar_lowres  = Basin.from_npy('skadar', 'Skadar Lake', os.path.join(SHAPESPATH,'Skadar_HydroLAKES.npy'),downsample=6)
-skadar_midres  = Basin.from_npy('skadar', 'Skadar Lake', os.path.join(SHAPESPATH,'Skadar_HydroLAKES.npy'),downsample=4)
-skadar_highres = Basin.from_npy('skadar', 'Skadar Lake', os.path.join(SHAPESPATH,'Skadar_HydroLAKES.npy'),downsample=1)
+# (lower resolutions simplified with a tolerance in degrees)
+manifest.shape('skadar_lowres' , 'skadar', 'Skadar Lake', 'Skadar_HydroLAKES',tol=0.002)
+manifest.shape('skadar_midres' , 'skadar', 'Skadar Lake', 'Skadar_HydroLAKES',tol=0.001)
+manifest.shape('skadar_highres', 'skadar', 'Skadar Lake', 'Skadar_HydroLAKES',downsample=1)
+
+__getattr__ = manifest.getattr
+__dir__     = manifest.dir
 
-del print_function, division, os, np, Basin
\ No newline at end of file
+del print_function, division, Manifest
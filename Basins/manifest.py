@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+
+from __future__ import print_function, division
+
+import os, sys, threading, numpy as np
+
+from .entities import Basin, ComposedBasin
+from .pack     import ShapePack
+
+
+# Path to the shapes directory
+SHAPESPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),'shapes')
+
+# Shape pack with all the shapes of the catalog (see ShapefileExtractor/CreateShapePack.py)
+PACKFILE    = os.path.join(SHAPESPATH,'shapes.pack')
+_SHAPE_PACK = None
+_PACK_LOCK  = threading.Lock()
+
+
+def shape_pack():
+	'''
+	Returns the shape pack of the catalog, opened only once.
+	'''
+	global _SHAPE_PACK
+	with _PACK_LOCK:
+		if _SHAPE_PACK is None: _SHAPE_PACK = ShapePack(PACKFILE)
+	return _SHAPE_PACK
+
+def array_info(xyz):
+	'''
+	Returns the number of points and box of an array of points.
+	'''
+	return xyz.shape[0], [float(np.max(xyz[:,0])),float(np.min(xyz[:,0])),float(np.max(xyz[:,1])),float(np.min(xyz[:,1]))]
+
+
+class BasinInfo(object):
+	'''
+	Lightweight description of a basin of the catalog,
+	available without loading its geometry.
+	'''
+	def __init__(self,key,abbrev,name,npoints,box,members=None):
+		self._key     = key
+		self._abbrev  = abbrev
+		self._name    = name
+		self._npoints = npoints
+		self._box     = box
+		self._members = members
+
+	def __str__(self):
+		return '%s - %s (%s)' % (self.key,self.name,self.abbrev)
+
+	@property
+	def key(self):
+		return self._key
+	@property
+	def abbrev(self):
+		return self._abbrev
+	@property
+	def name(self):
+		return self._name
+	@property
+	def npoints(self):
+		return self._npoints
+	@property
+	def box(self):
+		return self._box
+	@property
+	def members(self):
+		return self._members
+	@property
+	def iscomposed(self):
+		return self._members is not None
+
+
+class Manifest(object):
+	'''
+	Registry of the basins of a catalog module. The basins are only
+	built the first time they are accessed as module attributes, e.g.,
+
+		manifest    = Manifest(__name__)
+		manifest.shape('adr', 'adr', 'Adriatic Sea', 'Adriatic_WorldSeas', downsample=4)
+		manifest.shape('skadar', 'skadar', 'Skadar Lake', 'Skadar_HydroLAKES', tol=0.002)
+		__getattr__ = manifest.getattr
+		__dir__     = manifest.dir
+	'''
+	def __init__(self,module):
+		self._module  = module
+		self._entries = {}  # key -> (abbrev, name, kind, args)
+		self._order   = []
+		self._lock    = threading.RLock()
+
+	def __iter__(self):
+		return self._order.__iter__()
+
+	def __len__(self):
+		return len(self._order)
+
+	def __contains__(self,key):
+		return key in self._entries
+
+	def _add(self,key,abbrev,name,kind,args):
+		if key not in self._entries: self._order.append(key)
+		self._entries[key] = (abbrev,name,kind,args)
+
+	# Registration
+	def shape(self,key,abbrev,name,shape,downsample=1,tol=None):
+		'''
+		Register a basin stored in the shape pack, either keeping
+		one every downsample points or simplified with a tolerance
+		tol in degrees (see simplify.simplify).
+		'''
+		self._add(key,abbrev,name,'shape',(shape,downsample,tol))
+
+	def array(self,key,abbrev,name,xyz):
+		'''
+		Register a basin given by an array of points.
+		'''
+		self._add(key,abbrev,name,'array',(np.asarray(xyz,dtype=np.double),))
+
+	def rectangle(self,key,abbrev,name,xmin,xmax,ymin,ymax):
+		'''
+		Register a basin given by a simple rectangle.
+		'''
+		xyz = np.array([[xmin,ymin,0.],[xmax,ymin,0.],[xmax,ymax,0.],[xmin,ymax,0.]],np.double)
+		self._add(key,abbrev,name,'array',(xyz,))
+
+	def composed(self,key,abbrev,name,members):
+		'''
+		Register a composed basin from the keys of other basins
+		of the same module.
+		'''
+		for m in members:
+			if m not in self._entries: raise ValueError('Unknown basin <%s> in %s!'%(m,self._module))
+		self._add(key,abbrev,name,'composed',(list(members),))
+
+	# Access
+	def info(self,key):
+		'''
+		Returns the metadata of a basin without building it.
+		'''
+		abbrev, name, kind, args = self._entries[key]
+		if kind == 'composed':
+			infos   = [self.info(m) for m in args[0]]
+			npoints = sum([i.npoints for i in infos])
+			infos   = [i for i in infos if i.box is not None]
+			box     = [max([i.box[0] for i in infos]),min([i.box[1] for i in infos]),
+			           max([i.box[2] for i in infos]),min([i.box[3] for i in infos])]
+			return BasinInfo(key,abbrev,name,npoints,box,args[0])
+		if kind == 'shape':
+			shape, downsample, tol = args
+			pack = shape_pack()
+			npoints, box = pack.info(shape,downsample,tol) if shape in pack else (0, None) # Shape not available
+			return BasinInfo(key,abbrev,name,npoints,box)
+		npoints, box = array_info(args[0])
+		return BasinInfo(key,abbrev,name,npoints,box)
+
+	def infos(self):
+		'''
+		Returns the metadata of all the basins of the module.
+		'''
+		return [self.info(key) for key in self._order]
+
+	def load(self,key):
+		'''
+		Build a basin (only once) and store it in the module.
+		'''
+		module = sys.modules[self._module]
+		with self._lock:
+			if key in module.__dict__: return module.__dict__[key]
+			abbrev, name, kind, args = self._entries[key]
+			if kind == 'shape':
+				shape, downsample, tol = args
+				obj = Basin.from_array(abbrev,name,shape_pack().get(shape,downsample,tol))
+				if downsample == 1 and tol is None: # Levels of detail of the original shape
+					obj._lod_source = lambda tol: shape_pack().get(shape,tol=tol)
+			elif kind == 'array':
+				obj = Basin.from_array(abbrev,name,args[0])
+			else:
+				obj = ComposedBasin(abbrev,name,[self.load(m) for m in args[0]])
+			setattr(module,key,obj)
+		return obj
+
+	def getattr(self,key):
+		'''
+		Module __getattr__ hook.
+		'''
+		if key in self._entries: return self.load(key)
+		raise AttributeError("module '%s' has no attribute '%s'" % (self._module,key))
+
+	def dir(self):
+		'''
+		Module __dir__ hook.
+		'''
+		return sorted(set(sys.modules[self._module].__dict__.keys()) | set(self._order))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+
+from __future__ import print_function, division
+
+import mmap, json, struct, numpy as np
+
+from .simplify import simplify, lod_key
+
+
+MAGIC = b'BASINPCK'
+ALIGN = 64 # Alignment of the data blocks in bytes
+
+
+class ShapePack(object):
+	'''
+	A catalog of shapes stored in a single binary file
+	that is memory mapped, so that each shape is a zero-copy
+	view of the file and only the shapes that are used are read.
+
+	File layout:
+		magic (8 bytes) | header size (uint64) | JSON header | data blocks
+
+	The header indexes, for each shape, a number of levels of detail,
+	either a stride with respect to the original shape (lod) or a
+	simplification with a tolerance in degrees (tol, see simplify.lod_key).
+	Each level is a block of shape (npoints,2) aligned to 64 bytes:
+		{"shapes": {name: {"1": {"offset","npoints","dtype","box"}, "4": {...}, "dp0.01": {...}}}}
+	A stride that is not stored is obtained as a strided view of level 1
+	and a tolerance that is not stored is simplified from level 1.
+	'''
+	def __init__(self,fname):
+		self._fname = fname
+		with open(fname,'rb') as f:
+			if not f.read(len(MAGIC)) == MAGIC: raise ValueError('%s is not a shape pack!'%fname)
+			hsize = struct.unpack('<Q',f.read(8))[0]
+			self._header = json.loads(f.read(hsize).decode('utf-8'))
+			self._mmap   = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+		self._views = {}
+
+	def __contains__(self,name):
+		return name in self._header['shapes']
+
+	def __iter__(self):
+		return iter(sorted(self._header['shapes'].keys()))
+
+	def _block(self,name,lod,tol=None,method='dp'):
+		'''
+		Returns the header entry of a level and the stride to apply to it
+		(None if the level has to be simplified from level 1).
+		'''
+		if name not in self: raise KeyError('Shape <%s> not found in %s!'%(name,self._fname))
+		levels = self._header['shapes'][name]
+		if tol is not None:
+			key = lod_key(tol,method)
+			return (levels[key], 1) if key in levels else (levels['1'], None)
+		if str(lod) in levels: return levels[str(lod)], 1
+		return levels['1'], lod
+
+	def lods(self,name):
+		'''
+		Returns the strides stored for a shape.
+		'''
+		return sorted([int(l) for l in self._header['shapes'][name].keys() if l.isdigit()])
+
+	def tolerances(self,name,method='dp'):
+		'''
+		Returns the tolerances (in degrees) of the simplified
+		levels stored for a shape.
+		'''
+		return sorted([float(l[len(method):]) for l in self._header['shapes'][name].keys() if l.startswith(method)])
+
+	def info(self,name,lod=1,tol=None,method='dp'):
+		'''
+		Returns the number of points and the box of a shape
+		without reading it.
+		'''
+		block, stride = self._block(name,lod,tol,method)
+		if stride == 1: return block['npoints'], block['box']
+		xy = self.get(name,lod,tol,method)
+		return xy.shape[0], [float(np.max(xy[:,0])),float(np.min(xy[:,0])),float(np.max(xy[:,1])),float(np.min(xy[:,1]))]
+
+	def get(self,name,lod=1,tol=None,method='dp'):
+		'''
+		Returns a read-only (npoints,2) view of a shape, either
+		strided by lod or simplified with a tolerance tol in degrees.
+		'''
+		key = (name,lod) if tol is None else (name,lod_key(tol,method))
+		if key not in self._views:
+			block, stride = self._block(name,lod,tol,method)
+			xy = np.frombuffer(self._mmap,dtype=np.dtype(block['dtype']),count=2*block['npoints'],offset=block['offset'])
+			xy = xy.reshape((block['npoints'],2))
+			if stride is None:
+				xy = simplify(xy,tol,method)
+				xy.flags.writeable = False
+			self._views[key] = xy[::stride,:] if stride is not None else xy
+		return self._views[key]
+
+	@property
+	def fname(self):
+		return self._fname
+	@property
+	def names(self):
+		return list(self)
+
+
+def write_pack(fname,shapes,lods={},tols={},method='dp',dtype=np.double):
+	'''
+	Write a shape pack from a dictionary of arrays of points
+	of shape (npoints,2) or (npoints,3). Optionally, lods and tols
+	are dictionaries with the extra levels of detail to store for
+	each shape, as strides and as tolerances in degrees of the
+	simplification (see simplify.simplify) respectively.
+	'''
+	header, blocks, offset = {'version':1,'shapes':{}}, [], 0
+	for name in sorted(shapes.keys()):
+		xy = np.asarray(shapes[name],dtype=np.double)[:,:2]
+		header['shapes'][name] = {}
+		levels  = [(str(lod),xy[::lod,:]) for lod in sorted(set([1] + list(lods.get(name,[]))))]
+		levels += [(lod_key(tol,method),simplify(xy,tol,method)) for tol in sorted(set(tols.get(name,[])))]
+		for key, level in levels:
+			data = np.ascontiguousarray(level,dtype=dtype)
+			header['shapes'][name][key] = {
+				'offset'  : offset,
+				'npoints' : data.shape[0],
+				'dtype'   : data.dtype.str,
+				'box'     : [float(np.max(data[:,0])),float(np.min(data[:,0])),float(np.max(data[:,1])),float(np.min(data[:,1]))],
+			}
+			blocks.append(data)
+			offset += ALIGN*((data.nbytes + ALIGN - 1)//ALIGN)
+	# Offsets are relative to the data start, make them absolute
+	hbytes = json.dumps(header,sort_keys=True).encode('utf-8')
+	start  = ALIGN*((len(MAGIC) + 8 + len(hbytes) + ALIGN - 1)//ALIGN)
+	for name in header['shapes']:
+		for lod in header['shapes'][name]:
+			header['shapes'][name][lod]['offset'] += start
+	hbytes = json.dumps(header,sort_keys=True).encode('utf-8')
+	hbytes = hbytes + b' '*(start - len(MAGIC) - 8 - len(hbytes)) # Padding keeps the same start
+	with open(fname,'wb') as f:
+		f.write(MAGIC)
+		f.write(struct.pack('<Q',len(hbytes)))
+		f.write(hbytes)
+		for data in blocks:
+			f.write(data.tobytes())
+			f.write(b'\0'*(ALIGN*((data.nbytes + ALIGN - 1)//ALIGN) - data.nbytes))
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+
+from __future__ import print_function, division
+
+import heapq, numpy as np
+
+
+KM_PER_DEGREE  = np.pi*6371.0/180. # Length of one degree of latitude in km
+LOD_TOLERANCES = (0.002, 0.01, 0.05) # Levels of detail (tolerance in degrees) precomputed for the catalog
+LOD_METHODS    = ('dp', 'vw')
+BAND_MAXCELLS  = 2048 # Maximum number of cells per direction of a boundary band
+
+
+def _scale(xy,units):
+	'''
+	Returns the factors that convert the increments in x and y of each
+	point to the units of the tolerance. In km, the increments in x are
+	scaled by the cosine of the latitude of the point (local
+	equirectangular projection).
+	'''
+	if units == 'deg': return np.ones((xy.shape[0],),np.double), 1.
+	if units == 'km':  return KM_PER_DEGREE*np.cos(np.deg2rad(xy[:,1])), KM_PER_DEGREE
+	raise ValueError('Units <%s> not understood, use deg or km!' % units)
+
+def _distance(xy,kx,ky,ip,ia,ib):
+	'''
+	Distance of the points ip to the segments ia-ib.
+	'''
+	px, py = xy[ip,0], xy[ip,1]
+	ax, ay = (xy[ia,0] - px)*kx[ip], (xy[ia,1] - py)*ky
+	bx, by = (xy[ib,0] - px)*kx[ip], (xy[ib,1] - py)*ky
+	dx, dy = bx - ax, by - ay
+	l2 = dx*dx + dy*dy
+	t  = np.clip(-(ax*dx + ay*dy)/np.where(l2 > 0.,l2,1.),0.,1.)
+	return np.hypot(ax + t*dx,ay + t*dy)
+
+def _split(xy,kx,ky,starts,ends,tol):
+	'''
+	Returns the farthest interior point of each span starts-ends
+	and whether it is farther than tol (all if tol is None).
+	'''
+	cnt  = ends - starts - 1
+	seg  = np.repeat(np.arange(starts.shape[0]),cnt)
+	ip   = np.arange(seg.shape[0]) - np.repeat(np.cumsum(cnt) - cnt,cnt) + starts[seg] + 1
+	d    = _distance(xy,kx,ky,ip,starts[seg],ends[seg])
+	# Farthest point of each span: sort by span and decreasing distance
+	order = np.lexsort((-d,seg))
+	first = np.cumsum(cnt) - cnt
+	far   = ip[order[first]]
+	split = np.ones((starts.shape[0],),bool) if tol is None else d[order[first]] > tol
+	return far, split
+
+def _refine(xy,kx,ky,keep,starts,ends,tol):
+	'''
+	Douglas-Peucker on the spans starts-ends of the kept points:
+	the farthest point of each span is kept while farther than tol.
+	'''
+	while starts.shape[0] > 0:
+		mask = ends - starts > 1
+		starts, ends = starts[mask], ends[mask]
+		if starts.shape[0] == 0: break
+		far, split = _split(xy,kx,ky,starts,ends,tol)
+		keep[far[split]] = True
+		starts = np.concatenate((starts[split],far[split]))
+		ends   = np.concatenate((far[split],ends[split]))
+
+def _crossings(xy,kept):
+	'''
+	Returns the pairs of segments of the ring given by the kept
+	points that properly cross each other. The segments are swept
+	in x so that only the pairs that overlap in x are tested.
+	'''
+	a, b   = kept, np.roll(kept,-1)
+	xmin   = np.minimum(xy[a,0],xy[b,0])
+	xmax   = np.maximum(xy[a,0],xy[b,0])
+	order  = np.argsort(xmin,kind='stable')
+	xmin_s = xmin[order]
+	last   = np.searchsorted(xmin_s,xmax[order],side='right')
+	cnt    = last - np.arange(order.shape[0]) - 1
+	i      = np.repeat(np.arange(order.shape[0]),cnt)
+	j      = np.arange(i.shape[0]) - np.repeat(np.cumsum(cnt) - cnt,cnt) + i + 1
+	i, j   = order[i], order[j]
+	ymin   = np.minimum(xy[a,1],xy[b,1])
+	ymax   = np.maximum(xy[a,1],xy[b,1])
+	mask   = (ymin[i] <= ymax[j]) & (ymin[j] <= ymax[i])
+	n      = kept.shape[0]
+	mask  &= (np.abs(i - j) != 1) & (np.abs(i - j) != n - 1) # Consecutive segments share a point
+	i, j   = i[mask], j[mask]
+	def orient(p,q,r):
+		return np.sign((xy[q,0] - xy[p,0])*(xy[r,1] - xy[p,1]) - (xy[q,1] - xy[p,1])*(xy[r,0] - xy[p,0]))
+	cross  = (orient(a[i],b[i],a[j])*orient(a[i],b[i],b[j]) < 0) & (orient(a[j],b[j],a[i])*orient(a[j],b[j],b[i]) < 0)
+	return i[cross], j[cross]
+
+def _repair(xy,kx,ky,keep,tol=None):
+	'''
+	Keep the farthest point of the spans whose segments cross another
+	segment until the simplified ring does not intersect itself (the
+	original ring is assumed to be simple). If tol is given, the new
+	spans are refined again so that the error bound still holds.
+	'''
+	while True:
+		kept = np.flatnonzero(keep)
+		if kept.shape[0] < 4: return
+		i, j = _crossings(xy,kept)
+		if i.shape[0] == 0: return
+		seg    = np.unique(np.concatenate((i,j)))
+		seg    = seg[seg < kept.shape[0] - 1] # The closing segment is never simplified
+		starts = kept[seg]
+		ends   = kept[seg+1]
+		mask   = ends - starts > 1
+		if not np.any(mask): return
+		starts, ends = starts[mask], ends[mask]
+		far, _ = _split(xy,kx,ky,starts,ends,None)
+		keep[far] = True
+		if tol is not None: _refine(xy,kx,ky,keep,np.concatenate((starts,far)),np.concatenate((far,ends)),tol)
+
+def _anchors(xy,kx,ky,keep):
+	'''
+	Keep the first and last points and the point farthest from the
+	first one, so that a closed ring is not collapsed into a segment.
+	'''
+	n = xy.shape[0]
+	keep[0] = keep[n-1] = True
+	if n < 3: return np.array([0,n-1])
+	ip = np.arange(1,n-1)
+	d  = _distance(xy,kx,ky,ip,np.zeros_like(ip),np.zeros_like(ip))
+	if np.allclose(xy[0],xy[n-1]): # Closed ring
+		far = ip[np.argmax(d)]
+		keep[far] = True
+		return np.array([0,far,n-1])
+	return np.array([0,n-1])
+
+def douglas_peucker(xy,tol,units='deg',topology=True):
+	'''
+	Returns the indices of the points of a ring (or polyline) of shape
+	(npoints,2) kept by the Douglas-Peucker algorithm, so that every
+	removed point is within tol (in degrees or km, see units) of the
+	simplified ring. If topology, points are added back until the
+	simplified ring does not intersect itself.
+	'''
+	xy = np.asarray(xy,dtype=np.double)
+	if xy.shape[0] < 4: return np.arange(xy.shape[0])
+	kx, ky = _scale(xy,units)
+	keep   = np.zeros((xy.shape[0],),bool)
+	anchor = _anchors(xy,kx,ky,keep)
+	_refine(xy,kx,ky,keep,anchor[:-1],anchor[1:],tol)
+	if topology: _repair(xy,kx,ky,keep,tol)
+	return np.flatnonzero(keep)
+
+def visvalingam(xy,tol,units='deg',topology=True):
+	'''
+	Returns the indices of the points of a ring (or polyline) of shape
+	(npoints,2) kept by the Visvalingam-Whyatt algorithm, which removes
+	the points whose effective area (the triangle with its neighbours)
+	is smaller than tol*tol (tol in degrees or km, see units). If
+	topology, points are added back until the simplified ring does not
+	intersect itself.
+	'''
+	xy = np.asarray(xy,dtype=np.double)
+	n  = xy.shape[0]
+	if n < 4: return np.arange(n)
+	kx, ky = _scale(xy,units)
+	keep   = np.ones((n,),bool)
+	anchor = _anchors(xy,kx,ky,np.zeros((n,),bool))
+	prev, nxt = np.arange(-1,n-1), np.arange(1,n+1)
+	def area(i):
+		p, q = prev[i], nxt[i]
+		ax, ay = (xy[p,0] - xy[i,0])*kx[i], (xy[p,1] - xy[i,1])*ky
+		bx, by = (xy[q,0] - xy[i,0])*kx[i], (xy[q,1] - xy[i,1])*ky
+		return 0.5*abs(ax*by - ay*bx)
+	fixed = set(anchor.tolist())
+	heap  = [(area(i),i) for i in range(1,n-1) if i not in fixed]
+	heapq.heapify(heap)
+	ncur, amax = {}, tol*tol
+	for a, i in heap: ncur[i] = a
+	while len(heap) > 0:
+		a, i = heapq.heappop(heap)
+		if not keep[i] or ncur[i] != a: continue # Removed or stale entry
+		if a >= amax: break
+		keep[i] = False
+		p, q = prev[i], nxt[i]
+		nxt[p], prev[q] = q, p
+		for k in (p,q):
+			if k in ncur and keep[k]:
+				ncur[k] = max(area(k),a) # Effective areas never decrease
+				heapq.heappush(heap,(ncur[k],k))
+	if topology: _repair(xy,kx,ky,keep)
+	return np.flatnonzero(keep)
+
+def simplify(xyz,tol,method='dp',units='deg',topology=True):
+	'''
+	Simplify a ring of points of shape (npoints,2) or (npoints,3) with
+	a tolerance tol in degrees or km (see units), using Douglas-Peucker
+	(method='dp') or Visvalingam-Whyatt (method='vw'). Returns the
+	kept points.
+	'''
+	xyz = np.asarray(xyz)
+	if   method == 'dp': idx = douglas_peucker(xyz[:,:2],tol,units,topology)
+	elif method == 'vw': idx = visvalingam(xyz[:,:2],tol,units,topology)
+	else: raise ValueError('Method <%s> not understood, use one of %s!' % (method,LOD_METHODS))
+	return xyz[idx]
+
+def lod_key(tol,method='dp'):
+	'''
+	Key of a level of detail simplified with a tolerance
+	in degrees, e.g., dp0.01.
+	'''
+	return '%s%g' % (method,tol)
+
+
+class BoundaryBand(object):
+	'''
+	Grid of cells (at most BAND_MAXCELLS per direction) over a polygon
+	where the cells within a distance dist (in degrees) of its edges are
+	marked as band. The edges are sampled every cell and the cells that
+	they touch are dilated to cover dist, so every point within dist of
+	an edge falls on a band cell (as well as some farther points). The
+	other cells are entirely inside or outside the polygon, which is
+	found from their centers (see Polygon.grid_mask). The cells are
+	coded as the cell grid of the polygons: 0 outside, 1 inside and
+	2 band.
+	'''
+	def __init__(self,poly,dist,maxcells=BAND_MAXCELLS):
+		x, y   = np.asarray(poly.x,dtype=np.double), np.asarray(poly.y,dtype=np.double)
+		xmin, xmax, ymin, ymax = np.min(x), np.max(x), np.min(y), np.max(y)
+		h      = max(dist,(xmax - xmin)/maxcells,(ymax - ymin)/maxcells,1e-12)
+		r      = int((dist + 0.5*h)//h) + 1 # Cells to dilate
+		self._h, self._dist = h, dist
+		self._x0, self._y0  = xmin - (r+1)*h, ymin - (r+1)*h
+		nx = int((xmax - self._x0)//h) + r + 2
+		ny = int((ymax - self._y0)//h) + r + 2
+		# Sample the edges (including the closing one) every cell
+		ax, ay = x, y
+		bx, by = np.roll(x,-1), np.roll(y,-1)
+		cnt    = (np.ceil(np.hypot(bx - ax,by - ay)/h)).astype(np.int64) + 1
+		seg    = np.repeat(np.arange(cnt.shape[0]),cnt)
+		t      = (np.arange(seg.shape[0]) - np.repeat(np.cumsum(cnt) - cnt,cnt))/np.maximum(cnt[seg] - 1,1)
+		band   = np.zeros((ny,nx),bool)
+		band[np.clip(((ay[seg] + t*(by[seg] - ay[seg]) - self._y0)//h).astype(np.int64),0,ny-1),
+		     np.clip(((ax[seg] + t*(bx[seg] - ax[seg]) - self._x0)//h).astype(np.int64),0,nx-1)] = True
+		# Dilate r cells in each direction (separable)
+		for axis in (0,1):
+			out = band.copy()
+			for k in range(1,r+1):
+				out |= np.roll(band,k,axis=axis) | np.roll(band,-k,axis=axis)
+			band = out
+		# Cells out of the band are classified by their centers
+		cells = poly.grid_mask(self._x0 + h*(np.arange(nx) + 0.5),self._y0 + h*(np.arange(ny) + 0.5)).astype(np.uint8)
+		cells[band] = 2
+		self._cells = cells
+
+	def classify(self,x,y):
+		'''
+		Returns the code of the cells (0 outside, 1 inside and 2 band)
+		of the points given as two arrays of coordinates. The points out
+		of the grid and those with NaN coordinates are outside.
+		'''
+		ny, nx = self._cells.shape
+		# fmax drops NaN to 0, so out of the grid and NaN fall on its outer cells (outside)
+		ix = np.minimum(np.fmax((np.asarray(x) - self._x0)*(1./self._h),0),nx-1).astype(np.intp)
+		iy = np.minimum(np.fmax((np.asarray(y) - self._y0)*(1./self._h),0),ny-1).astype(np.intp)
+		iy *= nx
+		iy += ix
+		return self._cells.ravel().take(iy)
+
+	@property
+	def dist(self):
+		return self._dist
+	@property
+	def cell(self):
+		return self._h
+	@property
+	def cells(self):
+		return self._cells
@@ -7,8 +7,8 @@
 */
 
 #include <cmath>
+#include <random>
 
-#include "matrixMN.h"
 #include "geometry.h"
 
 #ifdef USE_OMP
@@ -24,6 +24,20 @@
 
 namespace Geom
 {
+	/* SET_NUM_THREADS
+
+		Set the default number of threads of the parallel regions,
+		only has effect when compiled with OpenMP.
+	*/
+	void set_num_threads(const int nthreads) {
+		#ifdef USE_OMP
+		if (nthreads > 0) omp_set_num_threads(nthreads);
+		#endif
+	}
+	int get_num_threads() {
+		return OMP_MAX_THREADS;
+	}
+
 	/* FASTBALL
 
 		Get a fast approximation for the 2D bounding ball 
@@ -110,6 +124,355 @@ namespace Geom
     	this->set_radius(rad);
 	}
 
+	// Point ip of arrays of coordinates (float or double) with strides sx, sy and sz (z = 0 if NULL)
+	template<class T>
+	static inline Point strided_point(const T *x, const T *y, const T *z, const int ip, const int sx, const int sy, const int sz) {
+		return Point((double)(x[(long)(ip)*sx]),(double)(y[(long)(ip)*sy]),(z != NULL) ? (double)(z[(long)(ip)*sz]) : 0.);
+	}
+
+	/* AREINSIDE
+
+		Returns True if the points are inside the ball, else False.
+		out needs to come preallocated at np. The coordinates of the points
+		are read from x, y and z (0 if NULL) with strides sx, sy and sz.
+	*/
+	template<class T>
+	void Ball::areinside(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz) const {
+		for(int ip=0; ip<np; ++ip) {
+			Point v = strided_point(x,y,z,ip,sx,sy,sz);
+			out[ip] = isinside(v);
+		}
+	}
+	template void Ball::areinside<float>(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz) const;
+	template void Ball::areinside<double>(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz) const;
+
+	/* SLABINDEX
+
+		Sort the edges of a polygon in ns uniform slabs in y, so that
+		a query only visits the edges that overlap its y coordinate.
+		The edges of each slab are stored contiguously (CSR format).
+
+		Input:  p = the points of the polygon (n+1, closed),
+		        n = the number of edges,
+		        nslabs = the number of slabs (<= 0 to choose it
+		                 from the number of edges)
+	*/
+	void SlabIndex::build(const Point *p, const int n, const int nslabs) {
+		clear();
+		if (n == 0) return;
+		// Extent of the polygon in y
+		y0 = p[0][1]; y1 = p[0][1];
+		for (int ii=1; ii<n; ++ii) {
+			y0 = std::min(y0,p[ii][1]);
+			y1 = std::max(y1,p[ii][1]);
+		}
+		ns  = (nslabs > 0) ? nslabs : std::max(1,std::min(n/IDX_EDGES_PER_SLAB,IDX_MAX_SLABS));
+		idy = (y1 > y0) ? (double)(ns)/(y1 - y0) : 0.;
+		// Count the edges that overlap each slab
+		off.assign(ns+1,0);
+		for (int ii=0; ii<n; ++ii) {
+			int j0 = slab(std::min(p[ii][1],p[ii+1][1])), j1 = slab(std::max(p[ii][1],p[ii+1][1]));
+			for (int j=j0; j<=j1; ++j) ++off[j+1];
+		}
+		for (int j=0; j<ns; ++j) off[j+1] += off[j];
+		// Store the edges
+		std::vector<int> pos(off.begin(),off.end()-1);
+		edges.resize(off[ns]);
+		for (int ii=0; ii<n; ++ii) {
+			int j0 = slab(std::min(p[ii][1],p[ii+1][1])), j1 = slab(std::max(p[ii][1],p[ii+1][1]));
+			for (int j=j0; j<=j1; ++j) edges[pos[j]++] = ii;
+		}
+		// Publish the index once it is complete
+		ready.store(true,std::memory_order_release);
+	}
+
+	/* CELLGRID
+
+		Uniform grid over the bounding box of a polygon where each cell
+		is classified as fully inside, fully outside or boundary (crossed
+		by some edge). The edges that cross each boundary cell are stored
+		(CSR format) together with the status of the cell center, so that
+		a point only needs to test the edges of its cell.
+
+		Input:  poly = the polygon,
+		        nnx, nny = the number of cells in x and y (<= 0 to choose
+		                   them from the number of edges)
+	*/
+	void CellGrid::build(const Polygon &poly, const int nnx, const int nny) {
+		clear();
+		const int n = poly.get_npoints();
+		const Point *p = poly.get_points();
+		if (n == 0) return;
+		// Bounding box of the polygon
+		x0 = p[0][0]; x1 = p[0][0]; y0 = p[0][1]; y1 = p[0][1];
+		for (int ii=1; ii<n; ++ii) {
+			x0 = std::min(x0,p[ii][0]); x1 = std::max(x1,p[ii][0]);
+			y0 = std::min(y0,p[ii][1]); y1 = std::max(y1,p[ii][1]);
+		}
+		if (!(x1 > x0) || !(y1 > y0)) return; // Degenerated polygon
+		// Number of cells, keeping them as square as possible
+		if (nnx > 0 && nny > 0) {
+			nx = nnx; ny = nny;
+		} else {
+			double ncells = (double)(std::min(std::max(GRID_CELLS_PER_EDGE*n,1),GRID_MAX_CELLS));
+			nx = std::max(1,(int)(std::sqrt(ncells*(x1 - x0)/(y1 - y0))));
+			ny = std::max(1,(int)(ncells/nx));
+		}
+		dx = (x1 - x0)/nx; dy = (y1 - y0)/ny;
+		// Find the cells crossed by each edge, row by row. The range of
+		// cells is enlarged by a small tolerance so that it is conservative
+		std::vector<int> ecell, eedge;
+		const double ex = GRID_EPS*dx, ey = GRID_EPS*dy;
+		for (int ii=0; ii<n; ++ii) {
+			const Point &a = p[ii], &b = p[ii+1];
+			double ymin = std::min(a[1],b[1]), ymax = std::max(a[1],b[1]);
+			double xmin = std::min(a[0],b[0]), xmax = std::max(a[0],b[0]);
+			for (int j=row(ymin-ey); j<=row(ymax+ey); ++j) {
+				// Part of the edge within the row
+				double ya = std::min(std::max(y0 + j*dy,ymin),ymax), yb = std::min(std::max(y0 + (j+1)*dy,ymin),ymax);
+				double xa = xmin, xb = xmax;
+				if (b[1] != a[1]) {
+					xa = std::min(std::max(a[0] + (ya - a[1])*(b[0] - a[0])/(b[1] - a[1]),xmin),xmax);
+					xb = std::min(std::max(a[0] + (yb - a[1])*(b[0] - a[0])/(b[1] - a[1]),xmin),xmax);
+				}
+				for (int i=col(std::min(xa,xb)-ex); i<=col(std::max(xa,xb)+ex); ++i) {
+					ecell.push_back(nx*j + i);
+					eedge.push_back(ii);
+				}
+			}
+		}
+		// Store the edges of each cell
+		const int nc = nx*ny;
+		off.assign(nc+1,0);
+		for (size_t k=0; k<ecell.size(); ++k) ++off[ecell[k]+1];
+		for (int c=0; c<nc; ++c) off[c+1] += off[c];
+		std::vector<int> pos(off.begin(),off.end()-1);
+		edges.resize(off[nc]);
+		for (size_t k=0; k<ecell.size(); ++k) edges[pos[ecell[k]]++] = eedge[k];
+		// Classify the cell centers scanning each row, the crossings of
+		// y = yc right of each center give its crossing number
+		std::vector<double> xs;
+		status.assign(nc,CELL_OUTSIDE);
+		for (int j=0; j<ny; ++j) {
+			poly.crossings(y0 + (j + 0.5)*dy,xs);
+			size_t k = 0;
+			for (int i=0; i<nx; ++i) {
+				int c = nx*j + i;
+				Point C = center(c);
+				while (k < xs.size() && !(C[0] < xs[k])) ++k;
+				bool inside   = ((xs.size() - k) & 1) == 1;
+				bool boundary = off[c+1] > off[c];
+				status[c] = (signed char)( boundary ? (inside ? CELL_BOUNDARY_IN : CELL_BOUNDARY_OUT) : (inside ? CELL_INSIDE : CELL_OUTSIDE) );
+				if (!boundary) continue;
+				// Boundary cells whose center is (almost) on an edge fall
+				// back to the full test, the status of the center is not reliable
+				for (int kk=off[c]; kk<off[c+1]; ++kk) {
+					const Point &a = p[edges[kk]], &b = p[edges[kk]+1];
+					double tol = GRID_EPS*std::max(std::fabs(b[0]-a[0]),std::fabs(b[1]-a[1]))*std::max(dx,dy);
+					if (std::fabs(C.isLeft(a,b)) <= tol) { status[c] = (signed char)(CELL_MIXED); break; }
+				}
+			}
+		}
+		// Publish the grid once it is complete
+		ready.store(true,std::memory_order_release);
+	}
+
+	/* MINCIRCLE
+
+		Minimal circle enclosing the points (in 2D) using the iterative
+		form of [Welzl, 1991] on the points randomly shuffled.
+	*/
+	static inline bool outside_circle(const Point &v, const double *c) {
+		double dx = v[0] - c[0], dy = v[1] - c[1];
+		return dx*dx + dy*dy > c[2]*(1. + 1e-12);
+	}
+	static void circle2(const Point &a, const Point &b, double *c) {
+		c[0] = 0.5*(a[0] + b[0]); c[1] = 0.5*(a[1] + b[1]);
+		c[2] = (a[0] - c[0])*(a[0] - c[0]) + (a[1] - c[1])*(a[1] - c[1]);
+	}
+	static void circle3(const Point &a, const Point &b, const Point &d, double *c) {
+		double bx = b[0] - a[0], by = b[1] - a[1], dx = d[0] - a[0], dy = d[1] - a[1];
+		double det = 2.*(bx*dy - by*dx);
+		if (det == 0.) {
+			// Collinear points, circle of the farthest pair
+			double cab[3], cad[3], cbd[3];
+			circle2(a,b,cab); circle2(a,d,cad); circle2(b,d,cbd);
+			double *cc = (cab[2] >= cad[2] && cab[2] >= cbd[2]) ? cab : ( (cad[2] >= cbd[2]) ? cad : cbd );
+			c[0] = cc[0]; c[1] = cc[1]; c[2] = cc[2];
+			return;
+		}
+		double b2 = bx*bx + by*by, d2 = dx*dx + dy*dy;
+		double ux = (dy*b2 - by*d2)/det, uy = (bx*d2 - dx*b2)/det;
+		c[0] = a[0] + ux; c[1] = a[1] + uy; c[2] = ux*ux + uy*uy;
+	}
+	static void min_circle(const Point *p, const int n, double *c) {
+		std::vector<int> id(n);
+		for (int ii=0; ii<n; ++ii) id[ii] = ii;
+		std::shuffle(id.begin(),id.end(),std::mt19937(0));
+		c[0] = p[id[0]][0]; c[1] = p[id[0]][1]; c[2] = 0.;
+		for (int ii=1; ii<n; ++ii) {
+			if (!outside_circle(p[id[ii]],c)) continue;
+			c[0] = p[id[ii]][0]; c[1] = p[id[ii]][1]; c[2] = 0.;
+			for (int jj=0; jj<ii; ++jj) {
+				if (!outside_circle(p[id[jj]],c)) continue;
+				circle2(p[id[ii]],p[id[jj]],c);
+				for (int kk=0; kk<jj; ++kk)
+					if (outside_circle(p[id[kk]],c)) circle3(p[id[ii]],p[id[jj]],p[id[kk]],c);
+			}
+		}
+	}
+
+	/* PREFILTER
+
+		Cheap tests to classify the points before visiting the edges:
+			- reject outside the axis aligned box and the minimal enclosing circle,
+			- accept inside an inscribed circle or inscribed rectangles.
+		The inscribed regions are found from the inside cells of a coarse
+		grid (PRE_CELLS cells). The rectangles are the largest rectangles of
+		inside cells (taken greedily) and the circle is centered on the inside
+		cell farthest from the other cells, with the distance to the closest
+		edge as radius.
+	*/
+	void Prefilter::build(const Polygon &poly) {
+		clear();
+		const int n = poly.get_npoints();
+		const Point *p = poly.get_points();
+		if (n == 0) return;
+		// Axis aligned box
+		x0 = p[0][0]; x1 = p[0][0]; y0 = p[0][1]; y1 = p[0][1];
+		for (int ii=1; ii<n; ++ii) {
+			x0 = std::min(x0,p[ii][0]); x1 = std::max(x1,p[ii][0]);
+			y0 = std::min(y0,p[ii][1]); y1 = std::max(y1,p[ii][1]);
+		}
+		// Minimal enclosing circle, enlarged by a small tolerance
+		double c[3];
+		min_circle(p,n,c);
+		cx = c[0]; cy = c[1]; cr2 = std::sqrt(c[2]) + PRE_EPS*std::max(x1 - x0,y1 - y0); cr2 *= cr2;
+		build_regions(poly);
+		// Publish the prefilter once it is complete
+		built.store(true,std::memory_order_release);
+	}
+	void Prefilter::build_regions(const Polygon &poly) {
+		const int n = poly.get_npoints();
+		const Point *p = poly.get_points();
+		if (!(x1 > x0) || !(y1 > y0)) return; // Degenerated polygon
+		// Inside cells of a coarse grid
+		int nx = std::max(1,(int)(std::sqrt(PRE_CELLS*(x1 - x0)/(y1 - y0))));
+		int ny = std::max(1,PRE_CELLS/nx);
+		CellGrid grid;
+		grid.build(poly,nx,ny);
+		if (grid.isempty()) return;
+		nx = grid.get_nx(); ny = grid.get_ny();
+		const double dx = grid.get_dx(), dy = grid.get_dy();
+		std::vector<int> mask(nx*ny), dist(nx*ny);
+		for (int cc=0; cc<nx*ny; ++cc) mask[cc] = (grid.get_status(cc) == CELL_INSIDE) ? 1 : 0;
+		// Inscribed rectangles, the largest rectangle of inside cells
+		// is found with the histogram of each row
+		std::vector<int> h(nx+1,0), st;
+		for (nr=0; nr<PRE_NRECTS; ++nr) {
+			int best = 0, bi0 = 0, bi1 = 0, bj0 = 0, bj1 = 0;
+			std::fill(h.begin(),h.end(),0);
+			for (int j=0; j<ny; ++j) {
+				for (int i=0; i<nx; ++i) h[i] = mask[nx*j + i] ? h[i] + 1 : 0;
+				st.clear();
+				for (int i=0; i<=nx; ++i) {
+					while (!st.empty() && h[st.back()] >= h[i]) {
+						int hh = h[st.back()]; st.pop_back();
+						int i0 = st.empty() ? 0 : st.back() + 1;
+						if (hh*(i - i0) > best) { best = hh*(i - i0); bi0 = i0; bi1 = i - 1; bj0 = j - hh + 1; bj1 = j; }
+					}
+					st.push_back(i);
+				}
+			}
+			if (best == 0) break;
+			for (int j=bj0; j<=bj1; ++j)
+				for (int i=bi0; i<=bi1; ++i) mask[nx*j + i] = 0;
+			Point C0 = grid.center(nx*bj0 + bi0), C1 = grid.center(nx*bj1 + bi1);
+			rect[nr][0] = C1[0] + (0.5 - PRE_EPS)*dx; rect[nr][1] = C0[0] - (0.5 - PRE_EPS)*dx;
+			rect[nr][2] = C1[1] + (0.5 - PRE_EPS)*dy; rect[nr][3] = C0[1] - (0.5 - PRE_EPS)*dy;
+		}
+		// Inscribed circle, chessboard distance of the inside cells to
+		// the other cells (two passes), the cells outside the grid are at 0
+		for (int cc=0; cc<nx*ny; ++cc) dist[cc] = (grid.get_status(cc) == CELL_INSIDE) ? nx*ny : 0;
+		for (int j=0; j<ny; ++j) {
+			for (int i=0; i<nx; ++i) {
+				int &d = dist[nx*j + i];
+				if (d == 0) continue;
+				int dm = (i == 0 || j == 0) ? 0 : dist[nx*(j-1) + i-1];
+				dm = std::min(dm,(j == 0) ? 0 : dist[nx*(j-1) + i]);
+				dm = std::min(dm,(i == nx-1 || j == 0) ? 0 : dist[nx*(j-1) + i+1]);
+				dm = std::min(dm,(i == 0) ? 0 : dist[nx*j + i-1]);
+				d  = std::min(d,dm + 1);
+			}
+		}
+		for (int j=ny-1; j>=0; --j) {
+			for (int i=nx-1; i>=0; --i) {
+				int &d = dist[nx*j + i];
+				if (d == 0) continue;
+				int dm = (i == nx-1 || j == ny-1) ? 0 : dist[nx*(j+1) + i+1];
+				dm = std::min(dm,(j == ny-1) ? 0 : dist[nx*(j+1) + i]);
+				dm = std::min(dm,(i == 0 || j == ny-1) ? 0 : dist[nx*(j+1) + i-1]);
+				dm = std::min(dm,(i == nx-1) ? 0 : dist[nx*j + i+1]);
+				d  = std::min(d,dm + 1);
+			}
+		}
+		int cmax = (int)(std::max_element(dist.begin(),dist.end()) - dist.begin());
+		if (dist[cmax] == 0) return;
+		Point C = grid.center(cmax);
+		double r2 = HUGE_VAL;
+		for (int ii=0; ii<n; ++ii) {
+			const Point &a = p[ii], &b = p[ii+1];
+			double ex = b[0] - a[0], ey = b[1] - a[1], l2 = ex*ex + ey*ey;
+			double t  = (l2 > 0.) ? std::min(std::max(((C[0] - a[0])*ex + (C[1] - a[1])*ey)/l2,0.),1.) : 0.;
+			double qx = a[0] + t*ex - C[0], qy = a[1] + t*ey - C[1];
+			r2 = std::min(r2,qx*qx + qy*qy);
+		}
+		ix = C[0]; iy = C[1]; ir2 = r2*(1. - PRE_EPS);
+	}
+
+	/* CONVEXINDEX
+
+		Find if the polygon is convex on the xy plane and, if so, store
+		its upward and downward edges sorted in y. Since a line y=P.y only
+		crosses one edge of each chain, the crossing number is obtained
+		in O(log n) with two binary searches and gives the same result
+		as cn_PinPoly. Non-convex polygons leave the index empty.
+	*/
+	void ConvexIndex::build(const Point *p, const int n) {
+		clear();
+		checked = true;
+		// Edges of non zero length
+		std::vector<int> e;
+		for (int ii=0; ii<n; ++ii)
+			if ( (p[ii+1][0] != p[ii][0]) || (p[ii+1][1] != p[ii][1]) ) e.push_back(ii);
+		const int ne = (int)(e.size());
+		if (ne < 3) return;
+		// All the turns must have the same sign
+		double sgn = 0.;
+		for (int k=0; k<ne; ++k) {
+			const int a = e[k], b = e[(k+1)%ne];
+			double c = (p[a+1][0] - p[a][0])*(p[b+1][1] - p[b][1]) - (p[a+1][1] - p[a][1])*(p[b+1][0] - p[b][0]);
+			if (c*sgn < 0.) return;
+			if (sgn == 0.) sgn = c;
+		}
+		if (sgn == 0.) return; // All the edges are aligned
+		// Split in the upward and downward chains (horizontal edges never cross)
+		for (int ii=0; ii<n; ++ii) {
+			if (p[ii][1] < p[ii+1][1]) up.push_back(ii);
+			if (p[ii][1] > p[ii+1][1]) dn.push_back(ii);
+		}
+		std::sort(up.begin(),up.end(),[p](int a, int b) { return p[a][1]   < p[b][1]; });
+		std::sort(dn.begin(),dn.end(),[p](int a, int b) { return p[a+1][1] < p[b+1][1]; });
+		// The edges of each chain must not overlap in y (rules out polygons
+		// that wind more than once)
+		bool ok = true;
+		for (int k=1; k<(int)(up.size()); ++k) ok = ok && (p[up[k-1]+1][1] <= p[up[k]][1]);
+		for (int k=1; k<(int)(dn.size()); ++k) ok = ok && (p[dn[k-1]][1]   <= p[dn[k]+1][1]);
+		if (!ok) { up.clear(); dn.clear(); return; }
+		for (int k=0; k<(int)(up.size()); ++k) yup.push_back(p[up[k]][1]);
+		for (int k=0; k<(int)(dn.size()); ++k) ydn.push_back(p[dn[k]+1][1]);
+	}
+
 	/* CN_PINPOLY
 
 		Crossing number test for a point in a polygon.
@@ -130,7 +493,7 @@ namespace Geom
 	int cn_PinPoly(const Polygon *poly, const Point &P) {
 		int cn = 0; // The crossing number counter
 		// Loop through all edges of the Polygon
-		for (int ii=OMP_THREAD_NUM; ii<poly->get_npoints(); ii+=OMP_NUM_THREADS) {
+		for (int ii=0; ii<poly->get_npoints(); ++ii) {
 			if ( (((*poly)[ii][1] <= P[1]) && ((*poly)[ii+1][1] >  P[1]))         // an upward crossing
 			  || (((*poly)[ii][1] >  P[1]) && ((*poly)[ii+1][1] <= P[1])) ) {     // a downward crossing
 
@@ -142,11 +505,11 @@ namespace Geom
 		}
 		return(cn & 1); // 0 if even (out), and 1 if  odd (in)
 	}
-	int cn_PinPoly_OMP(const Polygon *poly, const Point &P) {
+	int cn_PinPoly_OMP(const Polygon *poly, const Point &P, const int nthreads) {
 		int cn = 0; // The crossing number counter
 		// Loop through all edges of the Polygon
 		#ifdef USE_OMP
-		#pragma omp parallel reduction(+:cn)
+		#pragma omp parallel reduction(+:cn) num_threads((nthreads > 0) ? nthreads : OMP_MAX_THREADS)
 		{
 		#endif
 		for (int ii=OMP_THREAD_NUM; ii<poly->get_npoints(); ii+=OMP_NUM_THREADS) {
@@ -164,6 +527,58 @@ namespace Geom
 		#endif
 		return(cn & 1); // 0 if even (out), and 1 if  odd (in)
 	}
+	int cn_PinPoly_idx(const Polygon *poly, const Point &P) {
+		const SlabIndex &idx = poly->get_index();
+		if (!idx.inrange(P[1])) return 0; // No edge crosses y=P.y
+		const Point *p = poly->get_points();
+		int cn = 0, j = idx.slab(P[1]); // The crossing number counter and slab of P
+		// Loop through the edges of the slab
+		for (int k=idx.get_begin(j); k<idx.get_end(j); ++k) {
+			int ii = idx.get_edge(k);
+			if ( ((p[ii][1] <= P[1]) && (p[ii+1][1] >  P[1]))         // an upward crossing
+			  || ((p[ii][1] >  P[1]) && (p[ii+1][1] <= P[1])) ) {     // a downward crossing
+
+			  	// Compute  the actual edge-ray intersect x-coordinate
+				double vt = (double)( (P[1]  - p[ii][1]) / (p[ii+1][1] - p[ii][1]) );
+				if (P[0] <  p[ii][0] + vt * (p[ii+1][0] - p[ii][0]))  // P.x < intersect
+					++cn; // A valid crossing of y=P.y right of P.x
+			}
+		}
+		return(cn & 1); // 0 if even (out), and 1 if  odd (in)
+	}
+
+	int cn_PinPoly_grid(const Polygon *poly, const Point &P) {
+		const CellGrid &grid = poly->get_grid();
+		int c = grid.cell(P);
+		if (c < 0) return 0; // Outside the bounding box
+		switch (grid.get_status(c)) {
+			case CELL_OUTSIDE: return 0;
+			case CELL_INSIDE:  return 1;
+			case CELL_MIXED:   return poly->crossing_number_edges(P);
+		}
+		// Boundary cell, the parity changes with each edge crossed
+		// by the segment from the center of the cell to P
+		const Point *p = poly->get_points();
+		Point C = grid.center(c);
+		int cn = (grid.get_status(c) == CELL_BOUNDARY_IN) ? 1 : 0;
+		double mP = std::max(std::fabs(P[0]),std::fabs(P[1]));
+		for (int k=grid.get_begin(c); k<grid.get_end(c); ++k) {
+			int ii = grid.get_edge(k);
+			double sP = P.isLeft(p[ii],p[ii+1]);
+			// P within rounding of the edge (|sP| is its distance times the edge length),
+			// where the sides of P are not reliable, use the same rule as the full test
+			double ex = p[ii+1][0] - p[ii][0], ey = p[ii+1][1] - p[ii][1];
+			double d  = EDGE_EPS*std::max(mP,std::max(std::max(std::fabs(p[ii][0]),std::fabs(p[ii][1])),std::max(std::fabs(p[ii+1][0]),std::fabs(p[ii+1][1]))));
+			if ( sP*sP <= d*d*(ex*ex + ey*ey)
+			  && P[0] >= std::min(p[ii][0],p[ii+1][0]) - d && P[0] <= std::max(p[ii][0],p[ii+1][0]) + d
+			  && P[1] >= std::min(p[ii][1],p[ii+1][1]) - d && P[1] <= std::max(p[ii][1],p[ii+1][1]) + d )
+				return poly->crossing_number_edges(P);
+			if ( ((p[ii].isLeft(C,P) > 0) != (p[ii+1].isLeft(C,P) > 0))   // edge crosses the line through C and P
+			  && ((C.isLeft(p[ii],p[ii+1]) > 0) != (sP > 0)) )            // C and P at different sides of the edge
+				cn ^= 1;
+		}
+		return cn;
+	}
 
 	/* WN_PINPOLY
 
@@ -184,7 +599,7 @@ namespace Geom
 	int wn_PinPoly(const Polygon *poly, const Point &P) {
 		int wn = 0; // The  winding number counter
 		// Loop through all edges of the polygon
-		for (int ii=OMP_THREAD_NUM; ii<poly->get_npoints(); ii+=OMP_NUM_THREADS) {   // edge from V[i] to  V[i+1]
+		for (int ii=0; ii<poly->get_npoints(); ++ii) {   // edge from V[i] to  V[i+1]
 			if ((*poly)[ii][1] <= P[1]) {   	// start y <= P.y
 				if ((*poly)[ii+1][1] > P[1])			// an upward crossing
 					if ( P.isLeft((*poly)[ii],(*poly)[ii+1]) > 0 ) // P left of  edge
@@ -197,11 +612,11 @@ namespace Geom
 		}
 		return wn;
 	}
-	int wn_PinPoly_OMP(const Polygon *poly, const Point &P) {
+	int wn_PinPoly_OMP(const Polygon *poly, const Point &P, const int nthreads) {
 		int wn = 0; // The  winding number counter
 		// Loop through all edges of the polygon
 		#ifdef USE_OMP
-		#pragma omp parallel reduction(+:wn)
+		#pragma omp parallel reduction(+:wn) num_threads((nthreads > 0) ? nthreads : OMP_MAX_THREADS)
 		{
 		#endif
 		for (int ii=OMP_THREAD_NUM; ii<poly->get_npoints(); ii+=OMP_NUM_THREADS) {   // edge from V[i] to  V[i+1]
@@ -220,59 +635,379 @@ namespace Geom
 		#endif
 		return wn;
 	}
+	int wn_PinPoly_idx(const Polygon *poly, const Point &P) {
+		const SlabIndex &idx = poly->get_index();
+		if (!idx.inrange(P[1])) return 0; // No edge crosses y=P.y
+		const Point *p = poly->get_points();
+		int wn = 0, j = idx.slab(P[1]); // The  winding number counter and slab of P
+		// Loop through the edges of the slab
+		for (int k=idx.get_begin(j); k<idx.get_end(j); ++k) {
+			int ii = idx.get_edge(k);  // edge from V[i] to  V[i+1]
+			if (p[ii][1] <= P[1]) {   	// start y <= P.y
+				if (p[ii+1][1] > P[1])			// an upward crossing
+					if ( P.isLeft(p[ii],p[ii+1]) > 0 ) // P left of  edge
+						++wn; // have  a valid up intersect
+			} else {                        // start y > P.y (no test needed)
+				if (p[ii+1][1] <= P[1])	// a downward crossing
+					if ( P.isLeft(p[ii],p[ii+1]) < 0 ) // P left of  edge
+						--wn; // have  a valid down intersect
+			}
+		}
+		return wn;
+	}
 
 	/* AREINSIDE
 
 		Returns True if the points are inside the polygon, else False.
-		out needs to come preallocated at np.
+		out needs to come preallocated at np. The coordinates of the points
+		are read from x, y and z (0 if NULL) with strides sx, sy and sz, so
+		that separate arrays or strided views can be used without copies.
+		The coordinates can be float or double, float coordinates are
+		converted exactly to double point by point so the points are
+		classified as given (see the precision note in README.md).
+
+		The slab index and the prefilter are built on the first call
+		with enough points.
+		With OpenMP, large arrays of points are split among the threads
+		(point parallel) while few points on a large polygon without index
+		share its edges among the threads (edge parallel). The number of
+		threads is nthreads or the default (see set_num_threads) if 0.
 	*/
-	void Polygon::areinside_cn(bool *out, const double *xyz, const int np) {
-//		if (np > this->n) {
-//			// If the number of points is greater than the number of points of the
-//			// polygon, it is better to run the normal isinside
-//			#ifdef USE_OMP
-//			#pragma omp parallel shared(out,xyz) firstprivate(np)
-//			{
-//			#endif
-//			for(int ip=OMP_THREAD_NUM; ip<np; ip+=OMP_NUM_THREADS) {
-//				Point v(&xyz[3*ip]);
-//				out[ip] = (this->bbox > v) ? ( (cn_PinPoly(this,v) == 1) ? true : false ) : false;
-//			}
-//			#ifdef USE_OMP
-//			}
-//			#endif
-//		} else {
-			// Run the OMP version
+	template<class T>
+	void Polygon::areinside_cn(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const int nthreads) {
+		prepare(np);
+		const int nth = (nthreads > 0) ? nthreads : OMP_MAX_THREADS;
+		if (nth > 1 && np >= OMP_MINPOINTS) {
+			// Point parallel
+			#ifdef USE_OMP
+			#pragma omp parallel for schedule(dynamic,OMP_CHUNK) num_threads(nth)
+			#endif
 			for(int ip=0; ip<np; ++ip) {
-				Point v(&xyz[3*ip]);
-				out[ip] = (this->bbox > v) ? ( (cn_PinPoly_OMP(this,v) == 1) ? true : false ) : false;
+				Point v = strided_point(x,y,z,ip,sx,sy,sz);
+				int f   = prefilter(v);
+				out[ip] = (f == 0) ? ( (crossing_number(v) == 1) ? true : false ) : (f > 0);
 			}
-//		}
-	}
-	void Polygon::areinside_wn(bool *out, const double *xyz, const int np) {
-//		if (np > this->n) {
-//			// If the number of points is greater than the number of points of the
-//			// polygon, it is better to run the normal isinside
-//			#ifdef USE_OMP
-//			#pragma omp parallel shared(out,xyz) firstprivate(np)
-//			{
-//			#endif
-//			for(int ip=OMP_THREAD_NUM; ip<np; ip+=OMP_NUM_THREADS) {
-//				Point v(&xyz[3*ip]);
-//				out[ip] = (this->bbox > v) ? ( (wn_PinPoly(this,v) != 0) ? true : false ) : false;
-//			}
-//			#ifdef USE_OMP
-//			}
-//			#endif
-//		} else {
-			// Run the OMP version
+		} else if (nth > 1 && this->n >= OMP_MINEDGES && !has_index() && !has_grid() && !has_convex()) {
+			// Edge parallel
 			for(int ip=0; ip<np; ++ip) {
-				Point v(&xyz[3*ip]);
-				out[ip] = (this->bbox > v) ? ( (wn_PinPoly_OMP(this,v) != 0) ? true : false ) : false;
+				Point v = strided_point(x,y,z,ip,sx,sy,sz);
+				int f   = prefilter(v);
+				out[ip] = (f == 0) ? ( (cn_PinPoly_OMP(this,v,nth) == 1) ? true : false ) : (f > 0);
 			}
-//		}
+		} else {
+			// Serial
+			for(int ip=0; ip<np; ++ip) {
+				Point v = strided_point(x,y,z,ip,sx,sy,sz);
+				int f   = prefilter(v);
+				out[ip] = (f == 0) ? ( (crossing_number(v) == 1) ? true : false ) : (f > 0);
+			}
+		}
+	}
+	template<class T>
+	void Polygon::areinside_wn(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const int nthreads) {
+		prepare(np);
+		const int nth = (nthreads > 0) ? nthreads : OMP_MAX_THREADS;
+		if (nth > 1 && np >= OMP_MINPOINTS) {
+			// Point parallel
+			#ifdef USE_OMP
+			#pragma omp parallel for schedule(dynamic,OMP_CHUNK) num_threads(nth)
+			#endif
+			for(int ip=0; ip<np; ++ip) {
+				Point v = strided_point(x,y,z,ip,sx,sy,sz);
+				int f   = prefilter(v);
+				out[ip] = (f == 0) ? ( (winding_number(v) != 0) ? true : false ) : (f > 0);
+			}
+		} else if (nth > 1 && this->n >= OMP_MINEDGES && !has_index()) {
+			// Edge parallel
+			for(int ip=0; ip<np; ++ip) {
+				Point v = strided_point(x,y,z,ip,sx,sy,sz);
+				int f   = prefilter(v);
+				out[ip] = (f == 0) ? ( (wn_PinPoly_OMP(this,v,nth) != 0) ? true : false ) : (f > 0);
+			}
+		} else {
+			// Serial
+			for(int ip=0; ip<np; ++ip) {
+				Point v = strided_point(x,y,z,ip,sx,sy,sz);
+				int f   = prefilter(v);
+				out[ip] = (f == 0) ? ( (winding_number(v) != 0) ? true : false ) : (f > 0);
+			}
+		}
+	}
+	template void Polygon::areinside_cn<float>(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, const int nthreads);
+	template void Polygon::areinside_cn<double>(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, const int nthreads);
+	template void Polygon::areinside_wn<float>(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, const int nthreads);
+	template void Polygon::areinside_wn<double>(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, const int nthreads);
+
+	/* AREINSIDE_FIRST
+
+		Returns, for each point, the position of the first polygon of polys
+		that contains it (crossing number) or -1 if it is not inside any of
+		them. out needs to come preallocated at np and its type (int8, int16
+		or int32) must be able to hold npolys - 1. The coordinates are read
+		as in Polygon::areinside_cn.
+
+		The polygons are visited in order and only the points that have not
+		been assigned yet are tested against the next polygon, so that the
+		work decreases with the number of points already found.
+	*/
+	template<class L, class T>
+	void areinside_first(L *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads) {
+		std::vector<int> cand(np);
+		for(int ip=0; ip<np; ++ip) { out[ip] = -1; cand[ip] = ip; }
+		int nc = np;
+		for(int k=0; k<npolys && nc>0; ++k) {
+			Polygon *poly = polys[k];
+			if (poly->isempty()) continue;
+			poly->prepare(nc);
+			#ifdef USE_OMP
+			#pragma omp parallel for schedule(dynamic,OMP_CHUNK) num_threads((nthreads > 0) ? nthreads : OMP_MAX_THREADS) if(nc >= OMP_MINPOINTS)
+			#endif
+			for(int ic=0; ic<nc; ++ic) {
+				const int ip = cand[ic];
+				Point v = strided_point(x,y,z,ip,sx,sy,sz);
+				int f = poly->prefilter(v);
+				if ( (f > 0) || ((f == 0) && (poly->crossing_number(v) == 1)) ) out[ip] = (L)(k);
+			}
+			// Drop the points that have been assigned
+			int mc = 0;
+			for(int ic=0; ic<nc; ++ic)
+				if (out[cand[ic]] < 0) cand[mc++] = cand[ic];
+			nc = mc;
+		}
+	}
+
+	template void areinside_first<int8_t,float>(int8_t *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads);
+	template void areinside_first<int16_t,float>(int16_t *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads);
+	template void areinside_first<int32_t,float>(int32_t *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads);
+	template void areinside_first<int8_t,double>(int8_t *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads);
+	template void areinside_first<int16_t,double>(int16_t *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads);
+	template void areinside_first<int32_t,double>(int32_t *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads);
+
+	/* AREINSIDE_ALL
+
+		Returns every polygon of polys that contains each point (crossing
+		number) in CSR format: the polygons containing the point ip are
+		idx[off[ip]], ..., idx[off[ip+1]-1], in increasing order. off is
+		resized to np+1 and idx is overwritten. The coordinates are read
+		as in Polygon::areinside_cn.
+
+		The points are visited once and each point is tested against all
+		the polygons, most of which are rejected by their prefilter.
+	*/
+	template<class T>
+	void areinside_all(std::vector<int> &off, std::vector<int> &idx, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys) {
+		off.resize(np+1);
+		idx.clear();
+		off[0] = 0;
+		for(int k=0; k<npolys; ++k) polys[k]->prepare(np);
+		for(int ip=0; ip<np; ++ip) {
+			Point v = strided_point(x,y,z,ip,sx,sy,sz);
+			for(int k=0; k<npolys; ++k) {
+				const Polygon *poly = polys[k];
+				if (poly->isempty()) continue;
+				int f = poly->prefilter(v);
+				if ( (f > 0) || ((f == 0) && (poly->crossing_number(v) == 1)) ) idx.push_back(k);
+			}
+			off[ip+1] = (int)(idx.size());
+		}
+	}
+
+	template void areinside_all<float>(std::vector<int> &off, std::vector<int> &idx, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys);
+	template void areinside_all<double>(std::vector<int> &off, std::vector<int> &idx, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys);
+
+	/* AREINSIDE_POLYLINE
+
+		Returns True if the points are within a distance r of a polyline
+		of n points (i.e., inside the union of the capsules of radius r
+		around its segments), else False. The distance is measured in 3D
+		as for the Ball. out needs to come preallocated at np and the
+		coordinates are read as in Polygon::areinside_cn.
+
+		Points outside the box of the polyline (grown by r) are rejected
+		and, for long polylines, the segments are sorted in slabs in y so
+		that each point only tests the segments of the slabs within r.
+	*/
+	static inline bool near_segment(const Point &v, const Point &a, const Point &b, const double r2) {
+		Vector ab = b - a, av = v - a;
+		double l2 = ab.norm2(), t = (l2 > 0.) ? av.dot(ab)/l2 : 0.;
+		t = (t < 0.) ? 0. : ( (t > 1.) ? 1. : t );
+		return ( (av - ab*t).norm2() < r2 );
 	}
 
+	template<class T>
+	void areinside_polyline(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const Point *p, const int n, const double r, const int nthreads) {
+		if (n == 0) { std::fill(out,out+np,false); return; }
+		const double r2 = r*r;
+		// Box of the polyline grown by r
+		double x0 = p[0][0], x1 = p[0][0], y0 = p[0][1], y1 = p[0][1];
+		for (int ii=1; ii<n; ++ii) {
+			x0 = std::min(x0,p[ii][0]); x1 = std::max(x1,p[ii][0]);
+			y0 = std::min(y0,p[ii][1]); y1 = std::max(y1,p[ii][1]);
+		}
+		x0 -= r; x1 += r; y0 -= r; y1 += r;
+		// Index of the segments
+		SlabIndex idx;
+		if (n - 1 >= IDX_MINEDGES && np >= IDX_MINPOINTS) idx.build(p,n-1,0);
+		#ifdef USE_OMP
+		const int nth = (nthreads > 0) ? nthreads : OMP_MAX_THREADS;
+		#pragma omp parallel for schedule(dynamic,OMP_CHUNK) num_threads(nth) if(nth > 1 && np >= OMP_MINPOINTS)
+		#endif
+		for(int ip=0; ip<np; ++ip) {
+			Point v = strided_point(x,y,z,ip,sx,sy,sz);
+			bool in = false;
+			if ( (v[0] >= x0) && (v[0] <= x1) && (v[1] >= y0) && (v[1] <= y1) ) {
+				if (n == 1) {
+					in = v.dist2(p[0]) < r2;
+				} else if (idx.isempty()) {
+					for (int ii=0; ii<n-1 && !in; ++ii) in = near_segment(v,p[ii],p[ii+1],r2);
+				} else {
+					const int j1 = idx.slab(v[1] + r);
+					for (int j=idx.slab(v[1] - r); j<=j1 && !in; ++j)
+						for (int k=idx.get_begin(j); k<idx.get_end(j) && !in; ++k)
+							in = near_segment(v,p[idx.get_edge(k)],p[idx.get_edge(k)+1],r2);
+				}
+			}
+			out[ip] = in;
+		}
+	}
+
+	template void areinside_polyline<float>(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, const Point *p, const int n, const double r, const int nthreads);
+	template void areinside_polyline<double>(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, const Point *p, const int n, const double r, const int nthreads);
+
+	/* AREINSIDE_TRANSFORM
+
+		Returns True if the points are inside the polygon seen through a
+		transform, else False. tr is the inverse transform, which brings
+		the points to the frame of the polygon, so that the polygon and
+		its slab index, grid and prefilter are shared by any number of
+		transforms and never rebuilt. out needs to come preallocated at np
+		and the coordinates are read as in Polygon::areinside_cn.
+	*/
+	template<class T>
+	void areinside_transform(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, Polygon *poly, const Transform &tr, const int nthreads) {
+		if (poly->isempty()) { std::fill(out,out+np,false); return; }
+		poly->prepare(np);
+		#ifdef USE_OMP
+		#pragma omp parallel for schedule(dynamic,OMP_CHUNK) num_threads((nthreads > 0) ? nthreads : OMP_MAX_THREADS) if(np >= OMP_MINPOINTS)
+		#endif
+		for(int ip=0; ip<np; ++ip) {
+			Point v = tr.apply(strided_point(x,y,z,ip,sx,sy,sz));
+			int f   = poly->prefilter(v);
+			out[ip] = (f == 0) ? ( (poly->crossing_number(v) == 1) ? true : false ) : (f > 0);
+		}
+	}
+
+	template void areinside_transform<float>(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, Polygon *poly, const Transform &tr, const int nthreads);
+	template void areinside_transform<double>(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, Polygon *poly, const Transform &tr, const int nthreads);
+
+	/* AREINSIDE_HALFSPACES
+
+		Returns True if the points are inside the convex region given by
+		the intersection of nplanes half-spaces, else False. Each half-space
+		is given by 4 coefficients (a,b,c,d) of planes and contains the points
+		where a*x + b*y + c*z + d < 0. The points on the plane are inside only
+		if its normal (a,b,c) points to negative x (else negative y, else
+		negative z), i.e., the half-open rule of the crossing number test,
+		so that the regions sharing a plane do not share its points. out
+		needs to come preallocated at np and the coordinates are read as in
+		Polygon::areinside_cn.
+	*/
+	static inline bool halfspace_closed(const double *h) { return (h[0] != 0.) ? h[0] < 0. : ((h[1] != 0.) ? h[1] < 0. : h[2] < 0.); }
+	template<class T>
+	void areinside_halfspaces(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const double *planes, const int nplanes, const int nthreads) {
+		#ifdef USE_OMP
+		const int nth = (nthreads > 0) ? nthreads : OMP_MAX_THREADS;
+		#pragma omp parallel for schedule(static) num_threads(nth) if(nth > 1 && np >= OMP_MINPOINTS)
+		#endif
+		for(int ip=0; ip<np; ++ip) {
+			Point v = strided_point(x,y,z,ip,sx,sy,sz);
+			bool in = true;
+			for (int k=0; k<nplanes && in; ++k) {
+				double s = planes[4*k]*v[0] + planes[4*k+1]*v[1] + planes[4*k+2]*v[2] + planes[4*k+3];
+				in = (s < 0.) || (s == 0. && halfspace_closed(planes+4*k));
+			}
+			out[ip] = in;
+		}
+	}
+
+	template void areinside_halfspaces<float>(bool *out, const float *x, const float *y, const float *z, const int np, const int sx, const int sy, const int sz, const double *planes, const int nplanes, const int nthreads);
+	template void areinside_halfspaces<double>(bool *out, const double *x, const double *y, const double *z, const int np, const int sx, const int sy, const int sz, const double *planes, const int nplanes, const int nthreads);
+
+	/* CROSSINGS
+
+		Returns, sorted, the x coordinates where the polygon edges cross
+		the line at y (same crossing rule as cn_PinPoly), so that a point
+		at y is inside if it has an odd number of crossings to its right.
+	*/
+	void Polygon::crossings(const double y, std::vector<double> &xs) const {
+		xs.clear();
+		int k0 = 0, k1 = this->n, j = 0;
+		if (has_index()) {
+			if (!idx.inrange(y)) return;
+			j  = idx.slab(y);
+			k0 = idx.get_begin(j);
+			k1 = idx.get_end(j);
+		}
+		for (int k=k0; k<k1; ++k) {
+			int ii = has_index() ? idx.get_edge(k) : k;
+			if ( ((p[ii][1] <= y) && (p[ii+1][1] >  y))         // an upward crossing
+			  || ((p[ii][1] >  y) && (p[ii+1][1] <= y)) ) {     // a downward crossing
+				double vt = (double)( (y  - p[ii][1]) / (p[ii+1][1] - p[ii][1]) );
+				xs.push_back(p[ii][0] + vt * (p[ii+1][0] - p[ii][0]));
+			}
+		}
+		std::sort(xs.begin(),xs.end());
+	}
+
+	/* GRID_MASK
+
+		Rasterize the polygon on a rectilinear grid given by its axes x
+		(nx points, stride sx) and y (ny points, stride sy). out needs to
+		come preallocated at ny*nx and row j is the mask of the points
+		(x[i],y[j]). The crossings of each row are computed once and the
+		points are swept in increasing x (order, argsort of x, or computed
+		here if NULL), so that a point is inside if an odd number of
+		crossings lie to its right (same rule as cn_PinPoly) and it is
+		inside the bounding ball, as in areinside_cn.
+
+		With OpenMP, the rows are split among the threads.
+	*/
+	template<class T>
+	void Polygon::grid_mask(bool *out, const T *x, const int nx, const int sx, const T *y, const int ny, const int sy, const int *order, const int nthreads) {
+		prepare(ny);
+		std::vector<int> idx;
+		if (order == NULL) {
+			idx.resize(nx);
+			for (int i=0; i<nx; ++i) idx[i] = i;
+			std::sort(idx.begin(),idx.end(),[x,sx](const int a, const int b) { return x[(long)(a)*sx] < x[(long)(b)*sx]; });
+			order = idx.data();
+		}
+		#ifdef USE_OMP
+		#pragma omp parallel num_threads((nthreads > 0) ? nthreads : OMP_MAX_THREADS) if((long)(nx)*ny >= OMP_MINPOINTS)
+		#endif
+		{
+		std::vector<double> xs;
+		#ifdef USE_OMP
+		#pragma omp for schedule(dynamic)
+		#endif
+		for (int j=0; j<ny; ++j) {
+			bool *row = out + (long)(j)*nx;
+			const double yj = (double)(y[(long)(j)*sy]);
+			crossings(yj,xs);
+			const int nxs = (int)(xs.size());
+			int k = 0; // Number of crossings left of (or at) the current point
+			for (int ii=0; ii<nx; ++ii) {
+				const int i   = order[ii];
+				const double xi = (double)(x[(long)(i)*sx]);
+				while (k < nxs && xs[k] <= xi) ++k;
+				row[i] = ( (((nxs - k) & 1) == 1) && (bbox > Point(xi,yj,0.)) );
+			}
+		}
+		}
+	}
+	template void Polygon::grid_mask<float>(bool *out, const float *x, const int nx, const int sx, const float *y, const int ny, const int sy, const int *order, const int nthreads);
+	template void Polygon::grid_mask<double>(bool *out, const double *x, const int nx, const int sx, const double *y, const int ny, const int sy, const int *order, const int nthreads);
+
 	/* COMPUTE_CENTROID
 
 		Returns the centroid (Point) of a (2D) polygon.	
@@ -296,39 +1031,62 @@ namespace Geom
 		return Point(Cx/(3*A),Cy/(3*A),0.);
 	}
 
+	/* CLASSIFY
+
+		Classify the shape of the polygon (PolyKind) to choose the kernel
+		of the crossing number:
+			- KIND_RECTANGLE: axis aligned rectangles, tested by comparing
+			  the intervals of the rectangle (half open as cn_PinPoly).
+			- KIND_CONVEX: convex polygons, tested with a binary search on
+			  their chains of edges (see ConvexIndex).
+			- KIND_SIMPLE: general polygons with few edges, tested with a
+			  plain loop over the edges.
+			- KIND_LARGE: general polygons with many edges, tested with the
+			  slab index (or the cell grid when built).
+		The classification is dropped when the points of the polygon change
+		and redone on the next call to prepare.
+	*/
+	void Polygon::classify() {
+		build_convex();
+		kind = (n >= IDX_MINEDGES) ? KIND_LARGE : KIND_SIMPLE;
+		if (!has_convex()) return;
+		kind = KIND_CONVEX;
+		// A convex polygon with all its edges aligned with the axes
+		// is its bounding box
+		for (int ii=0; ii<n; ++ii)
+			if ( (p[ii+1][0] != p[ii][0]) && (p[ii+1][1] != p[ii][1]) ) return;
+		rect[0] = p[0][0]; rect[1] = p[0][0]; rect[2] = p[0][1]; rect[3] = p[0][1];
+		for (int ii=1; ii<n; ++ii) {
+			rect[0] = std::max(rect[0],p[ii][0]); rect[1] = std::min(rect[1],p[ii][0]);
+			rect[2] = std::max(rect[2],p[ii][1]); rect[3] = std::min(rect[3],p[ii][1]);
+		}
+		kind = KIND_RECTANGLE;
+	}
+
 	/* ROTATE
 		
 		Rotate a polygon by a theta radians 3D angle array 
-		wrt to an origin Point (o).
+		wrt to an origin Point (o), R = Rx*Ry*Rz. The points are
+		rotated in place and the bounding box and the centroid are
+		updated.
 	*/
 	void Polygon::rotate(const double theta[3], const Point o) {
 		// Compute sin and cos
 		double cx = cos(theta[0]), sx = sin(theta[0]);
 		double cy = cos(theta[1]), sy = sin(theta[1]);
 		double cz = cos(theta[2]), sz = sin(theta[2]);
-		// Build rotation matrices
-		double valx[] = {1.,0.,0.,0.,cx,-sx,0.,sx,cx};
-		double valy[] = {cy,0.,sy,0.,1.,0.,-sy,0.,cy};
-		double valz[] = {cz,-sz,0.,sz,cz,0.,0.,0.,1.};
-		matMN::matrixMN<double> Rx(3,3,valx), Ry(3,3,valy), Rz(3,3,valz);
-		// Compute rotation matrix R
-		matMN::matrixMN<double> R = Rx^Ry^Rz;
-		// Project the points
-		Point p;
-		matMN::matrixMN<double> out(3,1), points(3,1);
-		for (int ip=0; ip<this->get_npoints()+1; ++ip) {
-			// Set the points matrix
-			points[0][0] = this->get_point(ip)[0] - o[0];
-			points[1][0] = this->get_point(ip)[1] - o[1];
-			points[2][0] = this->get_point(ip)[2] - o[2];
-			// Compute the projection
-			out = R^points;
-			// Set the output point
-			p[0] = out[0][0] + o[0];
-			p[1] = out[1][0] + o[1];
-			p[2] = out[2][0] + o[2];
-			// Set the point on the polygon
-			this->set_point(ip,p);
+		// Rotation matrix
+		const double R[3][3] = {{ cy*cz,             -cy*sz,              sy   },
+		                        { sx*sy*cz + cx*sz,  -sx*sy*sz + cx*cz,  -sx*cy},
+		                        {-cx*sy*cz + sx*sz,   cx*sy*sz + sx*cz,   cx*cy}};
+		// Rotate the points (including the last one)
+		for (int ip=0; ip<this->n+1; ++ip) {
+			const double d[3] = {p[ip][0] - o[0], p[ip][1] - o[1], p[ip][2] - o[2]};
+			for (int i=0; i<3; ++i)
+				p[ip][i] = R[i][0]*d[0] + R[i][1]*d[1] + R[i][2]*d[2] + o[i];
 		}
+		idx.clear(); grid.clear(); pre.clear(); cvx.clear(); kind = KIND_UNKNOWN;
+		bbox.fastBall(*this);
+		c = compute_centroid();
 	}
 }
\ No newline at end of file
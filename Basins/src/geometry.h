@@ -10,21 +10,61 @@
 #define Geometry_h
 
 #include <cstdlib>
+#include <cstdint>
 #include <cstdio>
 #include <cstring>
 #include <algorithm>
+#include <atomic>
+#include <vector>
 #include <cmath>
 
+#define IDX_EDGES_PER_SLAB 1       // Average number of edges per slab of the index
+#define IDX_MAX_SLABS      1048576 // Maximum number of slabs of the index
+#define IDX_MINEDGES       64      // Polygons with less edges are not indexed
+#define IDX_MINPOINTS      8       // Minimum number of queries to build the index
+#define GRID_CELLS_PER_EDGE 4      // Number of cells per edge of the grid
+#define GRID_MAX_CELLS     1048576 // Maximum number of cells of the grid
+#define GRID_EPS           1e-6    // Relative tolerance (wrt the cell size) to find the edges of a cell
+#define PRE_MINEDGES       16      // Polygons with less edges are not prefiltered
+#define PRE_CELLS          4096    // Number of cells used to find the inscribed regions of the prefilter
+#define PRE_NRECTS         4       // Maximum number of inscribed rectangles of the prefilter
+#define PRE_EPS            1e-9    // Relative tolerance of the regions of the prefilter
+#define EDGE_EPS           1e-9    // Relative tolerance (wrt the coordinates) of a point on an edge
+#define OMP_MINPOINTS      1024    // Minimum number of points to run in parallel over the points
+#define OMP_MINEDGES       16384   // Minimum number of edges to run in parallel over the edges
+#define OMP_CHUNK          256     // Number of points per chunk of the parallel loop
+
 namespace Geom
 {
 	class Point;
 	class Vector;
+	class SlabIndex;
+	class CellGrid;
+	class Prefilter;
+	class ConvexIndex;
+	class Transform;
 	class Polygon;
 
+	enum CellStatus { CELL_OUTSIDE = 0, CELL_INSIDE = 1, CELL_BOUNDARY_OUT = 2, CELL_BOUNDARY_IN = 3, CELL_MIXED = 4 };
+	enum PolyKind   { KIND_UNKNOWN = 0, KIND_RECTANGLE = 1, KIND_CONVEX = 2, KIND_SIMPLE = 3, KIND_LARGE = 4 };
+	enum TransKind  { TRANS_AFFINE = 0, TRANS_SPHERE = 1 };
+
+	void set_num_threads(const int nthreads); // Default number of threads (only with OpenMP)
+	int  get_num_threads();                   // Return:  the default number of threads
+
 	int cn_PinPoly(const Polygon *poly, const Point &P); // Return:  0 = outside, 1 = inside
-	int cn_PinPoly_OMP(const Polygon *poly, const Point &P); // Return:  0 = outside, 1 = inside
+	int cn_PinPoly_OMP(const Polygon *poly, const Point &P, const int nthreads=0); // Return:  0 = outside, 1 = inside
+	int cn_PinPoly_idx(const Polygon *poly, const Point &P); // Return:  0 = outside, 1 = inside
+	int cn_PinPoly_grid(const Polygon *poly, const Point &P); // Return:  0 = outside, 1 = inside
 	int wn_PinPoly(const Polygon *poly, const Point &P); // Return:  =0 only when P is outside
-	int wn_PinPoly_OMP(const Polygon *poly, const Point &P); // Return:  =0 only when P is outside
+	int wn_PinPoly_OMP(const Polygon *poly, const Point &P, const int nthreads=0); // Return:  =0 only when P is outside
+	int wn_PinPoly_idx(const Polygon *poly, const Point &P); // Return:  =0 only when P is outside
+
+	template<class L, class T> void areinside_first(L *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys, const int nthreads=0); // Return:  first polygon containing each point or -1
+	template<class T> void areinside_all(std::vector<int> &off, std::vector<int> &idx, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, Polygon *const *polys, const int npolys); // Return:  polygons containing each point (CSR)
+	template<class T> void areinside_polyline(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const Point *p, const int n, const double r, const int nthreads=0); // Return:  true within r of the polyline
+	template<class T> void areinside_transform(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, Polygon *poly, const Transform &tr, const int nthreads=0); // Return:  true inside the polygon seen through tr
+	template<class T> void areinside_halfspaces(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const double *planes, const int nplanes, const int nthreads=0); // Return:  true inside all the half-spaces
 
 
 	class Point {
@@ -85,6 +125,8 @@ namespace Geom
 		private:
 			double p[3];
 	};
+	// Arrays of points can be used as (n,3) arrays of doubles
+	static_assert(sizeof(Point) == 3*sizeof(double),"Point must be 3 packed doubles");
 
 	class Vector {
 
@@ -155,6 +197,8 @@ namespace Geom
 			inline bool   isdisjoint(const Ball &b) const     { return ( (!isempty() && b.get_center().dist(center) < (double)(radius + b.get_radius())) ? true : false ); }
 
 			void   fastBall(const Polygon &p);
+			template<class T> void areinside(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz) const;
+			inline void   areinside(bool *out, const double *xyz, const int np) const { areinside(out,xyz,xyz+1,xyz+2,np,3,3,3); }
 
 			// Operators
 			inline Ball  &operator=(const Ball &b)            { set(b.get_center(),b.get_radius()); return (*this); }
@@ -168,24 +212,168 @@ namespace Geom
 	};
 
 
+	class SlabIndex {
+
+		public:
+			// Constructors and destructors
+			inline SlabIndex()                                   { clear(); }
+			inline ~SlabIndex()                                  {}
+
+			// Functions
+			inline void   clear()                                { ready = false; ns = 0; y0 = 0.; y1 = 0.; idy = 0.; off.clear(); edges.clear(); }
+			inline bool   isempty() const                        { return !ready.load(std::memory_order_acquire); }
+			inline int    get_nslabs() const                     { return ns; }
+			inline int    get_nentries() const                   { return (int)(edges.size()); }
+			inline bool   inrange(const double y) const          { return ( (y >= y0) && (y <= y1) ); }
+			inline int    slab(const double y) const             { int j = (int)((y - y0)*idy); return (j < 0) ? 0 : ( (j >= ns) ? ns-1 : j ); }
+			inline int    get_begin(const int j) const           { return off[j]; }
+			inline int    get_end(const int j) const             { return off[j+1]; }
+			inline int    get_edge(const int k) const            { return edges[k]; }
+
+			void   build(const Point *p, const int n, const int nslabs);
+
+		private:
+			std::atomic<bool> ready;     // Set once the index is complete
+			int    ns;
+			double y0, y1, idy;
+			std::vector<int> off, edges; // Edges of each slab in CSR format
+	};
+
+
+	class CellGrid {
+
+		public:
+			// Constructors and destructors
+			inline CellGrid()                                    { clear(); }
+			inline ~CellGrid()                                   {}
+
+			// Functions
+			inline void   clear()                                { ready = false; nx = 0; ny = 0; x0 = 0.; y0 = 0.; x1 = 0.; y1 = 0.; dx = 0.; dy = 0.; status.clear(); off.clear(); edges.clear(); }
+			inline bool   isempty() const                        { return !ready.load(std::memory_order_acquire); }
+			inline int    get_nx() const                         { return nx; }
+			inline int    get_ny() const                         { return ny; }
+			inline double get_dx() const                         { return dx; }
+			inline double get_dy() const                         { return dy; }
+			inline int    get_status(const int c) const          { return (int)(status[c]); }
+			inline int    get_begin(const int c) const           { return off[c]; }
+			inline int    get_end(const int c) const             { return off[c+1]; }
+			inline int    get_edge(const int k) const            { return edges[k]; }
+			inline int    col(const double x) const              { int i = (int)((x - x0)/dx); return (i < 0) ? 0 : ( (i >= nx) ? nx-1 : i ); }
+			inline int    row(const double y) const              { int j = (int)((y - y0)/dy); return (j < 0) ? 0 : ( (j >= ny) ? ny-1 : j ); }
+			inline int    cell(const Point &v) const             { return ( (v[0] < x0) || (v[0] > x1) || (v[1] < y0) || (v[1] > y1) ) ? -1 : nx*row(v[1]) + col(v[0]); } // -1 outside the grid
+			inline Point  center(const int c) const              { return Point(x0 + ((c%nx) + 0.5)*dx, y0 + ((c/nx) + 0.5)*dy, 0.); }
+
+			void   build(const Polygon &poly, const int nnx, const int nny);
+
+		private:
+			std::atomic<bool> ready;         // Set once the grid is complete
+			int    nx, ny;
+			double x0, y0, x1, y1, dx, dy;
+			std::vector<signed char> status; // CellStatus of each cell
+			std::vector<int> off, edges;     // Edges crossing each cell in CSR format
+	};
+
+
+	class Prefilter {
+
+		public:
+			// Constructors and destructors
+			inline Prefilter()                                   { clear(); }
+			inline ~Prefilter()                                  {}
+
+			// Functions
+			inline void   clear()                                { built = false; x0 = 0.; y0 = 0.; x1 = 0.; y1 = 0.; cx = 0.; cy = 0.; cr2 = 0.; ix = 0.; iy = 0.; ir2 = 0.; nr = 0; }
+			inline bool   isempty() const                        { return !built.load(std::memory_order_acquire); }
+			inline void   get_aabb(double *b) const              { b[0] = x1; b[1] = x0; b[2] = y1; b[3] = y0; }
+			inline void   get_circle(double *c) const            { c[0] = cx; c[1] = cy; c[2] = std::sqrt(cr2); }
+			inline void   get_incircle(double *c) const          { c[0] = ix; c[1] = iy; c[2] = std::sqrt(ir2); }
+			inline int    get_nrects() const                     { return nr; }
+			inline void   get_rect(const int k, double *b) const { b[0] = rect[k][0]; b[1] = rect[k][1]; b[2] = rect[k][2]; b[3] = rect[k][3]; }
+			inline int    test(const Point &v) const;            // Return: -1 = outside, 1 = inside, 0 = unknown
+
+			void   build(const Polygon &poly);
+
+		private:
+			void   build_regions(const Polygon &poly);
+
+			std::atomic<bool> built;   // Set once the prefilter is complete
+			double x0, y0, x1, y1;     // Axis aligned box
+			double cx, cy, cr2;        // Minimal enclosing circle
+			double ix, iy, ir2;        // Inscribed circle
+			int    nr;                 // Inscribed rectangles as [xmax,xmin,ymax,ymin]
+			double rect[PRE_NRECTS][4];
+	};
+
+
+	class ConvexIndex {
+
+		public:
+			// Constructors and destructors
+			inline ConvexIndex()                                 { clear(); }
+			inline ~ConvexIndex()                                {}
+
+			// Functions
+			inline void   clear()                                { checked = false; up.clear(); dn.clear(); yup.clear(); ydn.clear(); }
+			inline bool   isempty() const                        { return up.empty() && dn.empty(); }
+			inline bool   ischecked() const                      { return checked; }
+			inline int    crossing_number(const Point *p, const Point &v) const; // Return:  0 = outside, 1 = inside
+
+			void   build(const Point *p, const int n);
+
+		private:
+			bool   checked;
+			std::vector<int>    up, dn;   // Upward and downward edges sorted in y
+			std::vector<double> yup, ydn; // Lowest y of each edge
+	};
+
+
+	class Transform {
+
+		public:
+			// Constructors and destructors
+			inline Transform()                                   { const double a[6] = {1.,0.,0.,0.,1.,0.}; set_affine(a); }
+			inline ~Transform()                                  {}
+
+			// Functions
+			inline void   set_affine(const double *a)            { kind = TRANS_AFFINE; std::memcpy(m,a,6*sizeof(double)); } // x = a[0]*X + a[1]*Y + a[2], y = a[3]*X + a[4]*Y + a[5]
+			inline void   set_sphere(const double *r)            { kind = TRANS_SPHERE; std::memcpy(m,r,9*sizeof(double)); } // Rotation of the sphere (lon,lat in degrees)
+			inline int    get_kind() const                       { return kind; }
+			inline Point  apply(const Point &v) const;
+
+		private:
+			int    kind;
+			double m[9];
+	};
+
+
 	class Polygon {
 
 		public:
 			// Constructors and destructors
-			inline Polygon()                                     { alloc = false; n = 0; }
-			inline Polygon(const int nn)                         { set_npoints(nn); }
-			inline Polygon(const int nn, const Point &v)         { set_npoints(nn); set_points(v); c = compute_centroid(); }
-			inline Polygon(const int nn, const Point *v)         { set_npoints(nn); set_points(v); c = compute_centroid(); }
+			inline Polygon()                                     { alloc = false; own = false; n = 0; kind = KIND_UNKNOWN; }
+			inline Polygon(const int nn)                         { alloc = false; own = false; set_npoints(nn); }
+			inline Polygon(const int nn, const Point &v)         { alloc = false; own = false; set_npoints(nn); set_points(v); c = compute_centroid(); }
+			inline Polygon(const int nn, const Point *v)         { alloc = false; own = false; set_npoints(nn); set_points(v); c = compute_centroid(); }
 			inline ~Polygon()                                    { clear(); }
 
 			// Functions
-			inline void   set_npoints(const int nn)              { n = nn; p = new Point[n+1]; alloc = true; }
-			inline void   set_point(const int i, const Point &v) { if (alloc) p[i] = v; }
-			inline void   set_points(const Point v)              { if (alloc) std::fill(p,p+n,v); }
-			inline void   set_points(const Point *v)             { if (alloc) std::memcpy(p,v,n*sizeof(Point)); }
+			inline void   set_npoints(const int nn)              { clear(); n = nn; p = new Point[n+1]; alloc = true; own = true; }
+			inline void   set_buffer(const int nn, Point *v)     { clear(); n = nn; p = v; alloc = true; own = false; } // v holds nn+1 points, not owned
+			inline void   set_point(const int i, const Point &v) { if (alloc) { p[i] = v; idx.clear(); grid.clear(); pre.clear(); cvx.clear(); kind = KIND_UNKNOWN; } }
+			inline void   set_points(const Point v)              { if (alloc) { std::fill(p,p+n,v); idx.clear(); grid.clear(); pre.clear(); cvx.clear(); kind = KIND_UNKNOWN; } }
+			inline void   set_points(const Point *v)             { if (alloc) { std::memcpy(p,v,n*sizeof(Point)); idx.clear(); grid.clear(); pre.clear(); cvx.clear(); kind = KIND_UNKNOWN; } }
 			inline void   set_centroid(const Point v)            { c = v; }
 			inline void   set_bbox(Ball &b)                      { bbox = b; }
-			inline void   clear()                                { n = 0; if (alloc) { delete [] p; } alloc = false; }
+			inline void   clear()                                { n = 0; if (alloc && own) { delete [] p; } alloc = false; own = false; idx.clear(); grid.clear(); pre.clear(); cvx.clear(); kind = KIND_UNKNOWN; }
+			inline void   build_index(const int nslabs)          { idx.build(p,n,nslabs); }
+			inline void   clear_index()                          { idx.clear(); }
+			inline void   build_grid(const int nx, const int ny) { if (want_index(IDX_MINPOINTS)) build_index(0); grid.build(*this,nx,ny); }
+			inline void   clear_grid()                           { grid.clear(); }
+			inline void   build_prefilter()                      { pre.build(*this); }
+			inline void   clear_prefilter()                      { pre.clear(); }
+			inline void   build_convex()                         { cvx.build(p,n); }
+			inline void   clear_convex()                         { cvx.clear(); }
+			inline void   prepare(const int np)                  { if (kind == KIND_UNKNOWN) classify(); if (want_index(np)) build_index(0); if (want_prefilter(np)) build_prefilter(); }
 			inline void   set(const int nn, const Point &v)      { set_npoints(nn); set_points(v); }
 			inline void   set(const int nn, const Point *v)      { set_npoints(nn); set_points(v); }
 			inline Point *get_points() const                     { return p; }
@@ -193,18 +381,39 @@ namespace Geom
 			inline Point  get_centroid() const                   { return c; }
 			inline int    get_npoints() const                    { return n; }
 			inline Ball   get_bbox() const                       { return bbox; }
+			inline const SlabIndex &get_index() const            { return idx; }
+			inline bool   has_index() const                      { return !idx.isempty(); }
+			inline const CellGrid &get_grid() const              { return grid; }
+			inline bool   has_grid() const                       { return !grid.isempty(); }
+			inline const Prefilter &get_prefilter() const        { return pre; }
+			inline bool   has_prefilter() const                  { return !pre.isempty(); }
+			inline bool   has_convex() const                     { return !cvx.isempty(); }
+			inline bool   want_convex() const                    { return !cvx.ischecked(); }
+			inline int    get_kind() const                       { return kind; }
+			inline bool   want_index(const int np) const         { return ( !has_index() && !has_convex() && n >= IDX_MINEDGES && np >= IDX_MINPOINTS ); }
+			inline bool   want_prefilter(const int np) const     { return ( !has_prefilter() && n >= PRE_MINEDGES && np >= IDX_MINPOINTS ); }
+			inline int    prefilter(const Point &v) const        { int f = has_prefilter() ? pre.test(v) : 0; return ( (f < 0) || !(bbox > v) ) ? -1 : f; } // Return: -1 = outside, 1 = inside, 0 = unknown
 			inline bool   isempty() const                        { return n == 0; }
 			inline bool   isinside(const Point &v) const         { return isinside_wn(v); }
-			inline bool   isinside_cn(const Point &v) const      { if (bbox > v) return ( (cn_PinPoly_OMP(this,v) == 1) ? true : false ); else return false; }
-			inline bool   isinside_wn(const Point &v) const      { if (bbox > v) return ( (wn_PinPoly_OMP(this,v) != 0) ? true : false ); else return false; }
-			inline void   areinside(bool *out, const double *xyz, const int np) { areinside_wn(out,xyz,np); }
+			inline bool   isinside_cn(const Point &v) const      { int f = prefilter(v); if (f == 0) return ( (((has_convex() || has_grid() || has_index()) ? crossing_number(v) : cn_PinPoly_OMP(this,v)) == 1) ? true : false ); else return f > 0; }
+			inline bool   isinside_wn(const Point &v) const      { int f = prefilter(v); if (f == 0) return ( ((has_index() ? winding_number(v) : wn_PinPoly_OMP(this,v)) != 0) ? true : false ); else return f > 0; }
+			inline int    crossing_number(const Point &v) const  { return (kind == KIND_RECTANGLE) ? crossing_number_rect(v) : ( has_convex() ? cvx.crossing_number(p,v) : ( has_grid() ? cn_PinPoly_grid(this,v) : crossing_number_edges(v) ) ); }
+			inline int    crossing_number_rect(const Point &v) const { return ( (v[0] >= rect[1]) && (v[0] < rect[0]) && (v[1] >= rect[3]) && (v[1] < rect[2]) ) ? 1 : 0; } // Same as cn_PinPoly on an axis aligned rectangle
+			inline int    crossing_number_edges(const Point &v) const { return has_index() ? cn_PinPoly_idx(this,v) : cn_PinPoly(this,v); }
+			inline int    winding_number(const Point &v) const   { return has_index() ? wn_PinPoly_idx(this,v) : wn_PinPoly(this,v); }
+			inline void   areinside(bool *out, const double *xyz, const int np, const int nthreads=0) { areinside_wn(out,xyz,np,nthreads); }
+			inline void   areinside_cn(bool *out, const double *xyz, const int np, const int nthreads=0) { areinside_cn(out,xyz,xyz+1,xyz+2,np,3,3,3,nthreads); }
+			inline void   areinside_wn(bool *out, const double *xyz, const int np, const int nthreads=0) { areinside_wn(out,xyz,xyz+1,xyz+2,np,3,3,3,nthreads); }
 
 			inline void   print() const                          { for(int i=0; i<n; ++i) { printf("Point %d ",i); p[i].print(); printf("\n"); } }
 			
 			Point  compute_centroid();
+			void   classify();
 			void   rotate(const double theta[3], const Point o);
-			void   areinside_cn(bool *out, const double *xyz, const int np);
-			void   areinside_wn(bool *out, const double *xyz, const int np);
+			template<class T> void areinside_cn(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const int nthreads=0);
+			template<class T> void areinside_wn(bool *out, const T *x, const T *y, const T *z, const int np, const int sx, const int sy, const int sz, const int nthreads=0);
+			void   crossings(const double y, std::vector<double> &xs) const;
+			template<class T> void grid_mask(bool *out, const T *x, const int nx, const int sx, const T *y, const int ny, const int sy, const int *order=NULL, const int nthreads=0);
 
 			// Operators
 			inline Point  operator[](int i) const                { return (i>=0) ? p[i] : p[n+i]; }
@@ -215,11 +424,17 @@ namespace Geom
 			inline bool   operator<(const Point &v) const;
 
 		private:
-			bool   alloc;
+			bool   alloc, own;
 			int    n;
 			Point *p;
 			Point  c;
 			Ball   bbox;
+			SlabIndex idx;
+			CellGrid  grid;
+			Prefilter pre;
+			ConvexIndex cvx;
+			int    kind;                 // PolyKind of the polygon
+			double rect[4];              // Axis aligned rectangle as [xmax,xmin,ymax,ymin]
 	};
 
 	// Point
@@ -232,6 +447,50 @@ namespace Geom
 	inline double  Point::dist(const Point &pp) const       { Vector d = (*this) - pp; return d.norm();  }
 	inline double  Point::dist2(const Point &pp) const      { Vector d = (*this) - pp; return d.norm2(); }
 
+	// Prefilter
+	inline int Prefilter::test(const Point &v) const {
+		// Reject outside the box and the enclosing circle
+		if ( (v[0] < x0) || (v[0] > x1) || (v[1] < y0) || (v[1] > y1) ) return -1;
+		double dx = v[0] - cx, dy = v[1] - cy;
+		if (dx*dx + dy*dy > cr2) return -1;
+		// Accept inside the inscribed circle or rectangles
+		dx = v[0] - ix; dy = v[1] - iy;
+		if (dx*dx + dy*dy < ir2) return 1;
+		for (int k=0; k<nr; ++k)
+			if ( (v[0] <= rect[k][0]) && (v[0] >= rect[k][1]) && (v[1] <= rect[k][2]) && (v[1] >= rect[k][3]) ) return 1;
+		return 0;
+	}
+
+	// ConvexIndex
+	inline int ConvexIndex::crossing_number(const Point *p, const Point &v) const {
+		// At most one upward and one downward edge cross y=P.y, found by
+		// binary search and tested as in cn_PinPoly
+		int cn = 0;
+		for (int ic=0; ic<2; ++ic) {
+			const std::vector<int>    &e  = (ic == 0) ? up  : dn;
+			const std::vector<double> &ye = (ic == 0) ? yup : ydn;
+			int k = (int)(std::upper_bound(ye.begin(),ye.end(),v[1]) - ye.begin()) - 1;
+			if (k < 0) continue;
+			const int ii = e[k];
+			if ( ((p[ii][1] <= v[1]) && (p[ii+1][1] >  v[1]))
+			  || ((p[ii][1] >  v[1]) && (p[ii+1][1] <= v[1])) ) {
+				double vt = (double)( (v[1]  - p[ii][1]) / (p[ii+1][1] - p[ii][1]) );
+				if (v[0] <  p[ii][0] + vt * (p[ii+1][0] - p[ii][0])) ++cn;
+			}
+		}
+		return(cn & 1);
+	}
+
+	// Transform
+	inline Point Transform::apply(const Point &v) const {
+		if (kind == TRANS_AFFINE) return Point(m[0]*v[0] + m[1]*v[1] + m[2], m[3]*v[0] + m[4]*v[1] + m[5], v[2]);
+		// Rotate the unit vector of (lon,lat) on the sphere
+		const double d2r = std::atan(1.)/45.;
+		const double cl = std::cos(v[1]*d2r), c[3] = {cl*std::cos(v[0]*d2r), cl*std::sin(v[0]*d2r), std::sin(v[1]*d2r)};
+		const double r[3] = {m[0]*c[0] + m[1]*c[1] + m[2]*c[2], m[3]*c[0] + m[4]*c[1] + m[5]*c[2], m[6]*c[0] + m[7]*c[1] + m[8]*c[2]};
+		return Point(std::atan2(r[1],r[0])/d2r, std::atan2(r[2],std::sqrt(r[0]*r[0] + r[1]*r[1]))/d2r, v[2]);
+	}
+
 	// Vector
 	inline Vector &Vector::operator=(const Vector &vv)                { set(vv[0],vv[1],vv[2]); return (*this); }
 	inline Vector  Vector::operator+(const Vector &vv) const          { return Vector(v[0]+vv[0],v[1]+vv[1],v[2]+vv[2]); }
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+
+from __future__ import print_function, division
+
+import collections
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+STREAM_CHUNK    = 1 << 20 # Default number of points per chunk
+STREAM_NWORKERS = 2       # Default number of workers (one reading while the other classifies)
+
+
+def iter_chunks(source,chunk=STREAM_CHUNK):
+	'''
+	Iterate the chunks of points of a source, which can be:
+		- an array of points of shape (npoints,2) or (npoints,3), e.g.,
+		  an np.memmap, that is sliced in chunks of chunk points.
+		- a tuple (x,y) of arrays of coordinates, sliced the same way.
+		- an iterable of chunks (arrays of points or tuples (x,y)),
+		  which are yielded as they are.
+	Slicing does not read the data, so a memmap is only read when each
+	chunk is classified.
+	'''
+	if isinstance(source,tuple):
+		x, y = source
+		if not len(x) == len(y): raise ValueError('x and y must have the same number of points!')
+		for ip in range(0,len(x),chunk):
+			yield x[ip:ip+chunk], y[ip:ip+chunk]
+	elif hasattr(source,'shape') and hasattr(source,'dtype'):
+		for ip in range(0,source.shape[0],chunk):
+			yield source[ip:ip+chunk]
+	else:
+		for c in source:
+			yield c
+
+def _classify(region,c):
+	'''
+	Classify a chunk, which is read from disk (if mapped) by the kernel.
+	'''
+	if isinstance(c,tuple): return region.areinside_xy(c[0],c[1])
+	return region.areinside(c)
+
+def iter_areinside(region,source,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+	'''
+	Returns a generator of the masks (True if inside) of the chunks of
+	points of a source (see iter_chunks) in the same order as the chunks.
+
+	The chunks are classified by a pool of nworkers threads, so reading
+	a chunk (e.g., the pages of a memmap) overlaps with classifying the
+	previous ones. At most nworkers+1 chunks are in flight, so the memory
+	used is bounded by the size of the chunks and not by the source.
+	'''
+	if nworkers < 1: raise ValueError('At least one worker is needed!')
+	with ThreadPoolExecutor(max_workers=nworkers) as pool:
+		pending = collections.deque()
+		for c in iter_chunks(source,chunk):
+			pending.append(pool.submit(_classify,region,c))
+			if len(pending) > nworkers: yield pending.popleft().result()
+		while len(pending) > 0:
+			yield pending.popleft().result()
+
+def stream_areinside(region,source,out,chunk=STREAM_CHUNK,nworkers=STREAM_NWORKERS):
+	'''
+	Classify the chunks of points of a source (see iter_areinside) and
+	write the masks into out, e.g., a memmapped array of bool of length
+	npoints. Returns out.
+	'''
+	ip = 0
+	for mask in iter_areinside(region,source,chunk,nworkers):
+		if ip + mask.shape[0] > out.shape[0]: raise ValueError('Output is shorter than the source!')
+		out[ip:ip+mask.shape[0]] = mask
+		ip += mask.shape[0]
+	if not ip == out.shape[0]: raise ValueError('Output is longer than the source!')
+	return out
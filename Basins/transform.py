@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+
+from __future__ import print_function, division
+
+import numpy as np
+
+from .      import cache
+from .basic import Point, areinside_transform, as_coordinates, TRANS_AFFINE, TRANS_SPHERE
+
+
+def _unit(lon,lat):
+	'''
+	Unit vectors of (lon,lat) in degrees.
+	'''
+	lon, lat = np.deg2rad(lon), np.deg2rad(lat)
+	return np.stack([np.cos(lat)*np.cos(lon),np.cos(lat)*np.sin(lon),np.sin(lat)],axis=-1)
+
+
+class Affine(object):
+	'''
+	Affine transform of the xy plane, (x,y) -> matrix*(x,y) + offset.
+	'''
+	def __init__(self,matrix=None,offset=None):
+		self._matrix = np.eye(2) if matrix is None else np.array(matrix,dtype=np.double).reshape((2,2))
+		self._offset = np.zeros((2,)) if offset is None else np.array(offset,dtype=np.double).reshape((2,))
+		if np.linalg.det(self._matrix) == 0.: raise ValueError('Affine transform is not invertible!')
+
+	def __str__(self):
+		return 'Affine matrix = %s offset = %s' % (self._matrix.tolist(),self._offset.tolist())
+
+	def __call__(self,x,y):
+		'''
+		Transform the coordinates x and y.
+		'''
+		x, y = np.asarray(x,dtype=np.double), np.asarray(y,dtype=np.double)
+		m, o = self._matrix, self._offset
+		return m[0,0]*x + m[0,1]*y + o[0], m[1,0]*x + m[1,1]*y + o[1]
+
+	def __mul__(self,other):
+		'''
+		Composition, (self*other)(x,y) = self(other(x,y)).
+		'''
+		if not isinstance(other,Affine): return NotImplemented
+		return Affine(np.matmul(self._matrix,other.matrix),np.matmul(self._matrix,other.offset) + self._offset)
+
+	def inverse(self):
+		'''
+		Returns the inverse transform.
+		'''
+		minv = np.linalg.inv(self._matrix)
+		return Affine(minv,-np.matmul(minv,self._offset))
+
+	@classmethod
+	def translation(cls,dx,dy):
+		'''
+		Translation by (dx,dy).
+		'''
+		return cls(offset=[dx,dy])
+
+	@classmethod
+	def rotation(cls,theta,origin=(0.,0.)):
+		'''
+		Rotation of theta radians around an origin.
+		'''
+		c, s = np.cos(theta), np.sin(theta)
+		m = np.array([[c,-s],[s,c]])
+		o = np.asarray(origin,dtype=np.double)
+		return cls(m,o - np.matmul(m,o))
+
+	@classmethod
+	def scaling(cls,sx,sy=None,origin=(0.,0.)):
+		'''
+		Scaling by sx and sy (sx if not given) wrt an origin.
+		'''
+		m = np.diag([sx,sx if sy is None else sy])
+		o = np.asarray(origin,dtype=np.double)
+		return cls(m,o - np.matmul(m,o))
+
+	@property
+	def matrix(self):
+		return self._matrix
+	@property
+	def offset(self):
+		return self._offset
+	@property
+	def kind(self):
+		return TRANS_AFFINE
+	@property
+	def params(self):
+		'''
+		Parameters of the inverse transform (see areinside_transform).
+		'''
+		inv = self.inverse()
+		return np.column_stack([inv.matrix,inv.offset]).ravel()
+
+
+class SphereRotation(object):
+	'''
+	Rotation of the sphere of the points given as (lon,lat) in degrees,
+	where matrix rotates their unit vectors.
+	'''
+	def __init__(self,matrix):
+		self._matrix = np.array(matrix,dtype=np.double).reshape((3,3))
+
+	def __str__(self):
+		return 'SphereRotation matrix = %s' % self._matrix.tolist()
+
+	def __call__(self,lon,lat):
+		'''
+		Transform the coordinates lon and lat.
+		'''
+		v = np.matmul(_unit(np.asarray(lon,dtype=np.double),np.asarray(lat,dtype=np.double)),self._matrix.T)
+		return np.rad2deg(np.arctan2(v[...,1],v[...,0])), np.rad2deg(np.arctan2(v[...,2],np.hypot(v[...,0],v[...,1])))
+
+	def __mul__(self,other):
+		'''
+		Composition, (self*other)(lon,lat) = self(other(lon,lat)).
+		'''
+		if not isinstance(other,SphereRotation): return NotImplemented
+		return SphereRotation(np.matmul(self._matrix,other.matrix))
+
+	def inverse(self):
+		'''
+		Returns the inverse transform.
+		'''
+		return SphereRotation(self._matrix.T)
+
+	@property
+	def matrix(self):
+		return self._matrix
+	@property
+	def kind(self):
+		return TRANS_SPHERE
+	@property
+	def params(self):
+		'''
+		Parameters of the inverse transform (see areinside_transform).
+		'''
+		return self._matrix.T.ravel()
+
+
+class RotatedPole(SphereRotation):
+	'''
+	Transform from geographic coordinates to a rotated pole frame, whose
+	north pole is at (pole_lon,pole_lat), e.g., the rotated grids of
+	regional climate models. The origin of the rotated frame is at
+	(pole_lon+180,90-pole_lat).
+	'''
+	def __init__(self,pole_lon,pole_lat):
+		self._pole = (pole_lon,pole_lat)
+		ez = _unit(pole_lon,pole_lat)
+		ex = _unit(pole_lon+180.,90.-pole_lat)
+		# The rows are the axes of the rotated frame
+		super(RotatedPole, self).__init__(np.array([ex,np.cross(ez,ex),ez]))
+
+	def __str__(self):
+		return 'RotatedPole pole = %s' % (self._pole,)
+
+	@property
+	def pole(self):
+		return self._pole
+
+
+class PolygonView(object):
+	'''
+	A polygon seen through a transform (Affine or SphereRotation).
+
+	The view shares the vertex buffer of the polygon and its slab index,
+	grid and prefilter, as the queries bring the points back to the frame
+	of the polygon with the inverse transform. Hence, many rotated, shifted
+	or rotated pole variants of the same basin do not copy nor rebuild
+	its geometry. The transformed vertices, only needed for the box and
+	for plotting, are computed on demand.
+	'''
+	def __init__(self,poly,transform):
+		self._poly      = poly
+		self._transform = transform
+		self._xyz       = None # Transformed vertices and the hash of the polygon
+
+	def __str__(self):
+		return 'View of %d points through %s' % (self._poly.npoints,self._transform.__str__())
+
+	def isinside(self,point):
+		'''
+		Returns True if the point is inside the view, else False.
+		'''
+		return bool(self.areinside(point.xyz.reshape((1,3)))[0])
+
+	def isinside_xy(self,x,y):
+		'''
+		Returns True if the point (x,y) is inside the view, else False.
+		'''
+		return self.isinside(Point(x,y,0.))
+
+	def areinside(self,xyz,nthreads=0):
+		'''
+		Returns True if the points are inside the view, else False.
+		The points are given as an array of shape (npoints,2) or (npoints,3).
+		'''
+		xyz = as_coordinates(xyz)
+		key, out = cache.lookup('areinside',self._cache_hash(),xyz)
+		if out is not None: return out
+		return cache.store(key,areinside_transform(self._poly,self._transform.kind,self._transform.params,xyz,nthreads=nthreads))
+
+	def areinside_xy(self,x,y,nthreads=0):
+		'''
+		Returns True if the points are inside the view, else False.
+		The points are given as two arrays of coordinates x and y (e.g.,
+		longitude and latitude).
+		'''
+		x, y = as_coordinates(x,y)
+		key, out = cache.lookup('areinside_xy',self._cache_hash(),x,y)
+		if out is not None: return out
+		return cache.store(key,areinside_transform(self._poly,self._transform.kind,self._transform.params,x,y,nthreads=nthreads))
+
+	def _cache_hash(self):
+		'''
+		Content hash to look the masks up, None (not computed)
+		if the cache is disabled.
+		'''
+		return None if cache.get_cache() is None else self.hash
+
+	def transformed(self,transform):
+		'''
+		Returns the view of the same polygon through transform
+		applied after the transform of this view.
+		'''
+		return PolygonView(self._poly,transform*self._transform)
+
+	@property
+	def polygon(self):
+		return self._poly
+	@property
+	def transform(self):
+		return self._transform
+	@property
+	def hash(self):
+		'''
+		Content hash of the polygon and the transform, used to cache the masks.
+		'''
+		return cache.content_hash(self._poly.hash,np.append(self._transform.kind,self._transform.params))
+	@property
+	def npoints(self):
+		return self._poly.npoints
+	@property
+	def xyz(self):
+		if self._xyz is None or not self._xyz[0] == self._poly.hash:
+			xyz = np.array(self._poly.xyz)
+			xyz[:,0], xyz[:,1] = self._transform(xyz[:,0],xyz[:,1])
+			xyz.flags.writeable = False
+			self._xyz = (self._poly.hash,xyz)
+		return self._xyz[1]
+	@property
+	def x(self):
+		return self.xyz[:,0]
+	@property
+	def y(self):
+		return self.xyz[:,1]
+	@property
+	def z(self):
+		return self.xyz[:,2]
+	@property
+	def centroid(self):
+		c = self._poly.centroid.xyz
+		x, y = self._transform(c[0],c[1])
+		return Point(float(x),float(y),c[2])
+	@property
+	def box(self):
+		return [np.max(self.x),np.min(self.x),np.max(self.y),np.min(self.y)]
@@ -4,15 +4,16 @@
 
 from __future__ import print_function, division
 
-import os, numpy as np
+from .manifest import Manifest
 
-from .entities import Basin, ComposedBasin
-
-# Path to the shapes directory
-SHAPESPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),'shapes')
+# Basins are built on first access
+manifest = Manifest(__name__)
 
 # World Countries shapefile
-mne = Basin.from_npy('mne', 'Montenegro', os.path.join(SHAPESPATH,'Montenegro_WorldCountries.npy'),downsample=1)
-spa = Basin.from_npy('spa', 'Spain'     , os.path.join(SHAPESPATH,'Spain_WorldCountries.npy'),downsample=4)
+manifest.shape('mne', 'mne', 'Montenegro', 'Montenegro_WorldCountries',downsample=1)
+manifest.shape('spa', 'spa', 'Spain'     , 'Spain_WorldCountries'     ,downsample=4)
+
+__getattr__ = manifest.getattr
+__dir__     = manifest.dir
 
-del print_function, division, os, np, Basin, ComposedBasin
\ No newline at end of file
+del print_function, division, Manifest
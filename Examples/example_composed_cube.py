@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+from __future__ import print_function, division
+
+import numpy as np
+
+import Basins
+
+# Random points around the unit cube
+np.random.seed(1)
+xyzp = np.random.uniform(-.5,1.5,(2000,3))
+
+# Cubes and a square in a composed basin must be classified in 3D,
+# as they are on their own
+square = Basins.SimpleRectangle(2.,3.,2.,3.)
+for cube in [Basins.SimpleCube(0.,1.,0.,1.,0.,1.),Basins.Cube.from_array(Basins.SimpleCube(0.,1.,0.,1.,0.,1.).xyz)]:
+	basin  = Basins.ComposedBasin('cub','Cube',[square,cube])
+	inside = cube.areinside(xyzp)
+	nbasin = np.sum(basin.areinside(xyzp) != inside)
+	labels, _ = basin.areinbasin_labels(xyzp)
+	nlabel = np.sum((labels == 1) != inside)
+	print('%s: %d points inside, %d mismatches, %d mismatches of the labels' % (cube.__class__.__name__,np.sum(inside),nbasin,nlabel))
+	if nbasin > 0 or nlabel > 0: raise ValueError('The composed basin does not match the cube!')
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+from __future__ import print_function, division
+
+import numpy as np
+
+import Basins
+
+# Star shaped polygons with a small and a large number of edges
+np.random.seed(1)
+for n in [30,3000]:
+	theta = np.sort(np.random.uniform(0.,2.*np.pi,n))
+	r     = np.random.uniform(.5,1.,n)
+	xyz   = np.zeros((n+1,3))
+	xyz[:n,0] = 10. + r*np.cos(theta)
+	xyz[:n,1] = 40. + r*np.sin(theta)
+	xyz[n,:]  = xyz[0,:]
+	poly = Basins.Polygon.from_array(xyz)
+
+	# Points on the edges, within rounding of the exact edge
+	k    = np.random.randint(0,n,3000)
+	t    = np.random.uniform(0.,1.,(3000,1))
+	xyzp = np.zeros((3000,3))
+	xyzp[:,:2] = xyz[k,:2]*(1. - t) + xyz[k+1,:2]*t
+
+	# The cell grid must give the same result as the plain test
+	inside = poly.areinside(xyzp)
+	poly.build_grid()
+	ngrid  = np.sum(poly.areinside(xyzp) != inside)
+	print('%d edges, %d points on the edges, %d inside, %d mismatches with the grid' % (n,xyzp.shape[0],np.sum(inside),ngrid))
+	if ngrid > 0: raise ValueError('The cell grid does not match the plain test!')
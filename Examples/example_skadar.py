@@ -20,6 +20,10 @@ xyzp[:,0] = lon
 xyzp[:,1] = lat
 inside = basin.areinside(xyzp)
 
+# Same result using the levels of detail, points with NaN are outside
+xyzn = np.vstack([xyzp,[np.nan,42.2],[19.3,np.nan]])
+print('Same with tol:',np.all(basin.areinside(xyzn,tol=0.002) == basin.areinside(xyzn)))
+
 # Plot
 plt.figure(1,(8,6),dpi=100)
 plt.plot(basin.x,basin.y,'o-k')
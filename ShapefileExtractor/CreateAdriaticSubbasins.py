@@ -7,14 +7,14 @@ import os, numpy as np
 import matplotlib.pyplot as plt
 
 import Basins
-SHAPESPATH = Basins.worldseas.SHAPESPATH
+SHAPESPATH = 'shapes'
 
 
 # Recover adriatic basin
 adr = Basins.Basin.from_npy('adr', 'Adriatic Sea', os.path.join(SHAPESPATH,'Adriatic_WorldSeas.npy'),downsample=1)
 
 # Recover the points
-xyz = np.array([p.xyz for p in adr.points])
+xyz = np.array(adr.xyz)
 print(xyz)
 
 # Generate a polygon for North Adriatic
@@ -34,8 +34,8 @@ plt.plot(xyz_madr[:,0],xyz_madr[:,1],'b')
 plt.plot(xyz_sadr[:,0],xyz_sadr[:,1],'r')
 
 # Save as numpy array
-np.save('../Basins/shapes/North_Adriatic.npy',xyz_nadr)
-np.save('../Basins/shapes/Mid_Adriatic.npy',  xyz_madr)
-np.save('../Basins/shapes/South_Adriatic.npy',xyz_sadr)
+np.save('shapes/North_Adriatic.npy',xyz_nadr)
+np.save('shapes/Mid_Adriatic.npy',  xyz_madr)
+np.save('shapes/South_Adriatic.npy',xyz_sadr)
 
 plt.show()
\ No newline at end of file
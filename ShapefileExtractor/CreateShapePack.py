@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+
+# Edited by amiro and eterzic 18.10.2026
+from __future__ import print_function, division
+
+import os, sys, glob, numpy as np
+
+import Basins
+from Basins.manifest import PACKFILE
+from Basins.pack     import write_pack
+from Basins.simplify import LOD_TOLERANCES
+
+
+# Store the shapes in single precision with --float32
+dtype = np.float32 if '--float32' in sys.argv[1:] else np.double
+
+# Collect the levels of detail used by the catalog, the pyramid
+# of simplified levels (LOD_TOLERANCES) is stored for every shape
+used, tols = {}, {}
+for module in Basins.CATALOG_MODULES:
+	manifest = getattr(Basins,module).manifest
+	for key in manifest:
+		abbrev, name, kind, args = manifest._entries[key]
+		if kind != 'shape': continue
+		shape, downsample, tol = args
+		used.setdefault(shape,set()).add(downsample)
+		if tol is not None: tols.setdefault(shape,set()).add(tol)
+
+# Load the extracted shapes, each one is stored only once
+shapes = {}
+for fname in sorted(glob.glob('shapes/*.npy')):
+	shape = os.path.splitext(os.path.basename(fname))[0]
+	shapes[shape] = np.load(fname)
+	tols[shape] = set(LOD_TOLERANCES) | tols.get(shape,set())
+	print(shape,shapes[shape].shape,sorted(used.get(shape,[1])),sorted(tols[shape]))
+
+for shape in used:
+	if shape not in shapes: print('Skipping missing %s' % shape)
+
+write_pack(PACKFILE,shapes,lods=used,tols=tols,dtype=dtype)
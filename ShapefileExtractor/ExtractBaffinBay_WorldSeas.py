@@ -36,6 +36,6 @@ xyz = np.zeros((st,3),dtype=np.double)
 xyz[:,0] = xy[:st,0]
 xyz[:,1] = xy[:st,1]
 
-np.save('../Basins/shapes/BaffinBay_WorldSeas.npy',xyz)
+np.save('shapes/BaffinBay_WorldSeas.npy',xyz)
 
 plt.show()
\ No newline at end of file
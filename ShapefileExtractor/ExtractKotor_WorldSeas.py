@@ -40,6 +40,6 @@ xyz = np.zeros((st-14,3),dtype=np.double)
 xyz[:,0] = xy[14:st,0]
 xyz[:,1] = xy[14:st,1]
 
-np.save('../Basins/shapes/Kotor_WorldSeas.npy',xyz)
+np.save('shapes/Kotor_WorldSeas.npy',xyz)
 
 plt.show()
\ No newline at end of file
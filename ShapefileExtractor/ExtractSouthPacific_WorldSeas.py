@@ -42,7 +42,7 @@ xyz = np.zeros((st,3),dtype=np.double)
 xyz[:,0] = xy[:st,0]
 xyz[:,1] = xy[:st,1]
 
-np.save('../Basins/shapes/SouthPacific1_WorldSeas.npy',xyz)
+np.save('shapes/SouthPacific1_WorldSeas.npy',xyz)
 
 # Extract the region of negative longitudes
 rect = Basins.SimpleRectangle(-181.,0.,-70.,1.)
@@ -65,6 +65,6 @@ xyz = np.zeros((st,3),dtype=np.double)
 xyz[:,0] = xy[:st,0]
 xyz[:,1] = xy[:st,1]
 
-np.save('../Basins/shapes/SouthPacific2_WorldSeas.npy',xyz)
+np.save('shapes/SouthPacific2_WorldSeas.npy',xyz)
 
 plt.show()
\ No newline at end of file